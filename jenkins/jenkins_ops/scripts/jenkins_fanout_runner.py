@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+try:
+    import jenkins
+except ImportError:
+    print("WARN: jenkins module not found,this could be OK if you are just syncing (discovering) jobs against the Jenkins server")
+    pass
+import time
+import json
+import os
+import sys
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from jenkins_job_runner import (
+    BuildCancelledError,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_TIMEOUT,
+    JenkinsJobRunner,
+    LOG_DRAIN_ATTEMPTS,
+    QUEUE_POLL_BACKOFF,
+    QUEUE_POLL_MAX_INTERVAL,
+    QUEUE_POLL_MIN_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = '/tmp/jenkins_fanout_config.json'
+# Builds queued at the same time
+MAX_TRIGGER_WORKERS = 8
+
+# Final statuses that are not reported by Jenkins itself
+CANCELLED = 'CANCELLED'
+TRIGGER_FAILED = 'TRIGGER_FAILED'
+TIMED_OUT = 'TIMEOUT'
+
+# Delay between console log fetches of a finished build whose tail is not
+# written yet
+LOG_DRAIN_INTERVAL = 1  # seconds
+
+
+class FanoutBuild:
+    """One build of a fan-out, from queueing to its final status."""
+
+    def __init__(self, label: str, job_name: str, parameters: Dict[str, Any], runner: JenkinsJobRunner):
+        self.label = label
+        self.job_name = job_name
+        self.parameters = parameters
+        self.runner = runner
+        self.queue_id: Optional[int] = None
+        self.build_number: Optional[int] = None
+        self.status: Optional[str] = None
+        # Jenkins result of a finished build whose console log is still draining
+        self.result: Optional[str] = None
+        self.drain_attempts = 0
+        self.url = ''
+        self.error = ''
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.expected: Optional[float] = None
+        self.log_offset = 0
+        self.queue_interval = QUEUE_POLL_MIN_INTERVAL
+        self.next_poll = 0.0
+        self.aborting = False
+
+    @property
+    def done(self) -> bool:
+        return self.status is not None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+class JenkinsFanoutRunner:
+    """
+    Triggers several Jenkins builds at once and waits for all of them.
+
+    All builds are tracked in one polling loop, each on its own adaptive schedule:
+    queue items back off like JenkinsJobRunner.trigger_build, and running builds
+    are polled relative to their expected duration. Console output of every build
+    is streamed with a ``[label]`` prefix. With ``fail_fast``, the first failed
+    build cancels the remaining queue items and aborts the running builds.
+
+    Only jobs listed in ``job_parameters`` (the tool's configured ``jobs``) can be
+    triggered; builds of any other job fail without reaching Jenkins.
+    """
+
+    def __init__(
+        self,
+        server: Any,
+        jenkins_url: str,
+        username: str,
+        api_token: str,
+        builds: List[Dict[str, Any]],
+        job_parameters: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None,
+        fail_fast: bool = False,
+        stream_logs: bool = True,
+        poll_interval: int = 30,
+        max_poll_interval: int = DEFAULT_MAX_POLL_INTERVAL,
+        timeout: int = DEFAULT_TIMEOUT,
+        log_filter: Optional[str] = None,
+        log_highlight: Optional[str] = None
+    ):
+        self.server = server
+        self.fail_fast = fail_fast
+        self.stream_logs = stream_logs
+        self.timeout = timeout
+        self.job_parameters = job_parameters or {}
+        self.deadline: Optional[float] = None
+
+        labels = [build.get('label') or build['job'] for build in builds]
+        self.builds: List[FanoutBuild] = []
+        for index, build in enumerate(builds):
+            label = labels[index]
+            if labels.count(label) > 1:
+                label = f"{label}#{labels[:index + 1].count(label)}"
+            runner = JenkinsJobRunner(
+                jenkins_url=jenkins_url,
+                username=username,
+                api_token=api_token,
+                job_name=build['job'],
+                stream_logs=stream_logs,
+                poll_interval=poll_interval,
+                log_filter=log_filter,
+                log_highlight=log_highlight,
+                max_poll_interval=max_poll_interval,
+                timeout=0,  # the fan-out enforces one deadline for all builds
+                log_prefix=label
+            )
+            runner.server = server
+            self.builds.append(FanoutBuild(label, build['job'], build.get('parameters', {}), runner))
+
+    def _queue(self, build: FanoutBuild) -> None:
+        if build.job_name not in self.job_parameters:
+            build.status = TRIGGER_FAILED
+            build.error = f"job {build.job_name} is not configured for this tool"
+            return
+        try:
+            param_types = self.job_parameters[build.job_name]
+            build.queue_id = build.runner.queue_build(build.parameters, param_types)
+        except Exception as e:
+            build.status = TRIGGER_FAILED
+            build.error = str(e)
+
+    def _poll(self, build: FanoutBuild) -> None:
+        """Poll one build once and schedule its next poll."""
+        now = time.monotonic()
+        if build.build_number is None:
+            try:
+                build.build_number, _ = build.runner.check_queue_item(build.queue_id)
+            except BuildCancelledError as e:
+                build.status = CANCELLED
+                build.error = str(e)
+                print(f"🚫 [{build.label}] cancelled while queued")
+                return
+            if build.build_number is None:
+                build.next_poll = now + build.queue_interval
+                build.queue_interval = min(build.queue_interval * QUEUE_POLL_BACKOFF, QUEUE_POLL_MAX_INTERVAL)
+                return
+            build.started_at = now
+            print(f"🚀 [{build.label}] build #{build.build_number} started")
+            if build.aborting:
+                # Left the queue before fail-fast could cancel it
+                self.server.stop_build(build.job_name, build.build_number)
+
+        if build.result is None:
+            build_info = self.server.get_build_info(build.job_name, build.build_number)
+            status = build_info.get('result')
+            build.url = build_info.get('url', build.url)
+            if build.expected is None and not status:
+                build.expected = build.runner.expected_duration(build_info) or 0
+        else:
+            status = build.result
+
+        if self.stream_logs:
+            log_offset, more_data = build.runner.fetch_new_logs(build.build_number, build.log_offset)
+            progressed = log_offset != build.log_offset
+            build.log_offset = log_offset
+            if status and more_data and build.drain_attempts < LOG_DRAIN_ATTEMPTS:
+                # Jenkins is still writing the end of the log: fetch the tail on
+                # later polls instead of holding up the other builds
+                build.result = status
+                build.drain_attempts += 1
+                build.next_poll = now if progressed else now + LOG_DRAIN_INTERVAL
+                return
+            if status:
+                build.runner.finish_logs()
+
+        if status:
+            build.status = status
+            build.finished_at = time.monotonic()
+            print(f"{'✅' if status == 'SUCCESS' else '❌'} [{build.label}] build #{build.build_number} finished: {status}")
+            return
+
+        build.next_poll = now + build.runner.next_poll_interval(build_info, build.expected)
+
+    def _abort_remaining(self) -> None:
+        """Cancel queued builds and stop running ones after a failure in fail-fast mode."""
+        for build in self.builds:
+            if build.done or build.aborting or build.result is not None:
+                continue
+            build.aborting = True
+            try:
+                if build.build_number is None:
+                    self.server.cancel_queue(build.queue_id)
+                    build.status = CANCELLED
+                    build.error = 'cancelled by fail-fast'
+                    print(f"🚫 [{build.label}] cancelled by fail-fast")
+                else:
+                    # Keep polling until Jenkins reports the build as aborted
+                    self.server.stop_build(build.job_name, build.build_number)
+                    build.next_poll = time.monotonic()
+                    print(f"🛑 [{build.label}] stopping build #{build.build_number} (fail-fast)")
+            except Exception as e:
+                logger.warning(f"Failed to abort {build.label}: {str(e)}")
+
+    def run(self) -> List[FanoutBuild]:
+        """Trigger all builds, wait for them and return them with their final status."""
+        if self.timeout:
+            self.deadline = time.monotonic() + self.timeout
+
+        with ThreadPoolExecutor(max_workers=min(MAX_TRIGGER_WORKERS, len(self.builds) or 1)) as executor:
+            list(executor.map(self._queue, self.builds))
+        for build in self.builds:
+            if build.status == TRIGGER_FAILED:
+                print(f"❌ [{build.label}] failed to trigger {build.job_name}: {build.error}")
+            else:
+                print(f"📋 [{build.label}] queued {build.job_name}")
+
+        fail_fast_triggered = False
+        while True:
+            if self.fail_fast and not fail_fast_triggered and any(
+                (build.status or build.result) not in (None, 'SUCCESS') for build in self.builds
+            ):
+                fail_fast_triggered = True
+                self._abort_remaining()
+
+            pending = [build for build in self.builds if not build.done]
+            if not pending:
+                return self.builds
+
+            now = time.monotonic()
+            if self.deadline is not None and now >= self.deadline:
+                for build in pending:
+                    if build.result is not None:
+                        # Finished, only the end of its console log is missing
+                        build.status = build.result
+                    else:
+                        build.status = TIMED_OUT
+                        build.error = f"not finished after {self.timeout}s"
+                    build.finished_at = now
+                print(f"⏰ Timed out after {self.timeout}s waiting for {len(pending)} builds")
+                return self.builds
+
+            for build in pending:
+                if build.next_poll <= now:
+                    try:
+                        self._poll(build)
+                    except Exception as e:
+                        # A transient error for one build must not stop the others
+                        logger.warning(f"Failed to poll {build.label}: {str(e)}")
+                        build.next_poll = now + build.runner.poll_interval
+
+            upcoming = [build.next_poll for build in self.builds if not build.done]
+            if upcoming:
+                wake_at = min(upcoming)
+                if self.deadline is not None:
+                    wake_at = min(wake_at, self.deadline)
+                time.sleep(max(0.0, wake_at - time.monotonic()))
+
+
+def _format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '-'
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s" if minutes else f"{seconds}s"
+
+
+def format_results_table(builds: List[FanoutBuild]) -> str:
+    """Render the consolidated results as an aligned text table."""
+    headers = ('LABEL', 'JOB', 'BUILD', 'STATUS', 'DURATION', 'URL')
+    rows = [
+        (
+            build.label,
+            build.job_name,
+            f"#{build.build_number}" if build.build_number is not None else '-',
+            build.status or '-',
+            _format_duration(build.duration),
+            build.url or build.error
+        )
+        for build in builds
+    ]
+    widths = [max(len(str(row[i])) for row in [headers] + rows) for i in range(len(headers))]
+    lines = ['  '.join(str(value).ljust(widths[i]) for i, value in enumerate(row)).rstrip() for row in [headers] + rows]
+    lines.insert(1, '  '.join('-' * width for width in widths))
+    return '\n'.join(lines)
+
+
+def get_builds_from_env(allowed_jobs: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Read the builds to run from the ``builds`` argument.
+
+    ``builds`` is a JSON list of objects with ``job``, ``parameters`` and an
+    optional ``label``. Entries without ``job`` use the ``job`` argument, so the
+    same job can be fanned out over several parameter sets. Every job must be a
+    key of ``allowed_jobs``, the jobs the tool was configured with.
+    """
+    default_job = os.environ.get('job')
+    try:
+        builds = json.loads(os.environ.get('builds') or '[]')
+    except json.JSONDecodeError as e:
+        raise ValueError(f"builds must be a JSON list: {str(e)}")
+    if not isinstance(builds, list) or not builds:
+        raise ValueError("builds must be a non-empty JSON list")
+
+    normalized = []
+    for index, build in enumerate(builds):
+        if not isinstance(build, dict):
+            raise ValueError(f"builds[{index}] must be an object")
+        job_name = build.get('job') or default_job
+        if not job_name:
+            raise ValueError(f"builds[{index}] has no job and no default job was given")
+        if job_name not in allowed_jobs:
+            raise ValueError(f"builds[{index}] uses job {job_name}, which is not configured for this tool")
+        parameters = build.get('parameters', {})
+        if not isinstance(parameters, dict):
+            raise ValueError(f"builds[{index}].parameters must be an object")
+        normalized.append({'job': job_name, 'parameters': parameters, 'label': build.get('label')})
+
+    fail_fast = str(os.environ.get('fail_fast', 'false')).lower() == 'true'
+    return normalized, fail_fast
+
+
+def main():
+    """Main execution function."""
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            config = json.load(f)
+
+        builds, fail_fast = get_builds_from_env(config.get('jobs', {}))
+
+        print("🔌 Connecting to Jenkins...")
+        server = jenkins.Jenkins(
+            os.environ['JENKINS_URL'],
+            username=config['username'],
+            password=os.environ['JENKINS_API_TOKEN']
+        )
+        server.get_whoami()
+
+        print(f"🚀 Triggering {len(builds)} builds{' (fail-fast)' if fail_fast else ''}...")
+        fanout = JenkinsFanoutRunner(
+            server=server,
+            jenkins_url=os.environ['JENKINS_URL'],
+            username=config['username'],
+            api_token=os.environ['JENKINS_API_TOKEN'],
+            builds=builds,
+            job_parameters=config.get('jobs', {}),
+            fail_fast=fail_fast,
+            stream_logs=config.get('stream_logs', True),
+            poll_interval=config.get('poll_interval', 30),
+            max_poll_interval=config.get('max_poll_interval', DEFAULT_MAX_POLL_INTERVAL),
+            timeout=config.get('timeout', DEFAULT_TIMEOUT),
+            log_filter=config.get('log_filter'),
+            log_highlight=config.get('log_highlight')
+        )
+        results = fanout.run()
+
+        print()
+        print(format_results_table(results))
+        failed = [build for build in results if build.status != 'SUCCESS']
+        if failed:
+            print(f"\n❌ {len(failed)} of {len(results)} builds did not succeed")
+            sys.exit(1)
+        print(f"\n✅ All {len(results)} builds completed successfully")
+        sys.exit(0)
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
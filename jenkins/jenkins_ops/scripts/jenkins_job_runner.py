@@ -4,15 +4,52 @@ try:
 except ImportError:
     print("WARN: jenkins module not found,this could be OK if you are just syncing (discovering) jobs against the Jenkins server")
     pass
+try:
+    import requests
+except ImportError:
+    pass
 import time
 import json
 import os
+import re
 import sys
 import logging
-from typing import Dict, Any, Optional, Tuple
+from statistics import median
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import quote
 
 logger = logging.getLogger(__name__)
 
+# Extra progressiveText fetches allowed after a build finishes, while Jenkins
+# is still writing the end of the console log
+LOG_DRAIN_ATTEMPTS = 10
+
+# Queue polling starts fast, since most builds leave the queue within seconds,
+# and backs off while a build waits for an executor
+QUEUE_POLL_MIN_INTERVAL = 1  # seconds
+QUEUE_POLL_MAX_INTERVAL = 10  # seconds
+QUEUE_POLL_BACKOFF = 1.5
+
+# Build polling is scaled from the expected duration within these bounds
+BUILD_POLL_MIN_INTERVAL = 2  # seconds
+DEFAULT_MAX_POLL_INTERVAL = 60  # seconds
+# Recent builds used to estimate the expected duration
+RECENT_BUILDS = 5
+
+# Overall deadline for queueing plus running a build; 0 disables it
+DEFAULT_TIMEOUT = 6 * 60 * 60  # seconds
+
+
+class BuildTimeoutError(Exception):
+    """Raised when a build does not finish before the runner's deadline."""
+    pass
+
+
+class BuildCancelledError(Exception):
+    """Raised when a queued build is cancelled before it starts."""
+    pass
+
+
 class JenkinsJobRunner:
     """Handles Jenkins job execution and monitoring."""
     
@@ -23,7 +60,12 @@ class JenkinsJobRunner:
         api_token: str,
         job_name: str,
         stream_logs: bool = True,
-        poll_interval: int = 30
+        poll_interval: int = 30,
+        log_filter: Optional[str] = None,
+        log_highlight: Optional[str] = None,
+        max_poll_interval: int = DEFAULT_MAX_POLL_INTERVAL,
+        timeout: int = DEFAULT_TIMEOUT,
+        log_prefix: Optional[str] = None
     ):
         self.jenkins_url = jenkins_url
         self.username = username
@@ -31,7 +73,17 @@ class JenkinsJobRunner:
         self.job_name = job_name
         self.stream_logs = stream_logs
         self.poll_interval = poll_interval
+        self.max_poll_interval = max(max_poll_interval, BUILD_POLL_MIN_INTERVAL)
+        self.timeout = timeout
+        self.deadline: Optional[float] = None
+        # Only console lines matching log_filter are printed; lines matching
+        # log_highlight are marked so errors stand out while streaming
+        self.log_filter = re.compile(log_filter) if log_filter else None
+        self.log_highlight = re.compile(log_highlight) if log_highlight else None
+        # Prepended to every console line when several builds share one output
+        self.log_prefix = log_prefix
         self.server = None
+        self._partial_line = ''
 
     def _unsanitize_parameters(self, parameters: Dict[str, Any], param_types: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
         """Convert parameters back to their original names and types for Jenkins API."""
@@ -97,6 +149,17 @@ class JenkinsJobRunner:
         
         return jenkins_params
 
+    def queue_build(self, parameters: Dict[str, Any], param_types: Dict[str, Dict[str, str]]) -> int:
+        """Queue a build with parameters and return its queue item id."""
+        # Convert parameters to Jenkins format
+        jenkins_params = self._prepare_parameters_for_jenkins(parameters, param_types)
+        
+        logger.debug(f"Original parameters: {parameters}")
+        logger.debug(f"Parameters for Jenkins: {jenkins_params}")
+        
+        self._start_deadline()
+        return self.server.build_job(self.job_name, parameters=jenkins_params)
+
     def trigger_build(self, parameters: Dict[str, Any]) -> int:
         """Trigger Jenkins build with parameters."""
         try:
@@ -104,55 +167,207 @@ class JenkinsJobRunner:
             with open('/tmp/jenkins_config.json', 'r') as f:
                 config = json.load(f)
             
-            # Get parameter types from config
-            param_types = config.get('parameters', {})
-            
-            # Convert parameters to Jenkins format
-            jenkins_params = self._prepare_parameters_for_jenkins(parameters, param_types)
-            
-            logger.debug(f"Original parameters: {parameters}")
-            logger.debug(f"Parameters for Jenkins: {jenkins_params}")
-            
             # Queue the build with prepared parameters
-            queue_id = self.server.build_job(self.job_name, parameters=jenkins_params)
+            queue_id = self.queue_build(parameters, config.get('parameters', {}))
             
-            # Get build number from queue
+            # Get build number from queue, polling quickly at first and backing off
+            interval = QUEUE_POLL_MIN_INTERVAL
+            last_reason = None
             while True:
-                queue_item = self.server.get_queue_item(queue_id)
-                if queue_item.get('executable'):
-                    return queue_item['executable']['number']
-                time.sleep(2)
+                build_number, reason = self.check_queue_item(queue_id)
+                if build_number is not None:
+                    return build_number
+                if reason and reason != last_reason:
+                    print(f"⏳ Waiting in queue: {reason}")
+                    last_reason = reason
+                self._sleep_until_next_poll(interval, f"queued build of {self.job_name}")
+                interval = min(interval * QUEUE_POLL_BACKOFF, QUEUE_POLL_MAX_INTERVAL)
         except Exception as e:
             logger.error(f"Failed to trigger build: {str(e)}")
             raise
 
-    def get_build_logs(self, build_number: int, start_line: int = 0) -> Optional[str]:
-        """Get incremental build logs."""
+    def check_queue_item(self, queue_id: int) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Check a queued build once.
+
+        Returns the build number once the build has started, otherwise None and the
+        reason Jenkins gives for waiting. Raises BuildCancelledError if the queue
+        item was cancelled.
+        """
+        queue_item = self.server.get_queue_item(queue_id)
+        if queue_item.get('cancelled'):
+            raise BuildCancelledError(f"Build of {self.job_name} was cancelled while queued")
+        if queue_item.get('executable'):
+            return queue_item['executable']['number'], None
+        return None, queue_item.get('why')
+
+    def _start_deadline(self) -> None:
+        if self.deadline is None and self.timeout:
+            self.deadline = time.monotonic() + self.timeout
+
+    def _sleep_until_next_poll(self, interval: float, waiting_for: str) -> None:
+        """Sleep for ``interval`` seconds, raising BuildTimeoutError if the deadline passes first."""
+        if self.deadline is not None:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                raise BuildTimeoutError(f"Timed out after {self.timeout}s waiting for {waiting_for}")
+            interval = min(interval, remaining)
+        time.sleep(interval)
+
+    def _job_path(self) -> str:
+        """Job URL, with each folder of the job name as its own job/ segment."""
+        job_path = '/'.join(f"job/{quote(part, safe='')}" for part in self.job_name.split('/'))
+        return f"{self.jenkins_url.rstrip('/')}/{job_path}"
+
+    def _build_path(self, build_number: int) -> str:
+        return f"{self._job_path()}/{build_number}"
+
+    def _recent_build_durations(self) -> List[float]:
+        """Durations in seconds of the job's recent successful builds."""
         try:
-            return self.server.get_build_console_output(self.job_name, build_number)
+            response = self.server.jenkins_open(requests.Request(
+                'GET',
+                f"{self._job_path()}/api/json",
+                params={'tree': f"builds[duration,result]{{0,{RECENT_BUILDS}}}"}
+            ))
+            builds = json.loads(response).get('builds', [])
+            return [
+                build['duration'] / 1000 for build in builds
+                if build.get('result') == 'SUCCESS' and build.get('duration')
+            ]
+        except Exception as e:
+            logger.debug(f"Failed to get recent build durations: {str(e)}")
+            return []
+
+    def expected_duration(self, build_info: Dict[str, Any]) -> Optional[float]:
+        """Expected build duration in seconds from estimatedDuration and recent builds."""
+        durations = self._recent_build_durations()
+        estimated = build_info.get('estimatedDuration') or 0
+        if estimated > 0:
+            durations.append(estimated / 1000)
+        return median(durations) if durations else None
+
+    def next_poll_interval(self, build_info: Dict[str, Any], expected: Optional[float]) -> float:
+        """
+        Seconds until the next build poll.
+
+        Without an estimate this is the configured poll interval. Otherwise a quarter
+        of the expected remaining time, so polls thin out early in a long build and
+        tighten as it nears completion, or a tenth of the expected duration once the
+        build overruns its estimate.
+        """
+        if not expected:
+            return self.poll_interval
+        started = build_info.get('timestamp')
+        elapsed = max(0.0, time.time() - started / 1000) if started is not None else 0.0
+        remaining = expected - elapsed
+        interval = remaining / 4 if remaining > 0 else expected / 10
+        return max(BUILD_POLL_MIN_INTERVAL, min(interval, self.max_poll_interval))
+
+    def get_build_logs(self, build_number: int, start: int = 0) -> Tuple[Optional[str], int, bool]:
+        """
+        Get the console output written since byte offset ``start``.
+
+        Uses Jenkins' progressiveText endpoint, so each call transfers only new
+        output. Returns the new text, the offset to resume from (X-Text-Size) and
+        whether Jenkins expects more output (X-More-Data).
+        """
+        try:
+            response = self.server.jenkins_request(
+                requests.Request(
+                    'GET',
+                    f"{self._build_path(build_number)}/logText/progressiveText",
+                    params={'start': start}
+                ),
+                add_crumb=False
+            )
+            next_start = int(response.headers.get('X-Text-Size', start + len(response.content)))
+            more_data = response.headers.get('X-More-Data', '').lower() == 'true'
+            return response.content.decode('utf-8', errors='replace'), next_start, more_data
         except Exception as e:
             logger.warning(f"Failed to get build logs: {str(e)}")
-            return None
+            return None, start, True
+
+    def _print_log_line(self, line: str) -> None:
+        """Print one console line, applying the optional filter, highlight and prefix."""
+        if self.log_filter and not self.log_filter.search(line):
+            return
+        prefix = f"[{self.log_prefix}] " if self.log_prefix else ''
+        if self.log_highlight and self.log_highlight.search(line):
+            print(f"{prefix}❗ {line}")
+        else:
+            print(f"{prefix}{line}")
+
+    def _emit_logs(self, text: str, final: bool = False) -> None:
+        """Print new console text line by line, holding back a trailing partial line."""
+        if not self.log_filter and not self.log_highlight and not self.log_prefix:
+            print(text, end='', flush=True)
+            return
+
+        lines = (self._partial_line + text).split('\n')
+        self._partial_line = '' if final else lines.pop()
+        for line in lines:
+            if line or not final:
+                self._print_log_line(line)
+        sys.stdout.flush()
+
+    def stream_new_logs(self, build_number: int, log_offset: int, finished: bool = False) -> int:
+        """Print console output written since ``log_offset`` and return the new offset."""
+        drain_attempts = 0
+        while True:
+            logs, log_offset, more_data = self.get_build_logs(build_number, log_offset)
+            if logs:
+                self._emit_logs(logs)
+            # While the build runs one fetch per poll is enough; once it has
+            # finished, drain the tail until Jenkins reports no more data
+            if not finished or not more_data or logs is None or drain_attempts >= LOG_DRAIN_ATTEMPTS:
+                break
+            drain_attempts += 1
+            if not logs:
+                time.sleep(1)
+        if finished:
+            self._emit_logs('', final=True)
+        return log_offset
+
+    def fetch_new_logs(self, build_number: int, log_offset: int) -> Tuple[int, bool]:
+        """
+        Print console output written since ``log_offset`` with a single request.
+
+        Returns the new offset and whether Jenkins has more output to send. Unlike
+        stream_new_logs this never waits, so callers polling several builds can
+        schedule the rest of the drain themselves.
+        """
+        logs, log_offset, more_data = self.get_build_logs(build_number, log_offset)
+        if logs:
+            self._emit_logs(logs)
+        return log_offset, more_data and logs is not None
+
+    def finish_logs(self) -> None:
+        """Print the held-back partial line once a build's console log is complete."""
+        self._emit_logs('', final=True)
 
     def monitor_build(self, build_number: int) -> Tuple[str, str]:
         """Monitor build progress."""
         try:
-            last_line = 0
+            self._start_deadline()
+            log_offset = 0
+            expected = None
             while True:
                 build_info = self.server.get_build_info(self.job_name, build_number)
                 status = build_info.get('result')
+                if expected is None and not status:
+                    expected = self.expected_duration(build_info) or 0
                 
-                # Stream logs if enabled
+                # Stream only the console output written since the last poll
                 if self.stream_logs:
-                    logs = self.get_build_logs(build_number, last_line)
-                    if logs:
-                        print(logs, end='')
-                        last_line = len(logs.splitlines())
+                    log_offset = self.stream_new_logs(build_number, log_offset, finished=bool(status))
                 
                 if status:
                     return status, build_info.get('url', '')
                 
-                time.sleep(self.poll_interval)
+                self._sleep_until_next_poll(
+                    self.next_poll_interval(build_info, expected), f"build #{build_number} of {self.job_name}"
+                )
         except Exception as e:
             logger.error(f"Failed to monitor build: {str(e)}")
             raise
@@ -211,7 +426,11 @@ def main():
             api_token=os.environ['JENKINS_API_TOKEN'],
             job_name=config['job_name'],
             stream_logs=config.get('stream_logs', True),
-            poll_interval=config.get('poll_interval', 30)
+            poll_interval=config.get('poll_interval', 30),
+            log_filter=config.get('log_filter'),
+            log_highlight=config.get('log_highlight'),
+            max_poll_interval=config.get('max_poll_interval', DEFAULT_MAX_POLL_INTERVAL),
+            timeout=config.get('timeout', DEFAULT_TIMEOUT)
         )
         
         # Connect to Jenkins
@@ -1,7 +1,9 @@
 import logging
 from kubiya_sdk.tools.registry import tool_registry
 from .jenkins_job_tool import JenkinsJobTool
+from .jenkins_fanout_tool import JenkinsFanoutTool, FANOUT_TOOL_NAME
 from .parser import JenkinsJobParser
+from .catalog_cache import JobCatalogCache, DEFAULT_MAX_AGE
 from .config import DEFAULT_JENKINS_CONFIG
 from typing import Dict, Any
 import json
@@ -12,9 +14,22 @@ logger = logging.getLogger(__name__)
 DEFAULT_CONFIG = {
     "stream_logs": True,
     "poll_interval": 10,  # seconds
+    "log_filter": None,  # regex, only matching console lines are streamed
+    "log_highlight": None,  # regex, matching console lines are highlighted
+    "max_poll_interval": 60,  # seconds, upper bound for adaptive status polling
+    "timeout": 21600,  # seconds to wait for a build to be queued and finish, 0 = no limit
     "sync_all": True,
     "include": [],
     "exclude": [],
+    "discovery_mode": "tree",
+    "tree_depth": 3,
+    "max_workers": 8,
+    "max_retries": 3,
+    "adaptive_concurrency": True,
+    "cache_enabled": True,
+    "cache_path": None,  # defaults to ~/.cache/jenkins_ops/job_catalog.json
+    "cache_max_age": DEFAULT_MAX_AGE,  # seconds between full discoveries
+    "fanout_enabled": True,  # register a tool that runs several builds at once
 }
 
 def get_jenkins_config() -> Dict[str, Any]:
@@ -29,9 +44,28 @@ def get_jenkins_config() -> Dict[str, Any]:
                 "include": ["job1", "job2"],  # Optional: list of jobs to include if sync_all is False
                 "exclude": ["test-job"] # Optional: list of jobs to exclude
             },
+            "discovery": {  # Optional: how jobs are discovered
+                "mode": "tree",  # "tree" (few tree API queries) or "per_job" (one request per folder and job)
+                "tree_depth": 3,  # Folder levels fetched per tree query
+                "max_workers": 8,  # Maximum concurrent requests to Jenkins
+                "max_retries": 3,  # Retries for failed GET requests
+                "adaptive_concurrency": True  # Reduce concurrency while Jenkins slows down
+            },
+            "cache": {  # Optional: reuse the parsed job catalog between loads
+                "enabled": True,
+                "path": "/var/cache/jenkins_ops/job_catalog.json",  # Optional: catalog file location
+                "max_age": 86400  # Optional: seconds before a full rediscovery is forced
+            },
+            "fanout": {  # Optional: tool that triggers several builds at once and waits for all
+                "enabled": True
+            },
             "defaults": {  # Optional: default settings for all jobs
                 "stream_logs": True,
-                "poll_interval": 10
+                "poll_interval": 10,
+                "log_filter": None,  # Optional: regex, only matching console lines are streamed
+                "log_highlight": "(?i)error|exception",  # Optional: regex, matching console lines are highlighted
+                "max_poll_interval": 60,  # Optional: upper bound in seconds for adaptive status polling
+                "timeout": 21600  # Optional: seconds to wait for a build to finish, 0 = no limit
             }
         }
     }"""
@@ -77,9 +111,30 @@ def get_jenkins_config() -> Dict[str, Any]:
             "include": jenkins_config.get('jobs', {}).get('include', []),
             "exclude": jenkins_config.get('jobs', {}).get('exclude', []),
         },
+        "discovery": {
+            "mode": jenkins_config.get('discovery', {}).get('mode', DEFAULT_CONFIG['discovery_mode']),
+            "tree_depth": jenkins_config.get('discovery', {}).get('tree_depth', DEFAULT_CONFIG['tree_depth']),
+            "max_workers": jenkins_config.get('discovery', {}).get('max_workers', DEFAULT_CONFIG['max_workers']),
+            "max_retries": jenkins_config.get('discovery', {}).get('max_retries', DEFAULT_CONFIG['max_retries']),
+            "adaptive_concurrency": jenkins_config.get('discovery', {}).get(
+                'adaptive_concurrency', DEFAULT_CONFIG['adaptive_concurrency']
+            ),
+        },
+        "cache": {
+            "enabled": jenkins_config.get('cache', {}).get('enabled', DEFAULT_CONFIG['cache_enabled']),
+            "path": jenkins_config.get('cache', {}).get('path', DEFAULT_CONFIG['cache_path']),
+            "max_age": jenkins_config.get('cache', {}).get('max_age', DEFAULT_CONFIG['cache_max_age']),
+        },
+        "fanout": {
+            "enabled": jenkins_config.get('fanout', {}).get('enabled', DEFAULT_CONFIG['fanout_enabled']),
+        },
         "defaults": {
             "stream_logs": jenkins_config.get('defaults', {}).get('stream_logs', DEFAULT_CONFIG['stream_logs']),
-            "poll_interval": jenkins_config.get('defaults', {}).get('poll_interval', DEFAULT_CONFIG['poll_interval'])
+            "poll_interval": jenkins_config.get('defaults', {}).get('poll_interval', DEFAULT_CONFIG['poll_interval']),
+            "log_filter": jenkins_config.get('defaults', {}).get('log_filter', DEFAULT_CONFIG['log_filter']),
+            "log_highlight": jenkins_config.get('defaults', {}).get('log_highlight', DEFAULT_CONFIG['log_highlight']),
+            "max_poll_interval": jenkins_config.get('defaults', {}).get('max_poll_interval', DEFAULT_CONFIG['max_poll_interval']),
+            "timeout": jenkins_config.get('defaults', {}).get('timeout', DEFAULT_CONFIG['timeout'])
         }
     }
     print("used_config=", ret)
@@ -118,7 +173,12 @@ def initialize_tools():
             parser = JenkinsJobParser(
                 jenkins_url=config['jenkins_url'],
                 username=config['auth']['username'],
-                api_token=config['auth']['password']
+                api_token=config['auth']['password'],
+                discovery_mode=config['discovery']['mode'],
+                tree_depth=config['discovery']['tree_depth'],
+                max_workers=config['discovery']['max_workers'],
+                max_retries=config['discovery']['max_retries'],
+                adaptive_concurrency=config['discovery']['adaptive_concurrency']
             )
         except Exception as parser_error:
             raise ValueError(f"Failed to create Jenkins parser: {str(parser_error)}")
@@ -128,7 +188,34 @@ def initialize_tools():
         try:
             job_include_filter = config['jobs'].get('include') if not config['jobs'].get('sync_all') else None
             job_exclude_filter = config['jobs'].get('exclude') if not config['jobs'].get('sync_all') else None
-            jobs_info, warnings, errors = parser.get_jobs(job_include_filter=job_include_filter, job_exclude_filter=job_exclude_filter)
+
+            # Revalidate the cached catalog when there is one, otherwise discover everything
+            catalog_cache = None
+            cached_jobs = {}
+            if config['cache']['enabled']:
+                catalog_cache = JobCatalogCache(
+                    jenkins_url=config['jenkins_url'],
+                    username=config['auth']['username'],
+                    path=config['cache']['path'],
+                    max_age=config['cache']['max_age']
+                )
+                cached_jobs = catalog_cache.load()
+
+            jobs_info = None
+            full_discovery = True
+            if cached_jobs:
+                try:
+                    jobs_info, warnings, errors = parser.refresh_jobs(
+                        cached_jobs, job_include_filter=job_include_filter, job_exclude_filter=job_exclude_filter
+                    )
+                    full_discovery = False
+                except Exception as refresh_error:
+                    logger.warning(f"Failed to revalidate the cached job catalog, running a full discovery: {str(refresh_error)}")
+            if jobs_info is None:
+                jobs_info, warnings, errors = parser.get_jobs(job_include_filter=job_include_filter, job_exclude_filter=job_exclude_filter)
+
+            if catalog_cache and jobs_info:
+                catalog_cache.save(jobs_info, full_discovery=full_discovery)
         except Exception as jobs_error:
             example_config = {
                 "jenkins": {
@@ -176,6 +263,20 @@ def initialize_tools():
                 logger.error(error_msg)
                 failed_jobs.append({"job": job_name, "error": str(e)})
 
+        # One more tool that runs builds of any of the registered jobs in parallel
+        if tools and config['fanout']['enabled']:
+            failed_job_names = {job['job'] for job in failed_jobs}
+            try:
+                fanout_tool = create_fanout_tool(
+                    {job_name: job_info for job_name, job_info in jobs_info.items() if job_name not in failed_job_names},
+                    config
+                )
+                tool_registry.register("jenkins", fanout_tool)
+                tools.append(fanout_tool)
+                logger.info(f"Registered fan-out tool: {FANOUT_TOOL_NAME}")
+            except Exception as e:
+                logger.error(f"Failed to create fan-out tool: {str(e)}")
+
         if not tools:
             if failed_jobs:
                 error_details = "\n- ".join([f"{job['job']}: {job['error']}" for job in failed_jobs])
@@ -206,12 +307,43 @@ def create_jenkins_tool(job_name: str, job_info: Dict[str, Any], config: Dict[st
         },
         "long_running": True,
         "stream_logs": config.get('defaults', DEFAULT_CONFIG)['stream_logs'],
-        "poll_interval": config.get('defaults', DEFAULT_CONFIG)['poll_interval']
+        "poll_interval": config.get('defaults', DEFAULT_CONFIG)['poll_interval'],
+        "log_filter": config.get('defaults', DEFAULT_CONFIG).get('log_filter'),
+        "log_highlight": config.get('defaults', DEFAULT_CONFIG).get('log_highlight'),
+        "max_poll_interval": config.get('defaults', DEFAULT_CONFIG).get('max_poll_interval', DEFAULT_CONFIG['max_poll_interval']),
+        "timeout": config.get('defaults', DEFAULT_CONFIG).get('timeout', DEFAULT_CONFIG['timeout'])
     }
 
     tool = JenkinsJobTool(**tool_config)
     tool.prepare()
     return tool
 
+def create_fanout_tool(jobs_info: Dict[str, Any], config: Dict[str, Any]) -> JenkinsFanoutTool:
+    """Create the tool that triggers several builds of the given jobs at once."""
+    defaults = config.get('defaults', DEFAULT_CONFIG)
+    tool = JenkinsFanoutTool(
+        name=FANOUT_TOOL_NAME,
+        description=(
+            "Trigger several Jenkins builds in parallel, for example one job for many services or a set of "
+            "related jobs, and wait for all of them. Logs of all builds are streamed with a prefix per build "
+            "and a table of results is returned at the end."
+        ),
+        job_config={
+            "name": FANOUT_TOOL_NAME,
+            "parameters": {},
+            "auth": {"username": config['auth']['username']}
+        },
+        jobs={job_name: job_info.get('parameters', {}) for job_name, job_info in jobs_info.items()},
+        long_running=True,
+        stream_logs=defaults['stream_logs'],
+        poll_interval=defaults['poll_interval'],
+        log_filter=defaults.get('log_filter'),
+        log_highlight=defaults.get('log_highlight'),
+        max_poll_interval=defaults.get('max_poll_interval', DEFAULT_CONFIG['max_poll_interval']),
+        timeout=defaults.get('timeout', DEFAULT_CONFIG['timeout'])
+    )
+    tool.prepare()
+    return tool
+
 # Initialize tools dictionary
 tools = {}
\ No newline at end of file
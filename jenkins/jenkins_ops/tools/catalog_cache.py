@@ -0,0 +1,81 @@
+import os
+import json
+import time
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'jenkins_ops', 'job_catalog.json')
+# Cached catalogs older than this are discarded and rebuilt with a full discovery,
+# which also picks up configuration changes that did not produce a new build
+DEFAULT_MAX_AGE = 24 * 60 * 60  # seconds
+# Bump when the shape of parsed job definitions changes
+CATALOG_VERSION = 1
+
+
+class JobCatalogCache:
+    """
+    The parsed Jenkins job catalog from the previous discovery, stored as JSON.
+
+    A catalog is only reused for the same Jenkins URL and user, since a different
+    user may see different jobs. Incremental refreshes keep the time of the last
+    full discovery, so the catalog is rebuilt from scratch once that is older
+    than ``max_age``.
+    """
+
+    def __init__(self, jenkins_url: str, username: str, path: Optional[str] = None, max_age: float = DEFAULT_MAX_AGE):
+        self.jenkins_url = jenkins_url.rstrip('/')
+        self.username = username
+        self.path = path or os.environ.get('JENKINS_JOB_CATALOG_PATH', DEFAULT_CACHE_PATH)
+        self.max_age = max_age
+        self.discovered_at: Optional[float] = None
+
+    def load(self) -> Dict[str, Any]:
+        """Return the cached jobs keyed by full name, or an empty dict if there is no usable catalog."""
+        try:
+            with open(self.path, 'r') as f:
+                catalog = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable job catalog {self.path}: {e}")
+            return {}
+
+        if (
+            catalog.get('version') != CATALOG_VERSION
+            or catalog.get('jenkins_url') != self.jenkins_url
+            or catalog.get('username') != self.username
+        ):
+            logger.info(f"Ignoring job catalog {self.path}: it was built for a different server, user or version")
+            return {}
+
+        age = time.time() - catalog.get('discovered_at', 0)
+        if self.max_age and age > self.max_age:
+            logger.info(f"Ignoring job catalog {self.path}: its last full discovery was {int(age)}s ago")
+            return {}
+
+        self.discovered_at = catalog.get('discovered_at')
+        return catalog.get('jobs', {})
+
+    def save(self, jobs: Dict[str, Any], full_discovery: bool = True) -> None:
+        """Store the catalog; an incremental refresh keeps the loaded full discovery time."""
+        if full_discovery or self.discovered_at is None:
+            self.discovered_at = time.time()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'version': CATALOG_VERSION,
+                    'jenkins_url': self.jenkins_url,
+                    'username': self.username,
+                    'discovered_at': self.discovered_at,
+                    'jobs': jobs,
+                }, f, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to write job catalog {self.path}: {e}")
+
+
+__all__ = ['JobCatalogCache', 'DEFAULT_CACHE_PATH', 'DEFAULT_MAX_AGE']
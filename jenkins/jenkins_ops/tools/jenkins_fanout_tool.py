@@ -0,0 +1,150 @@
+import logging
+from typing import Dict, Any
+from kubiya_sdk.tools import Arg
+from kubiya_sdk.tools.models import FileSpec
+from pydantic import Field
+from pathlib import Path
+import json
+
+from .jenkins_job_tool import JenkinsJobTool
+
+logger = logging.getLogger(__name__)
+
+FANOUT_TOOL_NAME = "jenkins_fanout"
+# Job names listed in the tool description
+MAX_LISTED_JOBS = 50
+
+class JenkinsFanoutTool(JenkinsJobTool):
+    """Tool for triggering several Jenkins builds at once and waiting for all of them."""
+
+    jobs: Dict[str, Any] = Field(default_factory=dict, description="Parameter definitions of the jobs that can be fanned out, by job name")
+
+    def _generate_mermaid_diagram(self) -> str:
+        """Generate a mermaid diagram showing the fan-out execution flow."""
+        return """
+        sequenceDiagram
+            participant U as User
+            participant K as Kubiya
+            participant J as Jenkins
+
+            U->>K: Request builds
+            par Trigger builds
+                K->>J: Queue build 1..N
+            end
+
+            loop Until all builds finish
+                K->>J: Poll queue items and builds
+                J-->>K: Status and new log output
+            end
+
+            K-->>U: Result table
+        """
+
+    def _generate_script_content(self) -> str:
+        """Generate the script content for fan-out execution."""
+        return """#!/bin/sh
+set -e
+
+# Validate environment
+if [ -z "$JENKINS_URL" ]; then
+    echo "❌ JENKINS_URL environment variable is required"
+    exit 1
+fi
+
+if [ -z "$JENKINS_API_TOKEN" ]; then
+    echo "❌ JENKINS_API_TOKEN environment variable is required"
+    exit 1
+fi
+
+# Install dependencies
+pip install -q python-jenkins requests
+
+# Run builds
+python3 /opt/scripts/jenkins_fanout_runner.py
+"""
+
+    def prepare(self) -> None:
+        """Prepare the tool for execution."""
+        try:
+            job_names = sorted(self.jobs)
+            listed_jobs = ', '.join(job_names[:MAX_LISTED_JOBS])
+            if len(job_names) > MAX_LISTED_JOBS:
+                listed_jobs += f" and {len(job_names) - MAX_LISTED_JOBS} more"
+
+            self.args = [
+                Arg(
+                    name="builds",
+                    type="str",
+                    description=(
+                        "JSON list of builds to run, each with a 'job', its 'parameters' and an optional 'label', e.g. "
+                        '[{"job": "deploy", "label": "api", "parameters": {"service": "api"}}, '
+                        '{"job": "deploy", "label": "web", "parameters": {"service": "web"}}]. '
+                        "'job' can be omitted when the job argument is set."
+                    ),
+                    required=True
+                ),
+                Arg(
+                    name="job",
+                    type="str",
+                    description=f"Job to use for builds that do not name one. Available jobs: {listed_jobs}",
+                    required=False
+                ),
+                Arg(
+                    name="fail_fast",
+                    type="bool",
+                    description="Cancel queued builds and abort running ones as soon as one build fails",
+                    required=False
+                ),
+            ]
+            self.args[2].default = "false"
+
+            self.content = self._generate_script_content()
+
+            self.image = "python:3.12"
+
+            # The fan-out runner builds on the single-job runner
+            scripts_dir = Path(__file__).parent.parent / 'scripts'
+            with open(scripts_dir / 'jenkins_fanout_runner.py', 'r') as file:
+                fanout_runner_script = file.read()
+            with open(scripts_dir / 'jenkins_job_runner.py', 'r') as file:
+                jenkins_runner_script = file.read()
+
+            self.with_files = [
+                FileSpec(
+                    destination="/opt/scripts/jenkins_fanout_runner.py",
+                    content=fanout_runner_script
+                ),
+                FileSpec(
+                    destination="/opt/scripts/jenkins_job_runner.py",
+                    content=jenkins_runner_script
+                ),
+                FileSpec(
+                    destination="/tmp/jenkins_fanout_config.json",
+                    content=json.dumps({
+                        'username': self.job_config['auth']['username'],
+                        'stream_logs': self.stream_logs,
+                        'poll_interval': self.poll_interval,
+                        'log_filter': self.log_filter,
+                        'log_highlight': self.log_highlight,
+                        'max_poll_interval': self.max_poll_interval,
+                        'timeout': self.timeout,
+                        'jobs': {
+                            job_name: {
+                                name: {
+                                    'type': param.get('type', 'str'),
+                                    'name': name,
+                                    'original_name': param.get('original_name', name)
+                                }
+                                for name, param in parameters.items()
+                            }
+                            for job_name, parameters in self.jobs.items()
+                        }
+                    })
+                )
+            ]
+
+            logger.debug("Fan-out tool preparation completed successfully")
+
+        except Exception as e:
+            logger.error(f"Failed to prepare fan-out tool: {str(e)}")
+            raise
@@ -16,6 +16,10 @@ class JenkinsJobTool(Tool):
     long_running: bool = True
     poll_interval: int = Field(default=30, description="Interval in seconds to poll job status")
     stream_logs: bool = Field(default=True, description="Stream job logs while running")
+    log_filter: Optional[str] = Field(default=None, description="Regex; only matching console lines are streamed")
+    log_highlight: Optional[str] = Field(default=None, description="Regex; matching console lines are highlighted")
+    max_poll_interval: int = Field(default=60, description="Upper bound in seconds for adaptive status polling")
+    timeout: int = Field(default=21600, description="Seconds to wait for the build to be queued and finish (0 = no limit)")
     
     def __init__(self, **data):
         """Initialize the Jenkins job tool with configuration."""
@@ -143,6 +147,10 @@ python3 /opt/scripts/jenkins_job_runner.py
                         'job_name': self.job_config['name'],
                         'stream_logs': self.stream_logs,
                         'poll_interval': self.poll_interval,
+                        'log_filter': self.log_filter,
+                        'log_highlight': self.log_highlight,
+                        'max_poll_interval': self.max_poll_interval,
+                        'timeout': self.timeout,
                         'parameters': {
                             name: {
                                 'type': parameters[name].get('type', 'str'),
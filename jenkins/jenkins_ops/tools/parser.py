@@ -7,10 +7,40 @@ from urllib.parse import urljoin
 import base64
 import os
 import re
+import time
+from .transport import (
+    AdaptiveConcurrencyLimiter,
+    create_session,
+    DEFAULT_BACKOFF_FACTOR,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_REQUEST_TIMEOUT,
+    OVERLOAD_STATUS_CODES,
+)
 logger = logging.getLogger(__name__)
 
 os.environ['JENKINS_API_TOKEN'] = "KYlJppNVnJQP5K1r"
 
+# Discovery modes: 'tree' fetches the job catalog, including parameter definitions,
+# with a few depth-limited tree API queries; 'per_job' lists folders one request at
+# a time and then fetches every job separately.
+DISCOVERY_MODES = ('tree', 'per_job')
+DEFAULT_TREE_DEPTH = 3
+
+JOB_CLASS_MARKERS = ('WorkflowJob', 'FreeStyleProject', 'Pipeline')
+FOLDER_CLASS_MARKERS = ('Folder', 'WorkflowMultiBranch', 'OrganizationFolder')
+
+# Fields requested for every item of the tree query. Folders simply return no
+# parameter definitions.
+TREE_ITEM_FIELDS = (
+    'name,fullName,url,description,buildable,lastBuild[number],'
+    'healthReport[score,description],'
+    'property[parameterDefinitions[name,description,choices,defaultParameterValue[name,value]]],'
+    'actions[parameterDefinitions[name,description,choices,defaultParameterValue[name,value]]]'
+)
+
+# Fields of the cheap revalidation probe; see job_fingerprint
+PROBE_ITEM_FIELDS = 'name,fullName,url,lastBuild[number]'
+
 class JenkinsJobParser:
     """Parser for Jenkins jobs using direct HTTP requests and JSON API."""
     
@@ -19,19 +49,47 @@ class JenkinsJobParser:
         jenkins_url: str,
         username: str,
         api_token: str,
-        max_workers: int = 4
+        max_workers: int = 4,
+        discovery_mode: str = 'tree',
+        tree_depth: int = DEFAULT_TREE_DEPTH,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        adaptive_concurrency: bool = True
     ):
+        if discovery_mode not in DISCOVERY_MODES:
+            raise ValueError(f"Unknown discovery mode '{discovery_mode}', expected one of: {', '.join(DISCOVERY_MODES)}")
+        if tree_depth < 1:
+            raise ValueError("tree_depth must be at least 1")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
         self.jenkins_url = jenkins_url.rstrip('/')
         self.username = username
         self.api_token = api_token
         self.max_workers = max_workers
+        self.discovery_mode = discovery_mode
+        self.tree_depth = tree_depth
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.request_timeout = request_timeout
         self.warnings = []
         self.errors = []
+        # In-flight requests never exceed max_workers; with adaptive concurrency
+        # the cap shrinks while Jenkins slows down and grows back as it recovers
+        self.limiter = AdaptiveConcurrencyLimiter(
+            max_limit=max_workers,
+            min_limit=1 if adaptive_concurrency else max_workers
+        )
         self.session = self._create_session()
 
     def _create_session(self) -> requests.Session:
-        """Create and configure requests session with authentication."""
-        session = requests.Session()
+        """Create a pooled, retrying requests session with authentication."""
+        session = create_session(
+            pool_size=self.max_workers,
+            max_retries=self.max_retries,
+            backoff_factor=self.backoff_factor
+        )
         auth = base64.b64encode(f"{self.username}:{self.api_token}".encode()).decode()
         session.headers.update({
             'Authorization': f'Basic {auth}',
@@ -42,12 +100,20 @@ class JenkinsJobParser:
     def _make_request(self, endpoint: str, method: str = 'GET', **kwargs) -> Optional[Dict[str, Any]]:
         """Make HTTP request to Jenkins API."""
         url = urljoin(self.jenkins_url, endpoint.lstrip('/'))
+        kwargs.setdefault('timeout', self.request_timeout)
         try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                **kwargs
-            )
+            self.limiter.acquire()
+            started = time.monotonic()
+            overloaded = True
+            try:
+                response = self.session.request(
+                    method=method,
+                    url=url,
+                    **kwargs
+                )
+                overloaded = response.status_code in OVERLOAD_STATUS_CODES
+            finally:
+                self.limiter.release(time.monotonic() - started, overloaded=overloaded)
             response.raise_for_status()
             return response.json() if response.content else None
         except requests.exceptions.RequestException as e:
@@ -150,12 +216,21 @@ class JenkinsJobParser:
         """Process a single Jenkins job."""
         try:
             # Get job info from API
-            info_endpoint = f'{job_url}/api/json?tree=description,url,buildable,property[parameterDefinitions[*]],actions[parameterDefinitions[*]]'
+            info_endpoint = f'{job_url}/api/json?tree=description,url,buildable,lastBuild[number],property[parameterDefinitions[*]],actions[parameterDefinitions[*]]'
             job_info = self._make_request(info_endpoint)
             
             if not job_info:
                 raise Exception("Failed to get job information")
 
+            return self._parse_job_info(job_name, job_info)
+
+        except Exception as e:
+            logger.error(f"Failed to process job {job_name}: {str(e)}")
+            return None
+
+    def _parse_job_info(self, job_name: str, job_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build the job definition from job JSON that includes its parameter definitions."""
+        try:
             # Extract parameters from job properties
             parameters = {}
             param_count = {
@@ -308,6 +383,7 @@ class JenkinsJobParser:
 
             result = {
                 "name": job_name,
+                "fingerprint": self.job_fingerprint(job_info),
                 "description": job_description,
                 "parameters": parameters,
                 "url": job_info.get('url', ''),
@@ -455,6 +531,96 @@ class JenkinsJobParser:
         except Exception:
             return None
 
+    @staticmethod
+    def _is_job_class(item_class: str) -> bool:
+        return any(job_type in item_class for job_type in JOB_CLASS_MARKERS)
+
+    @staticmethod
+    def _is_folder_class(item_class: str) -> bool:
+        return any(folder_type in item_class for folder_type in FOLDER_CLASS_MARKERS)
+
+    @staticmethod
+    def job_fingerprint(job_info: Dict[str, Any]) -> str:
+        """
+        Identify a job revision from fields that the revalidation probe also returns.
+
+        Jenkins exposes no config version through the JSON API. A new build is the
+        point at which pipeline parameter changes take effect, so the last build
+        number stands in for it.
+        """
+        last_build = (job_info.get('lastBuild') or {}).get('number')
+        return f"{job_info.get('_class', '')}|{job_info.get('url', '')}|{last_build}"
+
+    def _tree_projection(self, depth: int, fields: str = TREE_ITEM_FIELDS) -> str:
+        """Build a ``tree=`` projection that nests ``jobs`` ``depth`` levels deep."""
+        projection = f"jobs[{fields}]"
+        for _ in range(depth - 1):
+            projection = f"jobs[{fields},{projection}]"
+        return projection
+
+    def _fetch_job_tree(self, url: str, fields: str = TREE_ITEM_FIELDS) -> List[Dict[str, Any]]:
+        """Fetch up to ``tree_depth`` levels of the job tree below ``url`` in one request."""
+        response = self._make_request(
+            f"{url.rstrip('/')}/api/json",
+            params={'tree': self._tree_projection(self.tree_depth, fields)}
+        )
+        return (response or {}).get('jobs', [])
+
+    def _collect_tree_jobs(
+        self, items: List[Dict[str, Any]], jobs: List[Dict[str, Any]], pending_folders: List[str], level: int = 1
+    ) -> None:
+        """Flatten a tree API response, queueing folders whose children were cut off by the depth limit."""
+        for item in items:
+            item_class = item.get('_class', '')
+            item_name = item.get('name', '')
+
+            if self._is_job_class(item_class):
+                jobs.append({
+                    'name': item_name,
+                    'full_name': item.get('fullName', item_name),
+                    'url': item.get('url', ''),
+                    'class': item_class,
+                    'info': item
+                })
+            elif self._is_folder_class(item_class):
+                if level < self.tree_depth:
+                    self._collect_tree_jobs(item.get('jobs', []), jobs, pending_folders, level + 1)
+                elif item.get('url'):
+                    pending_folders.append(item['url'])
+
+    def _get_all_jobs_tree(self, fields: str = TREE_ITEM_FIELDS) -> List[Dict[str, Any]]:
+        """
+        Discover all jobs together with the item ``fields`` using the tree API.
+
+        The root is fetched first; folders nested deeper than ``tree_depth`` are
+        fetched in follow-up waves, in parallel. A folder whose tree query fails is
+        listed with the per-job path instead, and its jobs carry no inline info.
+        Raises if the root query fails so the caller can fall back entirely.
+        """
+        jobs: List[Dict[str, Any]] = []
+        pending_folders: List[str] = []
+        self._collect_tree_jobs(self._fetch_job_tree(self.jenkins_url, fields), jobs, pending_folders)
+        requests_made = 1
+
+        while pending_folders:
+            logger.info(f"Fetching {len(pending_folders)} nested folders below the tree depth limit")
+            wave, pending_folders = pending_folders, []
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                future_to_folder = {executor.submit(self._fetch_job_tree, folder, fields): folder for folder in wave}
+                for future in as_completed(future_to_folder):
+                    folder = future_to_folder[future]
+                    requests_made += 1
+                    try:
+                        self._collect_tree_jobs(future.result(), jobs, pending_folders)
+                    except Exception as e:
+                        warning_msg = f"Tree query failed for folder {folder}, falling back to per-job discovery: {str(e)}"
+                        logger.warning(warning_msg)
+                        self.warnings.append(warning_msg)
+                        jobs.extend(self._get_all_jobs_recursive(f"{folder.rstrip('/')}/api/json"))
+
+        logger.info(f"Tree discovery found {len(jobs)} jobs in {requests_made} tree requests")
+        return jobs
+
     def _get_all_jobs_recursive(self, url: str = None) -> List[Dict[str, str]]:
         """Recursively get all jobs from Jenkins, including those in folders."""
         try:
@@ -478,7 +644,7 @@ class JenkinsJobParser:
                     logger.debug(f"Processing item: {item_name} ({item_class})")
                     
                     # Handle different job types
-                    if any(job_type in item_class for job_type in ['WorkflowJob', 'FreeStyleProject', 'Pipeline']):
+                    if self._is_job_class(item_class):
                         # Regular job
                         jobs.append({
                             'name': item_name,
@@ -488,7 +654,7 @@ class JenkinsJobParser:
                         })
                         logger.debug(f"Added job: {item_name}")
                         
-                    elif any(folder_type in item_class for folder_type in ['Folder', 'WorkflowMultiBranch', 'OrganizationFolder']):
+                    elif self._is_folder_class(item_class):
                         # Folder or similar container - recurse into it
                         logger.info(f"Recursing into folder: {item_name}")
                         sub_jobs = self._get_all_jobs_recursive(f"{item_url}api/json")
@@ -508,6 +674,50 @@ class JenkinsJobParser:
             self.errors.append(error_msg)
             return []
 
+    def _filter_jobs(
+        self, all_jobs: List[Dict[str, Any]], job_include_filter: List[str], job_exclude_filter: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Apply the include and exclude lists to discovered jobs."""
+        jobs_to_process = all_jobs
+
+        if job_include_filter:
+            jobs_to_process = [
+                job for job in all_jobs
+                if job['full_name'] in job_include_filter
+            ]
+
+        if job_exclude_filter:
+            jobs_to_process = [
+                job for job in jobs_to_process
+                if job['full_name'] not in job_exclude_filter
+            ]
+
+        return jobs_to_process
+
+    def _fetch_job_definitions(self, jobs_to_fetch: List[Dict[str, Any]], jobs_info: Dict[str, Any]) -> None:
+        """Fetch and parse jobs one request each, in parallel, adding them to ``jobs_info``."""
+        if not jobs_to_fetch:
+            return
+        logger.info(f"Fetching {len(jobs_to_fetch)} jobs individually")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_job = {
+                executor.submit(self._process_single_job, job['full_name'], job['url']): job
+                for job in jobs_to_fetch
+            }
+
+            for future in as_completed(future_to_job):
+                job = future_to_job[future]
+                try:
+                    job_info = future.result()
+                    if job_info:
+                        jobs_info[job['full_name']] = job_info
+                        logger.info(f"Successfully processed job: {job['full_name']}")
+                except Exception as e:
+                    error_msg = f"Failed to process job {job['full_name']}: {str(e)}"
+                    logger.error(error_msg)
+                    self.errors.append(error_msg)
+
     def get_jobs(self, job_include_filter: Optional[List[str]] = None, job_exclude_filter: Optional[List[str]] = None) -> Tuple[Dict[str, Any], List[str], List[str]]:
 
         if job_include_filter is None:
@@ -519,31 +729,28 @@ class JenkinsJobParser:
         jobs_info = {}
         
         try:
-            # Get all jobs recursively
-            logger.info("Starting Jenkins job discovery...")
-            all_jobs = self._get_all_jobs_recursive()
+            # Get all jobs, preferring the tree API and falling back to one request per folder
+            logger.info(f"Starting Jenkins job discovery ({self.discovery_mode} mode)...")
+            all_jobs = None
+            if self.discovery_mode == 'tree':
+                try:
+                    all_jobs = self._get_all_jobs_tree()
+                except Exception as e:
+                    warning_msg = f"Tree API discovery failed, falling back to per-job discovery: {str(e)}"
+                    logger.warning(warning_msg)
+                    self.warnings.append(warning_msg)
+            if all_jobs is None:
+                all_jobs = self._get_all_jobs_recursive()
             
             if not all_jobs:
                 logger.warning("No jobs found in Jenkins")
                 self.warnings.append("No jobs were found in Jenkins server")
                 return {}, self.warnings, self.errors
 
-            logger.info(f"Found {len(all_jobs)} total jobs: {all_jobs}")
+            logger.info(f"Found {len(all_jobs)} total jobs: {[job['full_name'] for job in all_jobs]}")
             
             # Filter jobs if needed
-            jobs_to_process = all_jobs
-
-            if job_include_filter:
-                jobs_to_process = [
-                job for job in all_jobs
-                if job['full_name'] in job_include_filter
-            ]
-
-            if job_exclude_filter:
-                jobs_to_process = [
-                    job for job in jobs_to_process
-                    if job['full_name'] not in job_exclude_filter
-                ]
+            jobs_to_process = self._filter_jobs(all_jobs, job_include_filter, job_exclude_filter)
 
             if job_include_filter and not jobs_to_process:
                 warning_msg = f"No jobs matched the filter: {job_include_filter}"
@@ -553,24 +760,20 @@ class JenkinsJobParser:
 
             logger.info(f"Processing {len(jobs_to_process)} jobs after filtering")
 
-            # Process jobs in parallel
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                future_to_job = {
-                    executor.submit(self._process_single_job, job['full_name'], job['url']): job
-                    for job in jobs_to_process
-                }
+            # Jobs discovered through the tree API already carry their parameter definitions
+            jobs_to_fetch = []
+            for job in jobs_to_process:
+                if job.get('info') is None:
+                    jobs_to_fetch.append(job)
+                    continue
+                job_info = self._parse_job_info(job['full_name'], job['info'])
+                if job_info:
+                    jobs_info[job['full_name']] = job_info
+                else:
+                    jobs_to_fetch.append(job)
 
-                for future in as_completed(future_to_job):
-                    job = future_to_job[future]
-                    try:
-                        job_info = future.result()
-                        if job_info:
-                            jobs_info[job['full_name']] = job_info
-                            logger.info(f"Successfully processed job: {job['full_name']}")
-                    except Exception as e:
-                        error_msg = f"Failed to process job {job['full_name']}: {str(e)}"
-                        logger.error(error_msg)
-                        self.errors.append(error_msg)
+            # Process remaining jobs in parallel
+            self._fetch_job_definitions(jobs_to_fetch, jobs_info)
 
         except Exception as e:
             error_msg = f"Failed to get jobs: {str(e)}"
@@ -581,4 +784,62 @@ class JenkinsJobParser:
             self.errors.append("No jobs were found or all jobs failed to process")
 
         logger.info(f"Completed job discovery. Found {len(jobs_info)} valid jobs")
-        return jobs_info, self.warnings, self.errors
\ No newline at end of file
+        return jobs_info, self.warnings, self.errors
+
+    def refresh_jobs(
+        self,
+        cached_jobs: Dict[str, Any],
+        job_include_filter: Optional[List[str]] = None,
+        job_exclude_filter: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, Any], List[str], List[str]]:
+        """
+        Revalidate a previously parsed job catalog against Jenkins.
+
+        A single light tree probe lists every job with its last build. Jobs whose
+        fingerprint matches the cached entry are reused as-is. New and changed jobs
+        are fetched individually, and jobs no longer in Jenkins are dropped. A changed
+        job that fails to fetch keeps its cached definition. Raises if the probe
+        itself fails, so the caller can run a full discovery instead.
+        """
+        job_include_filter = job_include_filter or []
+        job_exclude_filter = job_exclude_filter or []
+
+        logger.info(f"Revalidating {len(cached_jobs)} cached Jenkins jobs...")
+        all_jobs = self._get_all_jobs_tree(PROBE_ITEM_FIELDS)
+        jobs_to_process = self._filter_jobs(all_jobs, job_include_filter, job_exclude_filter)
+
+        if job_include_filter and not jobs_to_process:
+            warning_msg = f"No jobs matched the filter: {job_include_filter}"
+            logger.warning(warning_msg)
+            self.warnings.append(warning_msg)
+            return {}, self.warnings, self.errors
+
+        jobs_info = {}
+        changed_jobs = []
+        for job in jobs_to_process:
+            cached = cached_jobs.get(job['full_name'])
+            if (
+                cached and job.get('info') is not None
+                and cached.get('fingerprint') == self.job_fingerprint(job['info'])
+            ):
+                jobs_info[job['full_name']] = cached
+            else:
+                changed_jobs.append(job)
+
+        logger.info(
+            f"{len(jobs_info)} cached jobs are current, {len(changed_jobs)} are new or changed, "
+            f"{len(set(cached_jobs) - {job['full_name'] for job in jobs_to_process})} were removed"
+        )
+        self._fetch_job_definitions(changed_jobs, jobs_info)
+
+        for job in changed_jobs:
+            if job['full_name'] not in jobs_info and job['full_name'] in cached_jobs:
+                warning_msg = f"Using cached definition for job {job['full_name']}, refresh failed"
+                logger.warning(warning_msg)
+                self.warnings.append(warning_msg)
+                jobs_info[job['full_name']] = cached_jobs[job['full_name']]
+
+        if not jobs_info and not self.errors:
+            self.errors.append("No jobs were found or all jobs failed to process")
+
+        return jobs_info, self.warnings, self.errors
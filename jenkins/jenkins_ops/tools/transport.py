@@ -0,0 +1,138 @@
+import logging
+import threading
+from typing import Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_REQUEST_TIMEOUT = 30  # seconds
+
+# Responses from a busy or restarting controller that are worth retrying
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Only idempotent requests are retried
+RETRY_METHODS = frozenset(['GET', 'HEAD'])
+# Status codes that indicate the controller is overloaded
+OVERLOAD_STATUS_CODES = (429, 503)
+
+
+def create_session(
+    pool_size: int,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+    retry_status_codes: Iterable[int] = RETRY_STATUS_CODES
+) -> requests.Session:
+    """
+    Create a requests session sized for ``pool_size`` concurrent requests.
+
+    Idempotent requests are retried with exponential backoff on connection errors
+    and on the status codes in ``retry_status_codes``. A ``Retry-After`` header is
+    honored. Once retries are exhausted, the last response is returned so the caller
+    can raise a normal HTTP error.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=tuple(retry_status_codes),
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Caps the number of in-flight requests and adapts the cap to Jenkins latency.
+
+    The limit grows by one after each window of ``limit`` healthy requests
+    (additive increase). It is halved when a request takes more than
+    ``latency_tolerance`` times the baseline latency, fails, or is rejected as
+    overloaded (multiplicative decrease). After a decrease, the limit is not cut
+    again until a full window of requests has completed, so one burst of slow
+    responses does not collapse it to the minimum. The baseline is a slowly
+    rising minimum of observed latencies, so it follows a server that is
+    permanently slower.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: Optional[int] = None,
+        latency_tolerance: float = 2.0,
+        baseline_drift: float = 1.01
+    ):
+        if max_limit < 1:
+            raise ValueError("max_limit must be at least 1")
+        self.max_limit = max_limit
+        self.min_limit = max(1, min(min_limit, max_limit))
+        self.limit = min(max_limit, max(self.min_limit, initial_limit or max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.baseline_drift = baseline_drift
+        self.baseline: Optional[float] = None
+        self._in_flight = 0
+        self._window = 0
+        self._cooldown = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        """Release a slot, recording the request's latency and whether it failed."""
+        with self._condition:
+            self._in_flight -= 1
+            slow = False
+            if not overloaded:
+                if self.baseline is None:
+                    self.baseline = latency
+                else:
+                    slow = latency > self.baseline * self.latency_tolerance
+                    self.baseline = min(latency, self.baseline * self.baseline_drift)
+
+            if self._cooldown > 0:
+                self._cooldown -= 1
+
+            if overloaded or slow:
+                if self._cooldown == 0 and self.limit > self.min_limit:
+                    self.limit = max(self.min_limit, self.limit // 2)
+                    self._cooldown = self.limit
+                    self._window = 0
+                    logger.info(
+                        f"Jenkins is {'overloaded' if overloaded else 'slowing down'} "
+                        f"({latency:.2f}s), reducing request concurrency to {self.limit}"
+                    )
+            else:
+                self._window += 1
+                if self._window >= self.limit and self.limit < self.max_limit:
+                    self.limit += 1
+                    self._window = 0
+                    logger.debug(f"Increasing Jenkins request concurrency to {self.limit}")
+
+            self._condition.notify_all()
+
+
+__all__ = [
+    'AdaptiveConcurrencyLimiter',
+    'create_session',
+    'DEFAULT_BACKOFF_FACTOR',
+    'DEFAULT_MAX_RETRIES',
+    'DEFAULT_REQUEST_TIMEOUT',
+    'OVERLOAD_STATUS_CODES',
+]
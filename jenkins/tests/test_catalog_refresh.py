@@ -0,0 +1,190 @@
+import unittest
+import os
+import json
+import time
+import tempfile
+from unittest.mock import patch
+
+import requests
+
+from jenkins_ops.tools.parser import JenkinsJobParser
+from jenkins_ops.tools.catalog_cache import JobCatalogCache, CATALOG_VERSION
+
+JENKINS_URL = "http://jenkins.example.com"
+JOB_CLASS = "org.jenkinsci.plugins.workflow.job.WorkflowJob"
+
+
+class FakeJenkins:
+    """Answers JenkinsJobParser._make_request from an in-memory job list."""
+
+    def __init__(self, jobs):
+        # full name -> last build number
+        self.jobs = dict(jobs)
+        self.failing = set()
+        self.detail_requests = []
+
+    def job_url(self, full_name):
+        return f"{JENKINS_URL}/job/{full_name}/"
+
+    def item(self, full_name):
+        return {
+            "_class": JOB_CLASS,
+            "name": full_name,
+            "fullName": full_name,
+            "url": self.job_url(full_name),
+            "lastBuild": {"number": self.jobs[full_name]},
+        }
+
+    def make_request(self, endpoint, method='GET', **kwargs):
+        if endpoint == f"{JENKINS_URL}/api/json":
+            # Root listing, or the tree probe when it carries a tree= projection
+            return {"jobs": [self.item(name) for name in self.jobs]}
+        full_name = next(name for name in self.jobs if endpoint.startswith(self.job_url(name)))
+        self.detail_requests.append(full_name)
+        if full_name in self.failing:
+            raise requests.exceptions.HTTPError("500 Server Error")
+        return dict(self.item(full_name), property=[{
+            "parameterDefinitions": [{
+                "_class": "hudson.model.StringParameterDefinition",
+                "name": "BRANCH",
+                "description": f"build {self.jobs[full_name]}",
+                "defaultParameterValue": {"name": "BRANCH", "value": "main"},
+            }]
+        }])
+
+
+class TestRefreshJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.jenkins = FakeJenkins({"api": 1, "web": 7, "worker": 3})
+        self.parser = self._parser()
+        self.cached, _, errors = self.parser.get_jobs()
+        self.assertEqual(errors, [])
+        self.jenkins.detail_requests.clear()
+
+    def _parser(self):
+        parser = JenkinsJobParser(JENKINS_URL, "user", "token", discovery_mode='per_job')
+        patcher = patch.object(parser, '_make_request', side_effect=self.jenkins.make_request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return parser
+
+    def test_unchanged_jobs_are_reused_without_fetching(self):
+        jobs, warnings, errors = self._parser().refresh_jobs(self.cached)
+
+        self.assertEqual(jobs, self.cached)
+        self.assertEqual(self.jenkins.detail_requests, [])
+        self.assertEqual((warnings, errors), ([], []))
+
+    def test_new_build_refetches_only_that_job(self):
+        self.jenkins.jobs["web"] = 8
+
+        jobs, _, _ = self._parser().refresh_jobs(self.cached)
+
+        self.assertEqual(self.jenkins.detail_requests, ["web"])
+        self.assertNotEqual(jobs["web"]["fingerprint"], self.cached["web"]["fingerprint"])
+        self.assertIn("build 8", jobs["web"]["parameters"]["branch"]["description"])
+        self.assertIs(jobs["api"], self.cached["api"])
+
+    def test_new_job_is_fetched(self):
+        self.jenkins.jobs["docs"] = 1
+
+        jobs, _, _ = self._parser().refresh_jobs(self.cached)
+
+        self.assertEqual(self.jenkins.detail_requests, ["docs"])
+        self.assertEqual(sorted(jobs), ["api", "docs", "web", "worker"])
+
+    def test_removed_jobs_are_dropped_and_counted(self):
+        del self.jenkins.jobs["worker"]
+
+        with self.assertLogs("jenkins_ops.tools.parser", level="INFO") as logs:
+            jobs, _, _ = self._parser().refresh_jobs(self.cached)
+
+        self.assertEqual(sorted(jobs), ["api", "web"])
+        self.assertTrue(any("2 cached jobs are current, 0 are new or changed, 1 were removed" in line
+                            for line in logs.output))
+
+    def test_failed_fetch_keeps_cached_definition(self):
+        self.jenkins.jobs["web"] = 8
+        self.jenkins.failing.add("web")
+
+        jobs, warnings, _ = self._parser().refresh_jobs(self.cached)
+
+        self.assertEqual(jobs["web"], self.cached["web"])
+        self.assertTrue(any("Using cached definition for job web" in warning for warning in warnings))
+
+    def test_filters_apply_to_refresh(self):
+        jobs, _, _ = self._parser().refresh_jobs(self.cached, job_exclude_filter=["api"])
+
+        self.assertEqual(sorted(jobs), ["web", "worker"])
+
+    def test_probe_failure_raises(self):
+        parser = JenkinsJobParser(JENKINS_URL, "user", "token")
+        with patch.object(parser, '_make_request', side_effect=requests.exceptions.ConnectionError("down")):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                parser.refresh_jobs(self.cached)
+
+
+class TestJobCatalogCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "catalog.json")
+        self.jobs = {"api": {"name": "api", "fingerprint": "x"}}
+
+    def _cache(self, **kwargs):
+        return JobCatalogCache(kwargs.pop('jenkins_url', JENKINS_URL), kwargs.pop('username', "user"),
+                               path=self.path, **kwargs)
+
+    def test_round_trip(self):
+        self._cache().save(self.jobs)
+
+        self.assertEqual(self._cache().load(), self.jobs)
+
+    def test_missing_or_corrupt_catalog_is_empty(self):
+        self.assertEqual(self._cache().load(), {})
+        with open(self.path, 'w') as f:
+            f.write("{not json")
+        self.assertEqual(self._cache().load(), {})
+
+    def test_other_server_user_or_version_is_ignored(self):
+        self._cache().save(self.jobs)
+
+        self.assertEqual(self._cache(jenkins_url="http://other.example.com").load(), {})
+        self.assertEqual(self._cache(username="someone-else").load(), {})
+
+        with open(self.path) as f:
+            catalog = json.load(f)
+        catalog['version'] = CATALOG_VERSION + 1
+        with open(self.path, 'w') as f:
+            json.dump(catalog, f)
+        self.assertEqual(self._cache().load(), {})
+
+    def test_catalog_older_than_max_age_is_ignored(self):
+        with patch("jenkins_ops.tools.catalog_cache.time.time", return_value=time.time() - 120):
+            self._cache().save(self.jobs)
+
+        self.assertEqual(self._cache(max_age=60).load(), {})
+        self.assertEqual(self._cache(max_age=600).load(), self.jobs)
+        self.assertEqual(self._cache(max_age=0).load(), self.jobs)
+
+    def test_incremental_save_keeps_full_discovery_time(self):
+        with patch("jenkins_ops.tools.catalog_cache.time.time", return_value=time.time() - 120):
+            self._cache().save(self.jobs)
+
+        cache = self._cache(max_age=600)
+        cache.load()
+        discovered_at = cache.discovered_at
+        cache.save(self.jobs, full_discovery=False)
+        self.assertEqual(self._cache(max_age=600).load(), self.jobs)
+        reloaded = self._cache(max_age=600)
+        reloaded.load()
+        self.assertEqual(reloaded.discovered_at, discovered_at)
+
+        cache.save(self.jobs, full_discovery=True)
+        self.assertGreater(cache.discovered_at, discovered_at)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,300 @@
+import unittest
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+# The runner scripts are shipped as standalone files and import each other by module name
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'jenkins_ops', 'scripts')))
+
+import jenkins_fanout_runner
+import jenkins_job_runner
+from jenkins_fanout_runner import JenkinsFanoutRunner, CANCELLED, TRIGGER_FAILED, TIMED_OUT, get_builds_from_env
+from jenkins_job_runner import LOG_DRAIN_ATTEMPTS
+
+
+class FakeClock:
+    """Stands in for the time module so polling loops run without waiting."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0.01)
+
+
+class FakeJenkinsServer:
+    """A python-jenkins stand-in where each build is described by a small script.
+
+    ``plans`` maps a job name to a list of (queue_polls, build_polls, result): the
+    build waits ``queue_polls`` queue checks before starting, and reports
+    ``result`` after ``build_polls`` status checks. A ``None`` result cancels the
+    queue item instead of starting it. Each build_job call takes the next plan
+    for its job.
+    """
+
+    def __init__(self, plans):
+        self.plans = {job: list(job_plans) for job, job_plans in plans.items()}
+        self.queue = {}
+        self.builds = {}
+        self.cancelled_queue_ids = []
+        self.stopped_builds = []
+        self.failing_jobs = set()
+        self._next_queue_id = 1
+        self._next_build_number = {}
+
+    def build_job(self, job_name, parameters=None):
+        if job_name in self.failing_jobs:
+            raise RuntimeError(f"job {job_name} does not exist")
+        queue_polls, build_polls, result = self.plans[job_name].pop(0)
+        queue_id = self._next_queue_id
+        self._next_queue_id += 1
+        self.queue[queue_id] = {
+            'job': job_name, 'polls_left': queue_polls, 'build_polls': build_polls,
+            'result': result, 'parameters': parameters, 'cancelled': False, 'number': None
+        }
+        return queue_id
+
+    def get_queue_item(self, queue_id):
+        item = self.queue[queue_id]
+        if item['cancelled']:
+            return {'cancelled': True}
+        if item['number'] is None:
+            if item['polls_left'] > 0:
+                item['polls_left'] -= 1
+                return {'why': 'Waiting for next available executor'}
+            if item['result'] is None:
+                item['cancelled'] = True
+                return {'cancelled': True}
+            number = self._next_build_number.get(item['job'], 1)
+            self._next_build_number[item['job']] = number + 1
+            item['number'] = number
+            self.builds[(item['job'], number)] = {'polls_left': item['build_polls'], 'result': item['result']}
+        return {'executable': {'number': item['number']}}
+
+    def get_build_info(self, job_name, number):
+        build = self.builds[(job_name, number)]
+        url = f"http://jenkins.example.com/job/{job_name}/{number}/"
+        if build['polls_left'] > 0:
+            build['polls_left'] -= 1
+            return {'result': None, 'url': url, 'timestamp': 0}
+        return {'result': build['result'], 'url': url, 'timestamp': 0}
+
+    def cancel_queue(self, queue_id):
+        self.cancelled_queue_ids.append(queue_id)
+        self.queue[queue_id]['cancelled'] = True
+
+    def stop_build(self, job_name, number):
+        self.stopped_builds.append((job_name, number))
+        build = self.builds[(job_name, number)]
+        build['polls_left'] = 0
+        build['result'] = 'ABORTED'
+
+    def jenkins_open(self, request):
+        raise RuntimeError("no build history")
+
+
+class TestJenkinsFanoutRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch.object(jenkins_fanout_runner, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _runner(self, server, builds, **kwargs):
+        kwargs.setdefault('stream_logs', False)
+        kwargs.setdefault('poll_interval', 5)
+        kwargs.setdefault('job_parameters', {build['job']: {} for build in builds})
+        return JenkinsFanoutRunner(
+            server=server,
+            jenkins_url="http://jenkins.example.com",
+            username="user",
+            api_token="token",
+            builds=builds,
+            **kwargs
+        )
+
+    def _run(self, runner):
+        with redirect_stdout(io.StringIO()):
+            return {build.label: build for build in runner.run()}
+
+    def test_all_builds_finish(self):
+        server = FakeJenkinsServer({
+            'deploy': [(1, 2, 'SUCCESS'), (3, 0, 'SUCCESS')],
+            'test': [(0, 4, 'UNSTABLE')],
+        })
+        runner = self._runner(server, [
+            {'job': 'deploy', 'parameters': {'service': 'api'}},
+            {'job': 'deploy', 'parameters': {'service': 'web'}},
+            {'job': 'test', 'label': 'tests'},
+        ])
+
+        builds = self._run(runner)
+
+        self.assertEqual(
+            {label: build.status for label, build in builds.items()},
+            {'deploy#1': 'SUCCESS', 'deploy#2': 'SUCCESS', 'tests': 'UNSTABLE'}
+        )
+        self.assertEqual(builds['deploy#2'].build_number, 2)
+        self.assertEqual(builds['tests'].url, "http://jenkins.example.com/job/test/1/")
+        self.assertEqual(server.queue[1]['parameters'], {'service': 'api'})
+        self.assertEqual(server.cancelled_queue_ids, [])
+
+    def test_trigger_failure_does_not_stop_other_builds(self):
+        server = FakeJenkinsServer({'deploy': [(0, 1, 'SUCCESS')]})
+        server.failing_jobs.add('missing')
+        runner = self._runner(server, [{'job': 'deploy'}, {'job': 'missing'}])
+
+        builds = self._run(runner)
+
+        self.assertEqual(builds['deploy'].status, 'SUCCESS')
+        self.assertEqual(builds['missing'].status, TRIGGER_FAILED)
+        self.assertIn('does not exist', builds['missing'].error)
+
+    def test_unconfigured_job_is_never_triggered(self):
+        server = FakeJenkinsServer({'deploy': [(0, 1, 'SUCCESS')], 'drop-db': [(0, 0, 'SUCCESS')]})
+        runner = self._runner(
+            server, [{'job': 'deploy'}, {'job': 'drop-db'}], job_parameters={'deploy': {}}
+        )
+
+        builds = self._run(runner)
+
+        self.assertEqual(builds['deploy'].status, 'SUCCESS')
+        self.assertEqual(builds['drop-db'].status, TRIGGER_FAILED)
+        self.assertIn('not configured', builds['drop-db'].error)
+        self.assertEqual([item['job'] for item in server.queue.values()], ['deploy'])
+
+    def test_get_builds_from_env_rejects_unconfigured_jobs(self):
+        env = {'builds': '[{"job": "deploy"}, {"job": "drop-db"}]', 'job': ''}
+        with patch.dict(os.environ, env):
+            with self.assertRaisesRegex(ValueError, 'drop-db'):
+                get_builds_from_env({'deploy': {}})
+            builds, fail_fast = get_builds_from_env({'deploy': {}, 'drop-db': {}})
+        self.assertEqual([build['job'] for build in builds], ['deploy', 'drop-db'])
+        self.assertFalse(fail_fast)
+
+    def test_log_tail_is_drained_without_blocking_other_builds(self):
+        server = FakeJenkinsServer({'quick': [(0, 0, 'SUCCESS')], 'slow': [(0, 3, 'SUCCESS')]})
+        runner = self._runner(server, [{'job': 'quick'}, {'job': 'slow'}], stream_logs=True)
+        quick, slow = runner.builds
+        # The tail of quick's log only appears a few fetches after it finished
+        chunks = ['', '', 'done\n', '']
+        fetched = []
+
+        def quick_logs(build_number, start=0):
+            fetched.append(self.clock.now)
+            text = chunks.pop(0) if chunks else ''
+            return text, start + len(text), bool(chunks)
+        quick.runner.get_build_logs = quick_logs
+        slow.runner.get_build_logs = lambda build_number, start=0: ('', start, False)
+
+        def blocking_sleep(seconds):
+            self.fail("log drain slept inside the poll loop")
+        with patch.object(jenkins_job_runner.time, 'sleep', blocking_sleep), redirect_stdout(io.StringIO()) as out:
+            builds = {build.label: build for build in runner.run()}
+
+        self.assertEqual(builds['quick'].status, 'SUCCESS')
+        self.assertEqual(builds['slow'].status, 'SUCCESS')
+        self.assertIn('done', out.getvalue())
+        self.assertEqual(len(fetched), 4)
+        # Fetches without new output wait for a later poll instead of retrying at once
+        self.assertGreater(fetched[-1], fetched[0])
+
+    def test_log_drain_is_bounded(self):
+        server = FakeJenkinsServer({'deploy': [(0, 0, 'FAILURE')]})
+        runner = self._runner(server, [{'job': 'deploy'}], stream_logs=True)
+        build = runner.builds[0]
+        build.runner.get_build_logs = lambda build_number, start=0: ('', start, True)
+
+        builds = self._run(runner)
+
+        self.assertEqual(builds['deploy'].status, 'FAILURE')
+        self.assertEqual(build.drain_attempts, LOG_DRAIN_ATTEMPTS)
+
+    def test_build_cancelled_in_queue(self):
+        server = FakeJenkinsServer({'deploy': [(2, 0, None)]})
+        runner = self._runner(server, [{'job': 'deploy'}])
+
+        builds = self._run(runner)
+
+        self.assertEqual(builds['deploy'].status, CANCELLED)
+
+    def test_fail_fast_cancels_queued_and_stops_running_builds(self):
+        server = FakeJenkinsServer({
+            'lint': [(0, 0, 'FAILURE')],
+            'deploy': [(0, 50, 'SUCCESS')],
+            'e2e': [(1000, 0, 'SUCCESS')],
+        })
+        runner = self._runner(server, [{'job': 'lint'}, {'job': 'deploy'}, {'job': 'e2e'}], fail_fast=True)
+
+        builds = self._run(runner)
+
+        self.assertEqual(builds['lint'].status, 'FAILURE')
+        self.assertEqual(builds['deploy'].status, 'ABORTED')
+        self.assertEqual(builds['e2e'].status, CANCELLED)
+        self.assertEqual(server.stopped_builds, [('deploy', 1)])
+        self.assertEqual(server.cancelled_queue_ids, [builds['e2e'].queue_id])
+
+    def test_without_fail_fast_other_builds_continue(self):
+        server = FakeJenkinsServer({
+            'lint': [(0, 0, 'FAILURE')],
+            'deploy': [(0, 3, 'SUCCESS')],
+        })
+        runner = self._runner(server, [{'job': 'lint'}, {'job': 'deploy'}])
+
+        builds = self._run(runner)
+
+        self.assertEqual(builds['deploy'].status, 'SUCCESS')
+        self.assertEqual(server.stopped_builds, [])
+
+    def test_deadline_times_out_pending_builds(self):
+        server = FakeJenkinsServer({
+            'quick': [(0, 0, 'SUCCESS')],
+            'slow': [(0, 10 ** 6, 'SUCCESS')],
+        })
+        runner = self._runner(server, [{'job': 'quick'}, {'job': 'slow'}], timeout=120)
+
+        builds = self._run(runner)
+
+        self.assertEqual(builds['quick'].status, 'SUCCESS')
+        self.assertEqual(builds['slow'].status, TIMED_OUT)
+        self.assertLessEqual(self.clock.now, 1000.0 + 120 + 5)
+
+    def test_abort_remaining_skips_finished_builds_and_survives_errors(self):
+        server = FakeJenkinsServer({'a': [(0, 0, 'FAILURE')], 'b': [(10, 0, 'SUCCESS')], 'c': [(0, 10, 'SUCCESS')]})
+        runner = self._runner(server, [{'job': 'a'}, {'job': 'b'}, {'job': 'c'}])
+        a, b, c = runner.builds
+        for build in runner.builds:
+            runner._queue(build)
+        a.status, a.build_number = 'FAILURE', 1
+        c.build_number, _ = c.runner.check_queue_item(c.queue_id)
+
+        def stop_build(job_name, number):
+            raise RuntimeError("permission denied")
+        server.stop_build = stop_build
+
+        with redirect_stdout(io.StringIO()), self.assertLogs('jenkins_fanout_runner', level='WARNING') as logs:
+            runner._abort_remaining()
+
+        self.assertEqual(a.status, 'FAILURE')
+        self.assertEqual(b.status, CANCELLED)
+        self.assertEqual(server.cancelled_queue_ids, [b.queue_id])
+        self.assertIsNone(c.status)
+        self.assertTrue(c.aborting)
+        self.assertTrue(any('Failed to abort c' in line for line in logs.output))
+
+        # Already aborting builds are not aborted twice
+        server.stop_build = lambda job_name, number: self.fail("stop_build called twice")
+        runner._abort_remaining()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import threading
+
+from jenkins_ops.tools.transport import (
+    AdaptiveConcurrencyLimiter,
+    create_session,
+    RETRY_STATUS_CODES,
+)
+
+
+def complete(limiter, latency, overloaded=False, count=1):
+    """Run ``count`` requests through the limiter, one after another."""
+    for _ in range(count):
+        limiter.acquire()
+        limiter.release(latency, overloaded=overloaded)
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+
+    def test_starts_at_max_limit(self):
+        self.assertEqual(AdaptiveConcurrencyLimiter(max_limit=8).limit, 8)
+        self.assertEqual(AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=3).limit, 3)
+
+    def test_rejects_invalid_max_limit(self):
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrencyLimiter(max_limit=0)
+
+    def test_acquire_blocks_at_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=2)
+        limiter.acquire()
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def waiter():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+        limiter.release(0.1)
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+
+    def test_slow_request_halves_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=8)
+        complete(limiter, 0.1)
+        self.assertEqual(limiter.baseline, 0.1)
+
+        complete(limiter, 0.5)
+
+        self.assertEqual(limiter.limit, 4)
+
+    def test_latency_within_tolerance_does_not_decrease(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=8, latency_tolerance=2.0)
+        complete(limiter, 0.1)
+        complete(limiter, 0.19, count=5)
+
+        self.assertEqual(limiter.limit, 8)
+
+    def test_overload_halves_limit_without_touching_baseline(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=8)
+        complete(limiter, 0.1)
+
+        complete(limiter, 0.01, overloaded=True)
+
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.baseline, 0.1)
+
+    def test_cooldown_prevents_repeated_decrease(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=16)
+        complete(limiter, 0.1)
+        complete(limiter, 1.0)
+        self.assertEqual(limiter.limit, 8)
+
+        # The rest of the burst is absorbed until a window of `limit` requests has completed
+        complete(limiter, 1.0, overloaded=True, count=7)
+        self.assertEqual(limiter.limit, 8)
+
+        complete(limiter, 1.0, overloaded=True)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_never_drops_below_min_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=8, min_limit=3)
+        for _ in range(10):
+            complete(limiter, 1.0, overloaded=True, count=limiter.limit + 1)
+
+        self.assertEqual(limiter.limit, 3)
+
+    def test_healthy_window_increases_limit_up_to_max(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=6, initial_limit=4)
+        complete(limiter, 0.1)
+        complete(limiter, 0.1, count=3)
+        self.assertEqual(limiter.limit, 5)
+
+        complete(limiter, 0.1, count=5)
+        self.assertEqual(limiter.limit, 6)
+
+        complete(limiter, 0.1, count=20)
+        self.assertEqual(limiter.limit, 6)
+
+    def test_fixed_limit_when_min_equals_max(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=4, min_limit=4)
+        complete(limiter, 0.1)
+        complete(limiter, 5.0, overloaded=True, count=10)
+
+        self.assertEqual(limiter.limit, 4)
+
+    def test_baseline_drifts_up_with_a_slower_server(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=4, baseline_drift=1.5)
+        complete(limiter, 0.1)
+        complete(limiter, 0.14, count=3)
+
+        self.assertAlmostEqual(limiter.baseline, 0.14)
+
+
+class TestCreateSession(unittest.TestCase):
+
+    def test_mounts_retrying_adapter(self):
+        session = create_session(pool_size=5, max_retries=4, backoff_factor=0.25)
+
+        for prefix in ('http://', 'https://'):
+            adapter = session.get_adapter(f"{prefix}jenkins.example.com")
+            retry = adapter.max_retries
+            self.assertEqual(retry.total, 4)
+            self.assertEqual(retry.backoff_factor, 0.25)
+            self.assertEqual(set(retry.status_forcelist), set(RETRY_STATUS_CODES))
+            self.assertTrue(retry.respect_retry_after_header)
+            self.assertFalse(retry.raise_on_status)
+            self.assertEqual(adapter._pool_maxsize, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
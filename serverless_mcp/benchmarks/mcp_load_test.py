@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+"""
+Local load test for the serverless MCP tool invocation path.
+
+Starts a fastmcp stand-in server with synthetic tools, then calls it at a
+controlled concurrency through one of these paths:
+
+    script   - the generated direct client script, one Python process per call
+               (what a Kubiya tool invocation runs, minus the container)
+    gateway  - the generated gateway client script, through a local gateway.py
+    client   - an in-process fastmcp Client with a new session per call
+    session  - one reused in-process session (the transport floor)
+
+Reports server cold start, p50/p95/p99 call latency and throughput. No cluster
+is needed:
+
+    python serverless_mcp/benchmarks/mcp_load_test.py --mode script --calls 100 --concurrency 8
+    python serverless_mcp/benchmarks/mcp_load_test.py --mode session,client --delay-ms 50 --json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import logging
+import argparse
+import tempfile
+import subprocess
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+GATEWAY_SCRIPT = os.path.join(REPO_ROOT, 'serverless_mcp', 'serverless_mcp_tools', 'gateway.py')
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODES = ("script", "gateway", "client", "session")
+STAND_IN_SERVER_ID = "loadtest"
+# Parameters of the synthetic "echo" tool, in the shape discovery produces
+ECHO_TOOL_PARAMS = [
+    {"name": "text", "type": "string", "required": False},
+    {"name": "delay_ms", "type": "integer", "required": False},
+    {"name": "payload_bytes", "type": "integer", "required": False},
+]
+
+
+# -------------------------------------------------------------------------------------
+# Stand-in server
+# -------------------------------------------------------------------------------------
+
+def serve(port: int, extra_tools: int) -> None:
+    """Runs the stand-in MCP server (invoked as a subprocess with --serve)."""
+    from fastmcp import FastMCP, Context
+
+    mcp = FastMCP("loadtest-stand-in")
+
+    @mcp.tool()
+    async def echo(text: str = "", delay_ms: int = 0, payload_bytes: int = 0) -> str:
+        """Returns the text, optionally after a delay and padded to payload_bytes."""
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+        return text + "x" * max(payload_bytes - len(text), 0)
+
+    @mcp.tool()
+    async def progress(ctx: Context, steps: int = 5, delay_ms: int = 10) -> str:
+        """Reports progress for each step."""
+        for step in range(steps):
+            await asyncio.sleep(delay_ms / 1000)
+            await ctx.report_progress(step + 1, steps)
+        return f"done after {steps} steps"
+
+    # Additional no-op tools make the server's tool list resemble a large real server
+    for index in range(extra_tools):
+        def make_tool(index: int) -> Callable[..., str]:
+            def synthetic(value: str = "") -> str:
+                return value
+            synthetic.__name__ = f"synthetic_{index}"
+            synthetic.__doc__ = f"Synthetic tool {index}."
+            return synthetic
+        mcp.tool()(make_tool(index))
+
+    mcp.run(transport="streamable-http", host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process exited with code {process.returncode} before listening on port {port}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout:.0f}s")
+
+
+def _stop(process: Optional[subprocess.Popen]) -> None:
+    if process is not None and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# -------------------------------------------------------------------------------------
+# Measurement
+# -------------------------------------------------------------------------------------
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(mode: str, latencies_ms: List[float], errors: int, wall_seconds: float,
+              concurrency: int, cold_start_ms: Optional[float]) -> Dict[str, Any]:
+    ordered = sorted(latencies_ms)
+    calls = len(latencies_ms) + errors
+    return {
+        "mode": mode,
+        "calls": calls,
+        "errors": errors,
+        "concurrency": concurrency,
+        "cold_start_ms": round(cold_start_ms, 1) if cold_start_ms is not None else None,
+        "p50_ms": round(percentile(ordered, 50), 1),
+        "p95_ms": round(percentile(ordered, 95), 1),
+        "p99_ms": round(percentile(ordered, 99), 1),
+        "max_ms": round(ordered[-1], 1) if ordered else 0.0,
+        "throughput_per_s": round(calls / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+
+
+async def drive(call: Callable[[int], Awaitable[None]], calls: int, concurrency: int) -> Dict[str, Any]:
+    """Runs `calls` calls with at most `concurrency` in flight; returns latencies, errors and wall time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call(index)
+            except Exception as e:
+                errors.append(str(e))
+                return
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(calls)))
+    wall = time.perf_counter() - start
+    for message in errors[:3]:
+        logger.warning(f"Call failed: {message}")
+    return {"latencies": latencies, "errors": len(errors), "wall": wall}
+
+
+# -------------------------------------------------------------------------------------
+# Invocation paths
+# -------------------------------------------------------------------------------------
+
+def _call_arguments(args: argparse.Namespace, index: int) -> Dict[str, Any]:
+    return {"text": f"call-{index}", "delay_ms": args.delay_ms, "payload_bytes": args.payload_bytes}
+
+
+def _script_env(args: argparse.Namespace, index: int, spill_dir: str) -> Dict[str, str]:
+    """Tool arguments are passed to generated scripts as <NAME>_ARG environment variables, as Kubiya does."""
+    env = dict(os.environ, KUBIYA_LOG_LEVEL="WARNING", MCP_OUTPUT_SPILL_DIR=spill_dir)
+    for name, value in _call_arguments(args, index).items():
+        env[f"{name.upper()}_ARG"] = str(value)
+    return env
+
+
+async def _run_script(path: str, env: Dict[str, str]) -> None:
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, path, env=env, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"client script exited with {process.returncode}: {stderr.decode(errors='replace')[-300:]}")
+
+
+def _generated_script(mode: str, port: int, work_dir: str) -> str:
+    sys.path.insert(0, REPO_ROOT)
+    from serverless_mcp.serverless_mcp_tools.base_tool import render_client_script, render_gateway_client_script
+
+    if mode == "gateway":
+        content = render_gateway_client_script(STAND_IN_SERVER_ID, "echo", ECHO_TOOL_PARAMS)
+    else:
+        content = render_client_script("127.0.0.1", port, "echo", ECHO_TOOL_PARAMS)
+    path = os.path.join(work_dir, f"{mode}_client.py")
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+def _raise_for_error(response: Any) -> None:
+    # Newer MCP SDKs renamed isError to is_error
+    if getattr(response, "is_error", None) if hasattr(response, "is_error") else getattr(response, "isError", False):
+        raise RuntimeError(str(response.content))
+
+
+async def run_mode(mode: str, args: argparse.Namespace, port: int, gateway_port: Optional[int],
+                   work_dir: str, cold_start_ms: float) -> Dict[str, Any]:
+    from fastmcp import Client
+
+    url = f"http://127.0.0.1:{port}/mcp"
+    if mode in ("script", "gateway"):
+        path = _generated_script(mode, port, work_dir)
+
+        async def call(index: int) -> None:
+            env = _script_env(args, index, work_dir)
+            env["MCP_GATEWAY_URL"] = f"http://127.0.0.1:{gateway_port}"
+            await _run_script(path, env)
+
+        result = await drive(call, args.calls, args.concurrency)
+    elif mode == "client":
+        async def call(index: int) -> None:
+            async with Client(url) as client:
+                response = await client.call_tool_mcp("echo", _call_arguments(args, index))
+            _raise_for_error(response)
+
+        result = await drive(call, args.calls, args.concurrency)
+    else:
+        async with Client(url) as client:
+            async def call(index: int) -> None:
+                response = await client.call_tool_mcp("echo", _call_arguments(args, index))
+                _raise_for_error(response)
+
+            result = await drive(call, args.calls, args.concurrency)
+
+    return summarize(mode, result["latencies"], result["errors"], result["wall"], args.concurrency, cold_start_ms)
+
+
+async def measure_cold_start(port: int, process: subprocess.Popen, started: float, timeout: float) -> float:
+    """Time from spawning the server to its first successful tool call."""
+    from fastmcp import Client
+
+    await asyncio.get_running_loop().run_in_executor(None, _wait_for_port, port, process, timeout)
+    async with Client(f"http://127.0.0.1:{port}/mcp") as client:
+        await client.call_tool_mcp("echo", {"text": "warmup"})
+    return (time.perf_counter() - started) * 1000
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    columns = ["mode", "calls", "errors", "concurrency", "cold_start_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms",
+               "throughput_per_s"]
+    widths = {column: max(len(column), *(len(str(row[column])) for row in results)) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in results:
+        print("  ".join(str(row[column]).ljust(widths[column]) for column in columns))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the serverless MCP tool invocation path")
+    parser.add_argument("--mode", default="session,client,script",
+                        help=f"Comma-separated invocation paths to measure: {', '.join(MODES)}")
+    parser.add_argument("--calls", type=int, default=50, help="Calls per mode")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum calls in flight")
+    parser.add_argument("--delay-ms", type=int, default=0, help="Server-side delay of each synthetic call")
+    parser.add_argument("--payload-bytes", type=int, default=0, help="Size of each synthetic result")
+    parser.add_argument("--extra-tools", type=int, default=0, help="Additional no-op tools on the stand-in server")
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.extra_tools)
+        return
+
+    # Per-request httpx logging would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    modes = [mode.strip() for mode in args.mode.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"Unknown mode(s): {', '.join(unknown)}")
+
+    port = _free_port()
+    server = gateway = None
+    results = []
+    with tempfile.TemporaryDirectory(prefix="mcp_loadtest_") as work_dir:
+        try:
+            started = time.perf_counter()
+            server = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port),
+                 "--extra-tools", str(args.extra_tools)]
+            )
+            cold_start_ms = asyncio.run(measure_cold_start(port, server, started, args.startup_timeout))
+            logger.info(f"Stand-in server ready on port {port} after {cold_start_ms:.0f} ms")
+
+            gateway_port = None
+            if "gateway" in modes:
+                gateway_port = _free_port()
+                config_path = os.path.join(work_dir, "servers_to_sync.json")
+                with open(config_path, "w") as f:
+                    json.dump([{"id": STAND_IN_SERVER_ID, "mode": "deploy",
+                                "gateway_upstream_url": f"http://127.0.0.1:{port}/mcp"}], f)
+                gateway = subprocess.Popen(
+                    [sys.executable, GATEWAY_SCRIPT, "--config", config_path, "--host", "127.0.0.1",
+                     "--port", str(gateway_port)],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+                _wait_for_port(gateway_port, gateway, args.startup_timeout)
+
+            for mode in modes:
+                logger.info(f"Running {args.calls} calls in '{mode}' mode at concurrency {args.concurrency}...")
+                results.append(asyncio.run(run_mode(mode, args, port, gateway_port, work_dir, cold_start_ms)))
+        finally:
+            _stop(gateway)
+            _stop(server)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+
+
+if __name__ == "__main__":
+    main()
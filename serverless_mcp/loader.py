@@ -1,7 +1,7 @@
 import os
 import logging
 from typing import List
-from kubiya_sdk.tools import Tool, Arg, ToolType, KubiyaArgType
+from kubiya_sdk.tools import Tool, Arg, ToolType, KubiyaArgType, Volume
 
 from .serverless_mcp_tools.discovery import discover_mcp_tools_from_config, DiscoveredServerInfo
 from .serverless_mcp_tools.base_tool import ServerlessMCPTool
@@ -14,6 +14,14 @@ logger = logging.getLogger(__name__)
 # This image name should be used when building Dockerfile.discover_tool
 DISCOVER_TOOL_IMAGE_NAME = "your-docker-registry/mcp-discovery-tool:latest"
 
+# Persistent volume for the discovery cache and the previous sync state, so commits that were
+# already discovered are not cloned again and MCP_SYNC_OUTPUT=diff compares against the last run.
+# Dockerfile.discover_tool points MCP_DISCOVERY_CACHE_DIR at this path.
+DISCOVERY_CACHE_VOLUME = Volume(
+    name="mcp_discovery_cache",
+    path="/var/cache/mcp_discovery"
+)
+
 def get_tools() -> List[Tool]:
     """
     Main function called by Kubiya to load tools.
@@ -63,6 +71,7 @@ def get_tools() -> List[Tool]:
         # This meta-tool itself does not run other services directly.
         # The definitions it *outputs* will contain service specs for the actual MCP tools.
         with_services=[], 
+        with_volumes=[DISCOVERY_CACHE_VOLUME],
         # If the discover_exec_script.py needs KUBIYA_API_KEY, it should be passed as a secret.
         secrets=[], # Example: [Secret(name="kubiya-api-key", mount_path="/etc/secrets/kubiya_api_key")]
         env={}
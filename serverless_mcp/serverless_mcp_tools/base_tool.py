@@ -1,6 +1,7 @@
 from kubiya_sdk.tools import Tool, Arg, FileSpec, ServiceSpec, ToolType, KubiyaArgType
 from kubiya_sdk.tools.secret import Secret
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+import os
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,6 +9,115 @@ logger = logging.getLogger(__name__)
 # Placeholder for the MCP service runner image. Replace with your actual image URI.
 MCP_SERVICE_IMAGE = "your-docker-registry/mcp-service-runner:latest"
 DEFAULT_TOOL_ICON = "https://raw.githubusercontent.com/kubiyabot/kubiya-community-tools/main/catalog/logos/fastmcp.png"
+# In-cluster address of the resident MCP client gateway (see gateway.py)
+DEFAULT_GATEWAY_URL = "http://mcp-gateway:8080"
+
+# "direct": each invocation starts its own MCP service and client session (default)
+# "gateway": each invocation is one HTTP request to the gateway, which holds pooled sessions
+#            to the deployed server; only available for deploy-mode servers
+CLIENT_MODES = ("direct", "gateway")
+
+# Name (after the server id prefix) of the generated per-server batch tool
+BATCH_TOOL_NAME = "batch_call"
+DEFAULT_BATCH_CONCURRENCY = 8
+MAX_BATCH_CONCURRENCY = 32
+
+# Output handling shared by the generated client scripts (standard library only).
+# Content is printed as it arrives; once MCP_OUTPUT_MAX_BYTES have been written to
+# stdout the remainder goes to a spill file whose path is printed instead, and
+# binary content (images, audio, blobs) is always written to a file.
+_CLIENT_OUTPUT_HELPERS = '''
+class BoundedOutput:
+    def __init__(self):
+        self.max_bytes = int(os.getenv('MCP_OUTPUT_MAX_BYTES', '1000000'))
+        self.spill_dir = os.getenv('MCP_OUTPUT_SPILL_DIR') or tempfile.gettempdir()
+        self.written = 0
+        self.total = 0
+        self.spill = None
+        self.spill_path = None
+
+    def _emit(self, text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def write(self, text):
+        if not text.endswith('\\n'):
+            text += '\\n'
+        data = text.encode('utf-8')
+        self.total += len(data)
+        if self.spill is None:
+            room = self.max_bytes - self.written
+            if len(data) <= room:
+                self._emit(text)
+                self.written += len(data)
+                return
+            head = data[:max(room, 0)].decode('utf-8', 'ignore')
+            self._emit(head)
+            self.written += len(head.encode('utf-8'))
+            fd, self.spill_path = tempfile.mkstemp(prefix='mcp_output_', suffix='.txt', dir=self.spill_dir)
+            self.spill = os.fdopen(fd, 'w', encoding='utf-8')
+            text = data[len(head.encode('utf-8')):].decode('utf-8', 'ignore')
+        self.spill.write(text)
+
+    def write_binary(self, item):
+        mime_type = item.get('mimeType') or 'application/octet-stream'
+        data = base64.b64decode(item.get('data') or item.get('blob') or '')
+        extension = mimetypes.guess_extension(mime_type) or '.bin'
+        fd, path = tempfile.mkstemp(prefix='mcp_output_', suffix=extension, dir=self.spill_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        self.write(f'[{mime_type} content ({len(data)} bytes) saved to {path}]')
+
+    def write_item(self, item):
+        item_type = item.get('type')
+        if item_type == 'text':
+            self.write(item.get('text', ''))
+        elif item_type in ('image', 'audio'):
+            self.write_binary(item)
+        elif item_type == 'resource':
+            resource = item.get('resource') or {}
+            if 'text' in resource:
+                self.write(resource['text'])
+            else:
+                self.write_binary(resource)
+        else:
+            self.write(json.dumps(item))
+
+    def close(self):
+        if self.spill is not None:
+            self.spill.close()
+            self._emit(f'\\n[output truncated: {self.written} of {self.total} bytes shown; the rest was written to {self.spill_path}]\\n')
+
+def format_progress(progress, total, message):
+    text = f'{progress:g}/{total:g} ({progress / total:.0%})' if total else f'{progress:g}'
+    return f'[progress] {text} {message}' if message else f'[progress] {text}'
+'''
+
+# Shared by the generated batch scripts: per-call validation and the ordered result report
+_BATCH_HELPERS = '''
+def validate_call(index, call, available_tools):
+    tool = call.get('tool') if isinstance(call, dict) else None
+    if tool not in available_tools:
+        return {'index': index, 'tool': tool, 'ok': False, 'error': f'Unknown tool {tool!r}; available: {", ".join(available_tools)}'}
+    if not isinstance(call.get('arguments') or {}, dict):
+        return {'index': index, 'tool': tool, 'ok': False, 'error': 'arguments must be a JSON object'}
+    return None
+
+def call_entry(index, tool, content, is_error):
+    entry = {'index': index, 'tool': tool, 'ok': not is_error, 'content': content}
+    if is_error:
+        entry['error'] = '\\n'.join(text for text in content if isinstance(text, str))
+    return entry
+
+def write_batch_results(results):
+    failed = sum(1 for entry in results if not entry['ok'])
+    output = BoundedOutput()
+    output.write(json.dumps({'summary': {'calls': len(results), 'succeeded': len(results) - failed, 'failed': failed},
+                             'results': results}, indent=2))
+    output.close()
+    if failed == len(results):
+        sys.exit(1)
+'''
 
 class ServerlessMCPTool(Tool):
     def __init__(self, mcp_server_config: Dict[str, Any], tool_schema: Dict[str, Any]):
@@ -49,23 +159,43 @@ class ServerlessMCPTool(Tool):
             else:
                 logger.warning(f"Ignoring invalid secret configuration: {secret_config}")
 
-        mcp_service = ServiceSpec(
-            name=mcp_service_name,
-            image=MCP_SERVICE_IMAGE,
-            exposed_ports=[mcp_service_port],
-            env=service_env,
-            secrets=service_secrets,
-            volumes=mcp_server_config.get("volumes", [])  # Optional volume mounts
-        )
+        self.client_mode = self._resolve_client_mode(mcp_server_config)
 
-        # The content script that runs inside the Kubiya tool's container
-        # This script will act as a client to the MCP service
-        content_script = self._generate_client_script(
-            service_host=mcp_service_name, # Kubiya resolves service names
-            service_port=mcp_service_port,
-            mcp_tool_name=tool_schema['name'],
-            mcp_tool_params=tool_schema.get('parameters', [])
-        )
+        if self.client_mode == "gateway":
+            # The server runs as a long-lived Deployment behind the gateway; no per-call service
+            gateway_url = mcp_server_config.get("gateway_url") or os.getenv("MCP_GATEWAY_URL", DEFAULT_GATEWAY_URL)
+            services = []
+            content_script = self._generate_gateway_client_script(
+                server_id=mcp_server_config.get("id", "default-mcp-server"),
+                mcp_tool_name=tool_schema['name'],
+                mcp_tool_params=tool_schema.get('parameters', [])
+            )
+            tool_image = "python:3.11-slim"
+            client_env = {"KUBIYA_LOG_LEVEL": "INFO", "MCP_GATEWAY_URL": gateway_url}
+        else:
+            mcp_service = ServiceSpec(
+                name=mcp_service_name,
+                image=MCP_SERVICE_IMAGE,
+                exposed_ports=[mcp_service_port],
+                env=service_env,
+                secrets=service_secrets,
+                volumes=mcp_server_config.get("volumes", [])  # Optional volume mounts
+            )
+
+            # The content script that runs inside the Kubiya tool's container
+            # This script will act as a client to the MCP service
+            content_script = self._generate_client_script(
+                service_host=mcp_service_name, # Kubiya resolves service names
+                service_port=mcp_service_port,
+                mcp_tool_name=tool_schema['name'],
+                mcp_tool_params=tool_schema.get('parameters', [])
+            )
+
+            services = [mcp_service]
+            tool_image = "python:3.11-slim" # Image for the Kubiya tool itself (client side)
+            client_env = { # Env for the client tool container
+                "KUBIYA_LOG_LEVEL": "INFO" # Example
+            }
 
         tool_name = f"{mcp_server_config.get('id', 'mcp')}_{tool_schema['name']}"
         tool_description = tool_schema.get('description', f"Dynamically wrapped MCP tool: {tool_schema['name']}")
@@ -75,19 +205,30 @@ class ServerlessMCPTool(Tool):
             name=tool_name,
             description=tool_description,
             type=ToolType.PYTHON, # Run python script
-            image="python:3.11-slim", # Image for the Kubiya tool itself (client side)
+            image=tool_image,
             content=content_script,
             args=kubiya_args,
             icon_url=tool_icon,
-            with_services=[mcp_service],
+            with_services=services,
             # Secrets or env vars for the Kubiya tool itself (client side) if needed
             # For example, if the client needs specific API keys not related to the MCP server
             secrets=[],
-            env={ # Env for the client tool container
-                "KUBIYA_LOG_LEVEL": "INFO" # Example
-            }
+            env=client_env
         )
 
+    @staticmethod
+    def _resolve_client_mode(mcp_server_config: Dict[str, Any]) -> str:
+        """Picks the client mode from the server config or MCP_CLIENT_MODE, defaulting to direct."""
+        client_mode = str(mcp_server_config.get("client_mode") or os.getenv("MCP_CLIENT_MODE", "direct")).lower()
+        if client_mode not in CLIENT_MODES:
+            logger.warning(f"Unknown client_mode '{client_mode}' for server {mcp_server_config.get('id')}; using 'direct'.")
+            return "direct"
+        if client_mode == "gateway" and str(mcp_server_config.get("mode", "sync")).lower() != "deploy":
+            # Sync-mode servers only exist for the duration of a tool call, so there is nothing to pool
+            logger.warning(f"Gateway client mode requires a deploy-mode server; using 'direct' for {mcp_server_config.get('id')}.")
+            return "direct"
+        return client_mode
+
     def _convert_mcp_params_to_kubiya_args(self, mcp_params: List[Dict[str, Any]]) -> List[Arg]:
         args = []
         for param in mcp_params:
@@ -119,8 +260,9 @@ class ServerlessMCPTool(Tool):
             ))
         return args
 
-    def _generate_client_script(self, service_host: str, service_port: int, mcp_tool_name: str, mcp_tool_params: List[Dict[str, Any]]) -> str:
-        # Prepare argument parsing for the client script
+    @staticmethod
+    def _generate_arg_parsing(mcp_tool_params: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """Returns the client-script lines that read tool arguments from env vars, and the call-arguments dict literal."""
         arg_parsing_lines = []
         mcp_call_args = "{"
         for i, param in enumerate(mcp_tool_params):
@@ -142,55 +284,114 @@ class ServerlessMCPTool(Tool):
             if i < len(mcp_tool_params) - 1:
                 mcp_call_args += ", "
         mcp_call_args += "}"
+        return '\n'.join(arg_parsing_lines), mcp_call_args
 
-        client_script = f"""\
+    def _generate_client_script(self, service_host: str, service_port: int, mcp_tool_name: str, mcp_tool_params: List[Dict[str, Any]]) -> str:
+        return render_client_script(service_host, service_port, mcp_tool_name, mcp_tool_params)
+
+    def _generate_gateway_client_script(self, server_id: str, mcp_tool_name: str, mcp_tool_params: List[Dict[str, Any]]) -> str:
+        return render_gateway_client_script(server_id, mcp_tool_name, mcp_tool_params)
+
+    def to_kubiya_definition_dict(self) -> Dict[str, Any]:
+        """Serializes the tool's configuration into a dictionary suitable for JSON output."""
+        # Assuming ToolType is an Enum and Arg/ServiceSpec have dict() methods from Kubiya SDK
+        try:
+            definition = {
+                "name": self.name,
+                "description": self.description,
+                "type": self.type.value if hasattr(self.type, 'value') else str(self.type),
+                "image": self.image,
+                "content": self.content,
+                "args": [arg.dict() for arg in self.args],
+                "icon_url": self.icon_url,
+                "with_services": [service.dict() for service in self.with_services],
+                "secrets": self.secrets,
+                "env": self.env
+                # Add other serializable fields from the base Tool class if necessary
+            }
+            return definition
+        except Exception as e:
+            logger.error(f"Failed to serialize tool definition for {self.name}: {e}", exc_info=True)
+            # Return a minimal dict or raise an error, depending on desired handling
+            return {"name": self.name, "error": f"Serialization failed: {e}"}
+
+    def run(self):
+        # This method is called by Kubiya if the tool type is EXECUTOR.
+        # For ToolType.PYTHON, the `content` script is executed directly.
+        # We don't need to implement `run` here as we are using ToolType.PYTHON.
+        logger.warning("ServerlessMCPTool.run() called, but this tool uses ToolType.PYTHON and executes its content script.")
+        pass
+
+
+def render_client_script(service_host: str, service_port: int, mcp_tool_name: str, mcp_tool_params: List[Dict[str, Any]]) -> str:
+    """A client that starts its own MCP session against the service and calls one tool."""
+    # Prepare argument parsing for the client script
+    arg_parsing, mcp_call_args = ServerlessMCPTool._generate_arg_parsing(mcp_tool_params)
+
+    client_script = f"""\
 import asyncio
+import base64
+import mimetypes
 import os
+import sys
 import json
 import logging
+import tempfile
 from fastmcp import Client
 
 logging.basicConfig(level=os.getenv('KUBIYA_LOG_LEVEL', 'INFO').upper(), format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
+{_CLIENT_OUTPUT_HELPERS}
+async def on_progress(progress, total, message):
+    # Progress notifications are printed as they arrive so long-running tools show activity
+    print(format_progress(progress, total, message), flush=True)
+
+async def on_log(log_message):
+    data = log_message.data
+    if isinstance(data, dict) and 'msg' in data:
+        data = data['msg']
+    print(f'[{{log_message.logger or "server"}} {{log_message.level}}] {{data}}', flush=True)
+
+def result_field(result, name, legacy_name):
+    # Newer MCP SDKs renamed the camelCase result fields
+    return getattr(result, name) if hasattr(result, name) else getattr(result, legacy_name, None)
+
+def content_items(result):
+    for item in result.content or []:
+        yield item.model_dump(mode='json', exclude_none=True) if hasattr(item, 'model_dump') else {{'type': 'text', 'text': str(item)}}
 
 async def main():
     logger.info(f'MCP Client: Connecting to MCP service at http://{service_host}:{service_port}')
     mcp_server_address = f'http://{service_host}:{service_port}/mcp' # Assuming default /mcp path for streamable-http
 
     # Parse arguments passed as environment variables by Kubiya
-{'\n'.join(arg_parsing_lines)}
+{arg_parsing}
 
     mcp_tool_name_to_call = '{mcp_tool_name}'
     mcp_tool_arguments = {mcp_call_args}
 
     logger.info(f'MCP Client: Calling tool {{mcp_tool_name_to_call}} with arguments: {{mcp_tool_arguments}}')
 
-    client = Client(server_url=mcp_server_address)
+    client = Client(mcp_server_address, progress_handler=on_progress, log_handler=on_log)
     async with client:
         try:
-            result = await client.call_tool(mcp_tool_name_to_call, mcp_tool_arguments)
-            # The result from fastmcp client.call_tool is usually a list of CallToolResult objects.
-            # We need to extract the actual content.
-            if result and isinstance(result, list) and hasattr(result[0], 'content'):
-                # Assuming TextContent or similar that has a .text attribute or can be json serialized
-                output = result[0].content
-                if hasattr(output, 'text'):
-                    print(output.text) # For simple text output
-                elif isinstance(output, (dict, list)):
-                    print(json.dumps(output)) # For structured output
-                else:
-                    print(str(output))
-            else:
-                logger.warning(f'MCP Client: Received unexpected result format: {{result}}')
-                print(str(result))
-
+            result = await client.call_tool_mcp(mcp_tool_name_to_call, mcp_tool_arguments)
         except Exception as e:
             logger.error(f'MCP Client: Error calling tool {{mcp_tool_name_to_call}}: {{e}}', exc_info=True)
-            # Propagate error to Kubiya by printing to stderr or raising an exception
-            # For now, printing error message and exiting with non-zero status
-            print(f'Error: {{e}}', file=open(os.devnull, 'w') if os.name == 'posix' else None) # Python hides stderr by default in some K8s contexts
-            # A more robust way would be to ensure stderr is captured by Kubiya or write to a defined error file.
-            raise
+            print(f'Error: {{e}}', file=sys.stderr)
+            sys.exit(1)
+
+    output = BoundedOutput()
+    has_content = False
+    for item in content_items(result):
+        has_content = True
+        output.write_item(item)
+    structured_content = result_field(result, 'structured_content', 'structuredContent')
+    if not has_content and structured_content is not None:
+        output.write(json.dumps(structured_content))
+    output.close()
+    if result_field(result, 'is_error', 'isError'):
+        sys.exit(1)
 
 if __name__ == '__main__':
     # Install fastmcp if not present (Kubiya image might not have it by default for the tool itself)
@@ -198,7 +399,6 @@ if __name__ == '__main__':
         import fastmcp
     except ImportError:
         import subprocess
-        import sys
         logger.info("fastmcp not found, installing...")
         subprocess.check_call([sys.executable, "-m", "pip", "install", "fastmcp>=2.3.0", "httpx"])
         # Re-import or indicate restart might be needed if this was a real script, 
@@ -206,34 +406,236 @@ if __name__ == '__main__':
 
     asyncio.run(main())
 """
-        return client_script
+    return client_script
 
-    def to_kubiya_definition_dict(self) -> Dict[str, Any]:
-        """Serializes the tool's configuration into a dictionary suitable for JSON output."""
-        # Assuming ToolType is an Enum and Arg/ServiceSpec have dict() methods from Kubiya SDK
+
+def render_gateway_client_script(server_id: str, mcp_tool_name: str, mcp_tool_params: List[Dict[str, Any]]) -> str:
+    """A standard-library-only client that sends one HTTP request to the MCP gateway."""
+    arg_parsing, mcp_call_args = ServerlessMCPTool._generate_arg_parsing(mcp_tool_params)
+
+    client_script = f"""\
+import os
+import sys
+import json
+import base64
+import tempfile
+import mimetypes
+import urllib.error
+import urllib.parse
+import urllib.request
+{_CLIENT_OUTPUT_HELPERS}
+def main():
+    gateway_url = os.getenv('MCP_GATEWAY_URL', '{DEFAULT_GATEWAY_URL}').rstrip('/')
+
+    # Parse arguments passed as environment variables by Kubiya
+{arg_parsing}
+
+    mcp_tool_arguments = {mcp_call_args}
+    url = gateway_url + '/call/' + urllib.parse.quote({server_id!r}) + '/' + urllib.parse.quote({mcp_tool_name!r}) + '?stream=1'
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(mcp_tool_arguments).encode(),
+        headers={{'Content-Type': 'application/json'}},
+        method='POST'
+    )
+    payload = None
+    try:
+        with urllib.request.urlopen(request, timeout=float(os.getenv('MCP_GATEWAY_TIMEOUT', '600'))) as response:
+            # One JSON event per line: progress events while the tool runs, then the result
+            for line in response:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if event.get('event') == 'progress':
+                    print(format_progress(event.get('progress') or 0, event.get('total'), event.get('message')), flush=True)
+                elif event.get('event') == 'error':
+                    print(f'Error: {{event.get("error")}}', file=sys.stderr)
+                    sys.exit(1)
+                elif event.get('event') == 'result':
+                    payload = event
+    except urllib.error.HTTPError as e:
+        print(f'Error: MCP gateway returned HTTP {{e.code}}: {{e.read().decode(errors="replace")}}', file=sys.stderr)
+        sys.exit(1)
+    except urllib.error.URLError as e:
+        print(f'Error: could not reach MCP gateway at {{gateway_url}}: {{e.reason}}', file=sys.stderr)
+        sys.exit(1)
+    if payload is None:
+        print('Error: MCP gateway closed the stream without a result', file=sys.stderr)
+        sys.exit(1)
+
+    output = BoundedOutput()
+    for item in payload.get('content', []):
+        output.write_item(item)
+    if not payload.get('content') and payload.get('structured_content') is not None:
+        output.write(json.dumps(payload['structured_content']))
+    output.close()
+    if payload.get('is_error'):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
+"""
+    return client_script
+
+
+class ServerlessMCPBatchTool(ServerlessMCPTool):
+    """
+    Runs a list of calls to one MCP server's tools in a single invocation.
+
+    Calls share one MCP session (or the gateway's pooled sessions), run with a
+    bounded concurrency, and their results are returned in call order with a
+    per-call error instead of failing the whole batch.
+    """
+
+    def __init__(self, mcp_server_config: Dict[str, Any], tool_names: List[str]):
+        self.tool_names = sorted(tool_names)
+        concurrency = min(int(mcp_server_config.get("batch_concurrency", DEFAULT_BATCH_CONCURRENCY)), MAX_BATCH_CONCURRENCY)
+        self.batch_concurrency = concurrency
+        server_id = mcp_server_config.get("id", "mcp")
+        tool_schema = {
+            "name": BATCH_TOOL_NAME,
+            "description": (
+                f"Runs several calls to the {server_id} MCP server's tools concurrently and returns the results "
+                f"in call order, with an error for each call that failed. Available tools: {', '.join(self.tool_names)}."
+            ),
+            "parameters": [
+                {
+                    "name": "calls",
+                    "type": "array",
+                    "description": 'JSON list of calls, each {"tool": "<tool name>", "arguments": {...}}',
+                    "required": True,
+                },
+                {
+                    "name": "concurrency",
+                    "type": "integer",
+                    "description": f"Maximum calls in flight (at most {MAX_BATCH_CONCURRENCY})",
+                    "required": False,
+                    "default": concurrency,
+                },
+            ],
+        }
+        super().__init__(mcp_server_config=mcp_server_config, tool_schema=tool_schema)
+
+    def _batch_preamble(self) -> Tuple[str, str]:
+        """Argument parsing and the checks shared by both batch scripts."""
+        arg_parsing, _ = self._generate_arg_parsing(self.tool_schema['parameters'])
+        checks = f"""\
+    available_tools = {self.tool_names!r}
+    if not isinstance(calls, list) or not calls:
+        print('Error: calls must be a non-empty JSON list of {{"tool": ..., "arguments": {{...}}}} objects', file=sys.stderr)
+        sys.exit(1)
+    concurrency = max(1, min(concurrency or {self.batch_concurrency}, {MAX_BATCH_CONCURRENCY}))
+"""
+        return arg_parsing, checks
+
+    def _generate_client_script(self, service_host: str, service_port: int, mcp_tool_name: str, mcp_tool_params: List[Dict[str, Any]]) -> str:
+        arg_parsing, checks = self._batch_preamble()
+        client_script = f"""\
+import asyncio
+import base64
+import mimetypes
+import os
+import sys
+import json
+import logging
+import tempfile
+from fastmcp import Client
+
+logging.basicConfig(level=os.getenv('KUBIYA_LOG_LEVEL', 'INFO').upper(), format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+{_CLIENT_OUTPUT_HELPERS}{_BATCH_HELPERS}
+def result_field(result, name, legacy_name):
+    # Newer MCP SDKs renamed the camelCase result fields
+    return getattr(result, name) if hasattr(result, name) else getattr(result, legacy_name, None)
+
+async def run_call(client, semaphore, index, call, available_tools):
+    invalid = validate_call(index, call, available_tools)
+    if invalid:
+        return invalid
+    async with semaphore:
         try:
-            definition = {
-                "name": self.name,
-                "description": self.description,
-                "type": self.type.value if hasattr(self.type, 'value') else str(self.type),
-                "image": self.image,
-                "content": self.content,
-                "args": [arg.dict() for arg in self.args],
-                "icon_url": self.icon_url,
-                "with_services": [service.dict() for service in self.with_services],
-                "secrets": self.secrets,
-                "env": self.env
-                # Add other serializable fields from the base Tool class if necessary
-            }
-            return definition
+            result = await client.call_tool_mcp(call['tool'], call.get('arguments') or {{}})
         except Exception as e:
-            logger.error(f"Failed to serialize tool definition for {self.name}: {e}", exc_info=True)
-            # Return a minimal dict or raise an error, depending on desired handling
-            return {"name": self.name, "error": f"Serialization failed: {e}"}
+            return {{'index': index, 'tool': call['tool'], 'ok': False, 'error': str(e)}}
+    content = [
+        item.text if getattr(item, 'type', None) == 'text' else item.model_dump(mode='json', exclude_none=True)
+        for item in result.content or []
+    ]
+    return call_entry(index, call['tool'], content, result_field(result, 'is_error', 'isError'))
 
-    def run(self):
-        # This method is called by Kubiya if the tool type is EXECUTOR.
-        # For ToolType.PYTHON, the `content` script is executed directly.
-        # We don't need to implement `run` here as we are using ToolType.PYTHON.
-        logger.warning("ServerlessMCPTool.run() called, but this tool uses ToolType.PYTHON and executes its content script.")
-        pass 
\ No newline at end of file
+async def main():
+    mcp_server_address = f'http://{service_host}:{service_port}/mcp'
+
+    # Parse arguments passed as environment variables by Kubiya
+{arg_parsing}
+{checks}
+    logger.info(f'MCP Client: Running {{len(calls)}} calls against {{mcp_server_address}} with concurrency {{concurrency}}')
+    semaphore = asyncio.Semaphore(concurrency)
+    async with Client(mcp_server_address) as client:
+        results = await asyncio.gather(*(
+            run_call(client, semaphore, index, call, available_tools) for index, call in enumerate(calls)
+        ))
+    write_batch_results(results)
+
+if __name__ == '__main__':
+    try:
+        import fastmcp
+    except ImportError:
+        import subprocess
+        logger.info("fastmcp not found, installing...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "fastmcp>=2.3.0", "httpx"])
+
+    asyncio.run(main())
+"""
+        return client_script
+
+    def _generate_gateway_client_script(self, server_id: str, mcp_tool_name: str, mcp_tool_params: List[Dict[str, Any]]) -> str:
+        arg_parsing, checks = self._batch_preamble()
+        client_script = f"""\
+import os
+import sys
+import json
+import base64
+import tempfile
+import mimetypes
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+{_CLIENT_OUTPUT_HELPERS}{_BATCH_HELPERS}
+def run_call(gateway_url, index, call, available_tools, timeout):
+    invalid = validate_call(index, call, available_tools)
+    if invalid:
+        return invalid
+    tool, arguments = call['tool'], call.get('arguments') or {{}}
+    url = gateway_url + '/call/' + urllib.parse.quote({server_id!r}) + '/' + urllib.parse.quote(tool)
+    request = urllib.request.Request(url, data=json.dumps(arguments).encode(),
+                                     headers={{'Content-Type': 'application/json'}}, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            payload = json.load(response)
+    except urllib.error.HTTPError as e:
+        return {{'index': index, 'tool': tool, 'ok': False, 'error': f'HTTP {{e.code}}: {{e.read().decode(errors="replace")}}'}}
+    except urllib.error.URLError as e:
+        return {{'index': index, 'tool': tool, 'ok': False, 'error': f'could not reach MCP gateway: {{e.reason}}'}}
+    content = [item.get('text', '') if item.get('type') == 'text' else item for item in payload.get('content', [])]
+    return call_entry(index, tool, content, payload.get('is_error'))
+
+def main():
+    gateway_url = os.getenv('MCP_GATEWAY_URL', '{DEFAULT_GATEWAY_URL}').rstrip('/')
+    timeout = float(os.getenv('MCP_GATEWAY_TIMEOUT', '600'))
+
+    # Parse arguments passed as environment variables by Kubiya
+{arg_parsing}
+{checks}
+    # The gateway spreads concurrent requests over its pooled sessions
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(
+            lambda indexed: run_call(gateway_url, indexed[0], indexed[1], available_tools, timeout), enumerate(calls)
+        ))
+    write_batch_results(results)
+
+if __name__ == '__main__':
+    main()
+"""
+        return client_script
@@ -1,17 +1,40 @@
 import os
+import sys
 import json
+import time
+import inspect
 import subprocess
 import tempfile
 import shutil
 import importlib.util
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 
+try:
+    from .static_discovery import discover_tools_statically
+    from .discovery_cache import DiscoveryCache, resolve_commit_sha, is_commit_sha
+except ImportError:  # Executed as a script for subprocess introspection
+    from static_discovery import discover_tools_statically
+    from discovery_cache import DiscoveryCache, resolve_commit_sha, is_commit_sha
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Servers are cloned and introspected concurrently; override with MCP_DISCOVERY_WORKERS
+DEFAULT_DISCOVERY_WORKERS = 8
+# Seconds allowed for importing and introspecting a single server file
+DEFAULT_INTROSPECTION_TIMEOUT = 120
+
+# How tools are discovered, per server via "discovery_mode" or globally via MCP_DISCOVERY_MODE:
+#   static - parse the server file's AST; nothing is imported or executed (default)
+#   import - import the server file in a subprocess and read the FastMCP registry
+#   auto   - static first, falling back to import when static finds no tools
+DISCOVERY_MODES = ("static", "import", "auto")
+DEFAULT_DISCOVERY_MODE = "static"
+
 class MCPToolParameterSchema(BaseModel):
     name: str
     type: str  # Simplified type (e.g., 'string', 'integer', 'boolean', 'number', 'object', 'array')
@@ -29,6 +52,9 @@ class DiscoveredMCPToolSchema(BaseModel):
 class DiscoveredServerInfo(BaseModel):
     config: Dict[str, Any] # The original config entry from servers_to_sync.json
     tools: List[DiscoveredMCPToolSchema]
+    timing: Dict[str, float] = Field(default_factory=dict) # Seconds spent per phase (resolve, clone, introspect, total)
+    commit_sha: Optional[str] = None # Commit the tools were discovered at, if known
+    cached: bool = False # True when the tools came from the discovery cache
 
 def _get_parameter_type(annotation: Any) -> str:
     """Converts Python type annotation to a simplified string type."""
@@ -125,9 +151,192 @@ def _discover_tools_in_file(file_path: str, mcp_instance_name: str) -> List[Disc
         logger.error(f"Failed to discover tools in {file_path}: {e}")
         return []
 
-def discover_mcp_tools_from_config(config_path: str) -> List[DiscoveredServerInfo]:
+def _clone_server_repo(repo_url: str, branch: str, repo_local_path: str) -> None:
+    """Shallow clone a single branch, tag or commit of an MCP server repository."""
+    if not is_commit_sha(branch):
+        subprocess.run(
+            ["git", "clone", "--depth", "1", "--branch", branch, repo_url, repo_local_path],
+            check=True, capture_output=True, text=True
+        )
+        return
+    # `git clone --branch` does not accept commit hashes; fetch the single commit instead
+    os.makedirs(repo_local_path, exist_ok=True)
+    for command in (["git", "init", "--quiet"],
+                    ["git", "fetch", "--quiet", "--depth", "1", repo_url, branch],
+                    ["git", "checkout", "--quiet", "FETCH_HEAD"]):
+        subprocess.run(command, cwd=repo_local_path, check=True, capture_output=True, text=True)
+
+
+def _checkout_sha(repo_local_path: str) -> Optional[str]:
+    """Returns the commit checked out in a clone, or None if it cannot be determined."""
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo_local_path,
+                                check=True, capture_output=True, text=True)
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    sha = result.stdout.strip()
+    return sha if is_commit_sha(sha) else None
+
+
+def _introspect_in_subprocess(repo_local_path: str, server_file_full_path: str, mcp_instance_name: str,
+                              timeout: float) -> tuple:
+    """
+    Runs _discover_tools_in_file in a separate interpreter rooted at the cloned repo.
+    Each server gets its own sys.path and module table, so servers that are introspected
+    concurrently cannot see each other's imports. Returns (tools, stderr of the child).
+    """
+    fd, output_path = tempfile.mkstemp(prefix="mcp_tools_", suffix=".json")
+    os.close(fd)
+    try:
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--introspect",
+             repo_local_path, server_file_full_path, mcp_instance_name, output_path],
+            cwd=repo_local_path, capture_output=True, text=True, timeout=timeout
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"introspection exited with code {result.returncode}: {result.stderr.strip()[-2000:]}")
+        with open(output_path, 'r') as f:
+            tools = [DiscoveredMCPToolSchema(**tool) for tool in json.load(f)]
+        return tools, result.stderr
+    finally:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+
+def _discover_server(config: Dict[str, Any], index: int, temp_dir: str, timeout: float) -> Optional[DiscoveredServerInfo]:
+    """Clones and introspects one configured server. Failures are logged and yield None."""
+    repo_url = config.get("git_repo_url")
+    branch = config.get("git_branch_or_tag", "main")
+    server_file_rel_path = config.get("server_file_path")
+    mcp_instance_name = config.get("mcp_instance_name", "mcp")
+
+    if not all([repo_url, server_file_rel_path]):
+        logger.warning(f"Skipping invalid config entry: {config}")
+        return None
+
+    # Prefix with the config index so entries without a unique id never share a checkout
+    server_id = config.get("id", os.path.basename(repo_url).replace('.git', ''))
+    repo_local_path = os.path.join(temp_dir, f"{index}_{server_id}")
+    timing: Dict[str, float] = {}
+    start = time.monotonic()
+
+    mode = str(config.get("discovery_mode") or os.getenv("MCP_DISCOVERY_MODE", DEFAULT_DISCOVERY_MODE)).lower()
+    if mode not in DISCOVERY_MODES:
+        logger.warning(f"Unknown discovery_mode '{mode}' for server '{server_id}', using '{DEFAULT_DISCOVERY_MODE}'")
+        mode = DEFAULT_DISCOVERY_MODE
+
+    use_cache = DiscoveryCache.is_enabled(config)
+    if use_cache:
+        commit_sha = resolve_commit_sha(repo_url, branch)
+        timing["resolve"] = time.monotonic() - start
+        if commit_sha:
+            cached_tools = DiscoveryCache.get_default().get(DiscoveryCache.key(config, commit_sha, mode))
+            if cached_tools is not None:
+                timing["total"] = time.monotonic() - start
+                logger.info(f"Server '{server_id}': {len(cached_tools)} tools from cache (unchanged at {commit_sha[:12]})")
+                return DiscoveredServerInfo(
+                    config=config,
+                    tools=[DiscoveredMCPToolSchema(**tool) for tool in cached_tools],
+                    timing=timing,
+                    commit_sha=commit_sha,
+                    cached=True
+                )
+
+    clone_start = time.monotonic()
+    logger.info(f"Cloning {repo_url} (branch: {branch}) into {repo_local_path}")
+    try:
+        _clone_server_repo(repo_url, branch, repo_local_path)
+    except FileNotFoundError:
+        logger.error("Git command not found. Please ensure git is installed and in the PATH.")
+        return None
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Failed to clone repository {repo_url}: {e.stderr}")
+        return None
+    finally:
+        timing["clone"] = time.monotonic() - clone_start
+
+    server_file_full_path = os.path.join(repo_local_path, server_file_rel_path)
+    if not os.path.exists(server_file_full_path):
+        logger.error(f"Server file '{server_file_rel_path}' not found in cloned repo {repo_local_path}")
+        return None
+
+    # Key the cache by what was actually cloned, in case the ref moved after ls-remote
+    head_sha = _checkout_sha(repo_local_path)
+
+    introspect_start = time.monotonic()
+    discovered_tools: List[DiscoveredMCPToolSchema] = []
+    details = ""
+    try:
+        if mode in ("static", "auto"):
+            try:
+                discovered_tools = [
+                    DiscoveredMCPToolSchema(**tool)
+                    for tool in discover_tools_statically(server_file_full_path, mcp_instance_name)
+                ]
+            except (SyntaxError, OSError, UnicodeDecodeError) as e:
+                details = f"static discovery failed: {e}"
+                if mode == "static":
+                    raise
+        if mode == "import" or (mode == "auto" and not discovered_tools):
+            if mode == "auto":
+                logger.info(f"Static discovery found no tools for server '{server_id}', falling back to import")
+            discovered_tools, details = _introspect_in_subprocess(
+                repo_local_path, server_file_full_path, mcp_instance_name, timeout
+            )
+    except subprocess.TimeoutExpired:
+        logger.error(f"Introspection of server '{server_id}' timed out after {timeout}s")
+        return None
+    except Exception as e:
+        logger.error(f"Failed to discover tools for server '{server_id}': {e}")
+        return None
+    finally:
+        timing["introspect"] = time.monotonic() - introspect_start
+        timing["total"] = time.monotonic() - start
+
+    if not discovered_tools:
+        logger.warning(f"No tools discovered for server '{server_id}' ({mode} mode)"
+                       + (f":\n{details.strip()[-2000:]}" if details.strip() else ""))
+        return None
+
+    if use_cache and head_sha:
+        DiscoveryCache.get_default().put(
+            DiscoveryCache.key(config, head_sha, mode), head_sha, [tool.dict() for tool in discovered_tools]
+        )
+
+    logger.info(f"Server '{server_id}': {len(discovered_tools)} tools via {mode} discovery "
+                f"(clone {timing['clone']:.2f}s, introspect {timing['introspect']:.2f}s)")
+    return DiscoveredServerInfo(config=config, tools=discovered_tools, timing=timing, commit_sha=head_sha)
+
+
+def _log_timing_report(server_configs: List[Dict[str, Any]], results: List[Optional[DiscoveredServerInfo]],
+                       elapsed: float) -> None:
+    """Logs a per-server breakdown of where discovery time went."""
+    lines = []
+    for config, result in zip(server_configs, results):
+        server_id = config.get("id", config.get("git_repo_url", "?"))
+        if result is None:
+            lines.append(f"  {server_id}: failed")
+            continue
+        if result.cached:
+            lines.append(f"  {server_id}: cached at {result.commit_sha[:12]}, "
+                         f"resolve {result.timing.get('resolve', 0):.2f}s, {len(result.tools)} tools")
+            continue
+        lines.append(f"  {server_id}: resolve {result.timing.get('resolve', 0):.2f}s, "
+                     f"clone {result.timing.get('clone', 0):.2f}s, "
+                     f"introspect {result.timing.get('introspect', 0):.2f}s, "
+                     f"total {result.timing.get('total', 0):.2f}s, {len(result.tools)} tools")
+    logger.info(f"Discovery timing ({elapsed:.2f}s wall clock):\n" + "\n".join(lines))
+
+
+def discover_mcp_tools_from_config(config_path: str, max_workers: Optional[int] = None) -> List[DiscoveredServerInfo]:
     """
     Reads the configuration file, clones repositories, and discovers MCP tools.
+    Servers are cloned and introspected concurrently by up to ``max_workers`` threads
+    (default: MCP_DISCOVERY_WORKERS or 8). Tools are found by parsing each server file
+    statically unless a server opts into import-based discovery, which runs in its own
+    subprocess. Each server's ref is first resolved to a commit with ``git ls-remote``;
+    servers whose commit was already discovered are served from the DiscoveryCache
+    without cloning. Results keep the order of the configuration file.
     Requires 'git' command to be available.
     """
     if not os.path.exists(config_path):
@@ -141,77 +350,54 @@ def discover_mcp_tools_from_config(config_path: str) -> List[DiscoveredServerInf
         logger.error(f"Invalid JSON in configuration file: {config_path}")
         return []
 
-    discovered_servers: List[DiscoveredServerInfo] = []
+    if not server_configs:
+        return []
+
+    max_workers = max_workers or int(os.getenv("MCP_DISCOVERY_WORKERS", DEFAULT_DISCOVERY_WORKERS))
+    timeout = float(os.getenv("MCP_DISCOVERY_TIMEOUT", DEFAULT_INTROSPECTION_TIMEOUT))
+    results: List[Optional[DiscoveredServerInfo]] = []
     temp_dir = tempfile.mkdtemp(prefix="kubiya_mcp_discovery_")
     logger.info(f"Using temporary directory for cloning: {temp_dir}")
-
-    # Requires 'inspect' module for signature analysis
-    global inspect
-    import inspect
+    start = time.monotonic()
 
     try:
-        for config in server_configs:
-            repo_url = config.get("git_repo_url")
-            branch = config.get("git_branch_or_tag", "main")
-            server_file_rel_path = config.get("server_file_path")
-            mcp_instance_name = config.get("mcp_instance_name", "mcp")
-
-            if not all([repo_url, server_file_rel_path]):
-                logger.warning(f"Skipping invalid config entry: {config}")
-                continue
-
-            repo_local_path = os.path.join(temp_dir, config.get("id", os.path.basename(repo_url).replace('.git', '')))
-            logger.info(f"Cloning {repo_url} (branch: {branch}) into {repo_local_path}")
-
-            try:
-                # Use subprocess to run git clone
-                subprocess.run(
-                    ["git", "clone", "--depth", "1", "--branch", branch, repo_url, repo_local_path],
-                    check=True, capture_output=True, text=True
-                )
-            except FileNotFoundError:
-                logger.error("Git command not found. Please ensure git is installed and in the PATH.")
-                # Skip remaining clones if git isn't found
-                raise
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Failed to clone repository {repo_url}: {e.stderr}")
-                continue # Skip this repo
-
-            server_file_full_path = os.path.join(repo_local_path, server_file_rel_path)
-            if not os.path.exists(server_file_full_path):
-                logger.error(f"Server file '{server_file_rel_path}' not found in cloned repo {repo_local_path}")
-                continue
-
-            # Add repo path to sys.path temporarily for imports within the server file
-            import sys
-            original_sys_path = list(sys.path)
-            sys.path.insert(0, repo_local_path)
-
-            discovered_tools = _discover_tools_in_file(server_file_full_path, mcp_instance_name)
-
-            # Restore sys.path
-            sys.path = original_sys_path
-
-            if discovered_tools:
-                discovered_servers.append(DiscoveredServerInfo(
-                    config=config,
-                    tools=discovered_tools
-                ))
-
-    except FileNotFoundError:
-         # Handled specific git error above, re-raise or log general missing file
-         logger.error("A required command (like git) was not found.")
-    except Exception as e:
-        logger.exception(f"An unexpected error occurred during MCP discovery: {e}")
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(server_configs)),
+                                thread_name_prefix="mcp-discovery") as executor:
+            futures = [
+                executor.submit(_discover_server, config, index, temp_dir, timeout)
+                for index, config in enumerate(server_configs)
+            ]
+            for config, future in zip(server_configs, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.exception(f"An unexpected error occurred while discovering server {config.get('id')}: {e}")
+                    results.append(None)
     finally:
         logger.info(f"Cleaning up temporary directory: {temp_dir}")
         shutil.rmtree(temp_dir, ignore_errors=True)
 
+    _log_timing_report(server_configs, results, time.monotonic() - start)
+    discovered_servers = [result for result in results if result is not None]
     logger.info(f"Discovery complete. Found tools from {len(discovered_servers)} servers.")
     return discovered_servers
 
+
+def _run_introspection(argv: List[str]) -> int:
+    """Subprocess entry point: introspect one server file and write its tools as JSON."""
+    repo_local_path, server_file_full_path, mcp_instance_name, output_path = argv
+    # Resolve the server's own imports against its repository, not this script's directory
+    sys.path[0] = repo_local_path
+    discovered_tools = _discover_tools_in_file(server_file_full_path, mcp_instance_name)
+    with open(output_path, 'w') as f:
+        json.dump([tool.dict() for tool in discovered_tools], f, default=str)
+    return 0
+
 # Example usage (for testing)
 if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == "--introspect":
+        sys.exit(_run_introspection(sys.argv[2:]))
+
     # Assumes a config file exists at ../config/servers_to_sync.json relative to this script
     script_dir = os.path.dirname(os.path.abspath(__file__))
     config_file = os.path.join(script_dir, '..', 'config', 'servers_to_sync.json')
@@ -0,0 +1,121 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+import subprocess
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'kubiya', 'mcp_discovery')
+
+# Bump when the cached tool schema format changes so stale entries are ignored
+DISCOVERY_CACHE_VERSION = '1'
+
+# Config fields that change what discovery finds for a given commit
+_KEY_FIELDS = ('git_repo_url', 'server_file_path', 'mcp_instance_name', 'discovery_mode')
+
+_SHA_PATTERN = re.compile(r'^[0-9a-f]{40}$')
+
+
+def is_commit_sha(ref: str) -> bool:
+    return bool(ref) and bool(_SHA_PATTERN.match(ref.lower()))
+
+
+def resolve_commit_sha(repo_url: str, ref: str, timeout: float = 30) -> Optional[str]:
+    """
+    Resolves a branch or tag to the commit it points at with ``git ls-remote``,
+    without cloning. Annotated tags resolve to the commit they tag. Returns None
+    if the ref cannot be resolved.
+    """
+    if is_commit_sha(ref):
+        return ref.lower()
+    try:
+        result = subprocess.run(
+            ["git", "ls-remote", repo_url, ref, f"{ref}^{{}}"],
+            check=True, capture_output=True, text=True, timeout=timeout
+        )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
+        logger.warning(f"Could not resolve {ref} in {repo_url} with git ls-remote: {e}")
+        return None
+
+    refs = {}
+    for line in result.stdout.splitlines():
+        parts = line.split('\t')
+        if len(parts) == 2:
+            refs[parts[1]] = parts[0]
+    # Prefer the peeled tag (the commit), then branches, then the tag object itself
+    for name in (f"refs/tags/{ref}^{{}}", f"refs/heads/{ref}", f"refs/tags/{ref}", ref):
+        if name in refs:
+            return refs[name]
+    return None
+
+
+class DiscoveryCache:
+    """
+    On-disk cache of discovered tool schemas keyed by commit SHA.
+
+    An entry is valid for as long as the server's branch or tag still points at
+    the same commit and the discovery-relevant config fields are unchanged, so
+    unchanged servers are answered from ``git ls-remote`` alone.
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.environ.get('MCP_DISCOVERY_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+        os.makedirs(os.path.join(self.cache_dir, 'servers'), exist_ok=True)
+
+    @classmethod
+    def get_default(cls) -> 'DiscoveryCache':
+        """Returns the process-wide cache instance."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def is_enabled(config: Optional[Dict[str, Any]] = None) -> bool:
+        """Checks whether cached discovery results may be used for a server."""
+        if os.environ.get('MCP_DISCOVERY_CACHE_DISABLE', '').lower() in ('1', 'true', 'yes'):
+            return False
+        return not config or config.get('discovery_cache', True)
+
+    @staticmethod
+    def key(config: Dict[str, Any], commit_sha: str, discovery_mode: str) -> str:
+        fields = {name: config.get(name) for name in _KEY_FIELDS}
+        fields['discovery_mode'] = discovery_mode
+        payload = json.dumps(fields, sort_keys=True)
+        return hashlib.sha256(f"{DISCOVERY_CACHE_VERSION}|{commit_sha}|{payload}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, 'servers', f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Returns the cached tool dicts for a key, or None."""
+        try:
+            with open(self._path(key), 'r') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            entry = None
+        with self._lock:
+            self.stats['hits' if entry is not None else 'misses'] += 1
+        return entry.get('tools') if entry is not None else None
+
+    def put(self, key: str, commit_sha: str, tools: List[Dict[str, Any]]) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'commit_sha': commit_sha, 'tools': tools}, f, default=str)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write discovery cache entry {key}: {e}")
+
+
+__all__ = ['DiscoveryCache', 'resolve_commit_sha', 'is_commit_sha', 'DISCOVERY_CACHE_VERSION']
@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+"""
+Resident MCP client gateway.
+
+Keeps pooled, keep-alive MCP sessions to every deployed MCP server and exposes
+them over a small HTTP API, so generated Kubiya tools can call an MCP tool with
+a single HTTP request instead of installing fastmcp, starting a client and
+performing the MCP handshake on every invocation.
+
+    POST /call/{server_id}/{tool_name}   body: JSON object of tool arguments
+    POST /call/{server_id}/{tool_name}?stream=1
+         streams newline-delimited JSON events: "progress" events as the server
+         reports them, then one "result" (or "error") event
+    GET  /healthz
+    GET  /stats
+
+This file is self-contained so it can be copied into the gateway image and run
+directly:
+
+    python gateway.py --config servers_to_sync.json --port 8080
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+try:
+    import uvicorn
+    from fastmcp import Client
+    from mcp.shared.exceptions import McpError
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, StreamingResponse
+    from starlette.routing import Route
+    GATEWAY_DEPENDENCIES_AVAILABLE = True
+except ImportError:
+    GATEWAY_DEPENDENCIES_AVAILABLE = False
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_GATEWAY_PORT = 8080
+# Sessions kept open per upstream server; calls are spread across them round-robin
+DEFAULT_POOL_SIZE = 2
+# Sessions idle for longer than this are closed and reopened on next use
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_CALL_TIMEOUT = 300
+
+
+def upstream_url(server_config: Dict[str, Any]) -> str:
+    """URL of a deployed server's MCP endpoint, matching the Service created in deploy mode."""
+    if server_config.get("gateway_upstream_url"):
+        return server_config["gateway_upstream_url"]
+    # Same name as k8s_reconcile.resource_name
+    service_name = f"mcp-{server_config['id'].lower().replace('_', '-')}"
+    return f"http://{service_name}:{server_config.get('service_port', 8000)}/mcp"
+
+
+def load_upstreams(config_path: str) -> Dict[str, str]:
+    """Maps server id to MCP URL for every deploy-mode server in servers_to_sync.json."""
+    with open(config_path, 'r') as f:
+        server_configs = json.load(f)
+    return {
+        config["id"]: upstream_url(config)
+        for config in server_configs
+        if config.get("id") and str(config.get("mode", "sync")).lower() == "deploy"
+    }
+
+
+def result_field(result: Any, name: str, legacy_name: str) -> Any:
+    """Reads a CallToolResult field, falling back to its camelCase name in older MCP SDKs."""
+    return getattr(result, name) if hasattr(result, name) else getattr(result, legacy_name, None)
+
+
+def is_transport_error(error: BaseException) -> bool:
+    """Whether a failed call means its session is broken, rather than just this call."""
+    # The server answered with an error, or this one request timed out; the
+    # session still serves the other calls running on it
+    return not isinstance(error, (asyncio.TimeoutError, TimeoutError, McpError))
+
+
+def serialize_result(result: Any) -> Dict[str, Any]:
+    """Converts an MCP CallToolResult into plain JSON."""
+    content = []
+    for item in getattr(result, "content", None) or []:
+        if hasattr(item, "model_dump"):
+            content.append(item.model_dump(mode="json", exclude_none=True))
+        elif hasattr(item, "dict"):
+            content.append(item.dict(exclude_none=True))
+        else:
+            content.append({"type": "text", "text": str(item)})
+    return {
+        "content": content,
+        "structured_content": result_field(result, "structured_content", "structuredContent"),
+        "is_error": bool(result_field(result, "is_error", "isError")),
+    }
+
+
+class PooledSession:
+    """One keep-alive MCP session that is (re)connected lazily.
+
+    Several calls can share the session. When one of them finds the transport
+    dead, the client is retired: new calls get a fresh connection while the old
+    client is only closed once the last call still running on it has returned.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.client: Optional[Any] = None
+        self.last_used = 0.0
+        self.in_flight = 0
+        self._connect_lock = asyncio.Lock()
+        # Calls running per client, keyed by id(), and clients waiting for theirs to finish
+        self._client_calls: Dict[int, int] = {}
+        self._retired: List[Any] = []
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None
+
+    async def ensure_connected(self) -> Any:
+        async with self._connect_lock:
+            if self.client is None:
+                client = Client(self.url)
+                await client.__aenter__()
+                self.client = client
+                logger.info(f"Opened MCP session to {self.url}")
+            return self.client
+
+    async def acquire(self) -> Any:
+        client = await self.ensure_connected()
+        self._client_calls[id(client)] = self._client_calls.get(id(client), 0) + 1
+        return client
+
+    async def release(self, client: Any) -> None:
+        remaining = self._client_calls.pop(id(client), 1) - 1
+        if remaining:
+            self._client_calls[id(client)] = remaining
+        elif any(retired is client for retired in self._retired):
+            self._retired = [retired for retired in self._retired if retired is not client]
+            await self._close_client(client)
+
+    async def retire(self, client: Any) -> None:
+        """Stop handing out a client whose transport failed; it is closed by its last release."""
+        async with self._connect_lock:
+            if self.client is client:
+                self.client = None
+        if not any(retired is client for retired in self._retired):
+            self._retired.append(client)
+
+    async def _close_client(self, client: Any) -> None:
+        try:
+            await client.__aexit__(None, None, None)
+        except Exception as e:
+            logger.debug(f"Error closing MCP session to {self.url}: {e}")
+
+    async def close(self) -> None:
+        async with self._connect_lock:
+            client, self.client = self.client, None
+        retired, self._retired = self._retired, []
+        for stale in ([client] if client is not None else []) + retired:
+            await self._close_client(stale)
+
+
+class UpstreamPool:
+    """A fixed number of sessions to one MCP server, used round-robin."""
+
+    def __init__(self, server_id: str, url: str, size: int):
+        self.server_id = server_id
+        self.url = url
+        self.sessions = [PooledSession(url) for _ in range(max(1, size))]
+        self._next = 0
+        self.stats = {"calls": 0, "errors": 0, "reconnects": 0, "total_ms": 0.0}
+
+    def _pick(self) -> PooledSession:
+        session = self.sessions[self._next % len(self.sessions)]
+        self._next += 1
+        return session
+
+    async def call(self, tool_name: str, arguments: Dict[str, Any], timeout: float,
+                   progress_handler: Optional[Callable[..., Awaitable[None]]] = None) -> Dict[str, Any]:
+        session = self._pick()
+        start = time.monotonic()
+        self.stats["calls"] += 1
+        session.in_flight += 1
+        try:
+            for attempt in range(2):
+                reused = session.connected
+                client = await session.acquire()
+                try:
+                    result = await client.call_tool_mcp(tool_name, arguments, progress_handler=progress_handler,
+                                                         timeout=timeout)
+                    break
+                except Exception as e:
+                    broken = is_transport_error(e)
+                    if broken:
+                        # Other calls may still be running on this client; it is closed after the last one
+                        await session.retire(client)
+                    # Only a stale keep-alive session is retried; a timeout may have run the tool already
+                    if attempt or not reused or not broken:
+                        raise
+                    self.stats["reconnects"] += 1
+                finally:
+                    await session.release(client)
+            payload = serialize_result(result)
+            if payload["is_error"]:
+                self.stats["errors"] += 1
+            return payload
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            session.in_flight -= 1
+            session.last_used = time.monotonic()
+            self.stats["total_ms"] += (time.monotonic() - start) * 1000
+
+    async def close_idle(self, idle_timeout: float) -> None:
+        now = time.monotonic()
+        for session in self.sessions:
+            if session.connected and not session.in_flight and now - session.last_used > idle_timeout:
+                logger.info(f"Closing idle MCP session to {self.url}")
+                await session.close()
+
+    async def close(self) -> None:
+        for session in self.sessions:
+            await session.close()
+
+
+class MCPGateway:
+    """Routes tool calls to pooled sessions, one pool per configured MCP server."""
+
+    def __init__(self, upstreams: Dict[str, str], pool_size: Optional[int] = None,
+                 idle_timeout: Optional[float] = None, call_timeout: Optional[float] = None):
+        pool_size = pool_size or int(os.getenv("MCP_GATEWAY_POOL_SIZE", DEFAULT_POOL_SIZE))
+        self.idle_timeout = idle_timeout or float(os.getenv("MCP_GATEWAY_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT))
+        self.call_timeout = call_timeout or float(os.getenv("MCP_GATEWAY_CALL_TIMEOUT", DEFAULT_CALL_TIMEOUT))
+        self.pools = {server_id: UpstreamPool(server_id, url, pool_size) for server_id, url in upstreams.items()}
+        self._reaper: Optional[asyncio.Task] = None
+
+    async def call(self, server_id: str, tool_name: str, arguments: Dict[str, Any],
+                   progress_handler: Optional[Callable[..., Awaitable[None]]] = None) -> Dict[str, Any]:
+        pool = self.pools.get(server_id)
+        if pool is None:
+            raise KeyError(server_id)
+        return await pool.call(tool_name, arguments, self.call_timeout, progress_handler=progress_handler)
+
+    async def _reap_idle(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, self.idle_timeout / 2))
+            for pool in self.pools.values():
+                await pool.close_idle(self.idle_timeout)
+
+    async def start(self) -> None:
+        self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def stop(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+        for pool in self.pools.values():
+            await pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            server_id: dict(
+                pool.stats,
+                url=pool.url,
+                open_sessions=sum(1 for session in pool.sessions if session.connected)
+            )
+            for server_id, pool in self.pools.items()
+        }
+
+
+def create_app(gateway: MCPGateway) -> Any:
+    """Builds the Starlette application that serves the gateway API."""
+
+    async def call_tool(request: Request) -> JSONResponse:
+        server_id = request.path_params["server_id"]
+        tool_name = request.path_params["tool_name"]
+        try:
+            body = await request.body()
+            arguments = json.loads(body) if body else {}
+        except json.JSONDecodeError as e:
+            return JSONResponse({"error": f"Invalid JSON arguments: {e}"}, status_code=400)
+        if not isinstance(arguments, dict):
+            return JSONResponse({"error": "Tool arguments must be a JSON object"}, status_code=400)
+
+        if server_id not in gateway.pools:
+            return JSONResponse({"error": f"Unknown MCP server '{server_id}'"}, status_code=404)
+        if request.query_params.get("stream", "").lower() in ("1", "true", "yes"):
+            return StreamingResponse(stream_call(server_id, tool_name, arguments), media_type="application/x-ndjson")
+
+        start = time.monotonic()
+        try:
+            payload = await gateway.call(server_id, tool_name, arguments)
+        except KeyError:
+            return JSONResponse({"error": f"Unknown MCP server '{server_id}'"}, status_code=404)
+        except Exception as e:
+            logger.error(f"Call to {server_id}/{tool_name} failed: {e}")
+            return JSONResponse({"error": str(e)}, status_code=502)
+        payload["elapsed_ms"] = round((time.monotonic() - start) * 1000, 2)
+        return JSONResponse(payload)
+
+    async def stream_call(server_id: str, tool_name: str, arguments: Dict[str, Any]):
+        """Yields progress events while the call runs, then its result."""
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def on_progress(progress: float, total: Optional[float], message: Optional[str]) -> None:
+            await events.put({"event": "progress", "progress": progress, "total": total, "message": message})
+
+        start = time.monotonic()
+        task = asyncio.create_task(gateway.call(server_id, tool_name, arguments, progress_handler=on_progress))
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield json.dumps(event) + "\n"
+            try:
+                payload = task.result()
+            except Exception as e:
+                logger.error(f"Call to {server_id}/{tool_name} failed: {e}")
+                yield json.dumps({"event": "error", "error": str(e)}) + "\n"
+                return
+            payload["elapsed_ms"] = round((time.monotonic() - start) * 1000, 2)
+            yield json.dumps(dict(payload, event="result")) + "\n"
+        finally:
+            # The client went away mid-stream
+            if not task.done():
+                task.cancel()
+
+    async def healthz(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok", "servers": sorted(gateway.pools)})
+
+    async def stats(request: Request) -> JSONResponse:
+        return JSONResponse(gateway.stats())
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await gateway.start()
+        try:
+            yield
+        finally:
+            await gateway.stop()
+
+    return Starlette(
+        routes=[
+            Route("/call/{server_id}/{tool_name}", call_tool, methods=["POST"]),
+            Route("/healthz", healthz, methods=["GET"]),
+            Route("/stats", stats, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pooled MCP client gateway")
+    parser.add_argument("--config", default=os.getenv("MCP_GATEWAY_CONFIG", "servers_to_sync.json"),
+                        help="servers_to_sync.json listing the deployed MCP servers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_GATEWAY_PORT", DEFAULT_GATEWAY_PORT)))
+    args = parser.parse_args()
+
+    if not GATEWAY_DEPENDENCIES_AVAILABLE:
+        raise SystemExit("The MCP gateway requires fastmcp, starlette and uvicorn to be installed.")
+
+    # Per-request httpx logging would dominate the gateway log
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    upstreams = load_upstreams(args.config)
+    if not upstreams:
+        logger.warning(f"No deploy-mode MCP servers found in {args.config}; the gateway has nothing to route to.")
+    for server_id, url in upstreams.items():
+        logger.info(f"Routing '{server_id}' to {url}")
+
+    uvicorn.run(create_app(MCPGateway(upstreams)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,504 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+try:
+    from kubernetes import client as k8s_client, config as k8s_config
+    KUBERNETES_AVAILABLE = True
+except ImportError:
+    KUBERNETES_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NAMESPACE = "kubiya"
+FIELD_MANAGER = "kubiya-mcp-sync"
+MANAGED_BY_LABEL = "app.kubernetes.io/managed-by"
+SERVER_ID_LABEL = "kubiya.ai/mcp-server-id"
+# Hash of the applied manifest; objects whose hash matches the desired one are left alone
+SPEC_HASH_ANNOTATION = "kubiya.ai/mcp-spec-hash"
+RESOURCE_PREFIX = "mcp-"
+
+DEFAULT_RECONCILE_WORKERS = 8
+# Shared deadline for all rollouts of one reconcile pass; 0 skips waiting
+DEFAULT_ROLLOUT_TIMEOUT = 300
+ROLLOUT_POLL_INTERVAL = 2.0
+
+MANAGED_KINDS = ("Deployment", "Service", "HorizontalPodAutoscaler", "PodDisruptionBudget")
+# Kinds a server only has when its config asks for them
+OPTIONAL_KINDS = ("HorizontalPodAutoscaler", "PodDisruptionBudget")
+
+# Requests let the scheduler place replicas and are required for CPU-based autoscaling
+DEFAULT_RESOURCES = {"requests": {"cpu": "100m", "memory": "256Mi"}}
+AUTOSCALING_METRICS = ("cpu", "requests")
+# Per-pod custom metric used by "requests" autoscaling; needs a custom metrics adapter (e.g. prometheus-adapter)
+DEFAULT_REQUESTS_METRIC = "http_requests_per_second"
+
+
+class ReadinessProbeConfig(BaseModel):
+    type: str = "tcp"  # "tcp" (port accepts connections) or "http" (GET path returns 2xx/3xx)
+    path: str = "/healthz"
+    initial_delay_seconds: int = 5
+    period_seconds: int = 5
+    timeout_seconds: int = 2
+    failure_threshold: int = 3
+
+
+class AutoscalingConfig(BaseModel):
+    min_replicas: int = 1
+    max_replicas: int = 5
+    metric: str = "cpu"  # one of AUTOSCALING_METRICS
+    target_cpu_utilization: int = 70  # percent of the CPU request
+    target_requests_per_second: float = 20  # per replica, for metric "requests"
+    requests_metric_name: str = DEFAULT_REQUESTS_METRIC
+    scale_down_stabilization_seconds: int = 300
+
+
+class DisruptionBudgetConfig(BaseModel):
+    min_available: Optional[Any] = None  # int or percentage string
+    max_unavailable: Optional[Any] = None
+
+
+class DeploySettings(BaseModel):
+    """Deploy-mode fields of a server entry in servers_to_sync.json."""
+    replicas: int = 1
+    resources: Dict[str, Dict[str, Any]] = Field(default_factory=lambda: json.loads(json.dumps(DEFAULT_RESOURCES)))
+    readiness_probe: Optional[ReadinessProbeConfig] = Field(default_factory=ReadinessProbeConfig)
+    autoscaling: Optional[AutoscalingConfig] = None
+    pod_disruption_budget: Optional[DisruptionBudgetConfig] = None
+
+    @property
+    def min_replicas(self) -> int:
+        return self.autoscaling.min_replicas if self.autoscaling else self.replicas
+
+
+DEPLOY_SETTING_KEYS = ("replicas", "resources", "readiness_probe", "autoscaling", "pod_disruption_budget")
+
+
+def deploy_settings(server_config: Dict[str, Any]) -> DeploySettings:
+    """Parses and checks the deploy-mode settings of a server; raises ValueError when they are inconsistent."""
+    fields = {key: server_config[key] for key in DEPLOY_SETTING_KEYS if key in server_config}
+    if fields.get("readiness_probe") is False:
+        fields["readiness_probe"] = None
+    settings = DeploySettings(**fields)
+
+    server_id = server_config.get("id")
+    if settings.replicas < 0:
+        raise ValueError(f"replicas must not be negative for server {server_id}")
+    if settings.readiness_probe and settings.readiness_probe.type not in ("tcp", "http"):
+        raise ValueError(f"readiness_probe.type must be 'tcp' or 'http' for server {server_id}")
+    autoscaling = settings.autoscaling
+    if autoscaling:
+        if autoscaling.metric not in AUTOSCALING_METRICS:
+            raise ValueError(f"autoscaling.metric must be one of {AUTOSCALING_METRICS} for server {server_id}")
+        if not 1 <= autoscaling.min_replicas <= autoscaling.max_replicas:
+            raise ValueError(f"autoscaling needs 1 <= min_replicas <= max_replicas for server {server_id}")
+        if autoscaling.metric == "cpu" and "cpu" not in settings.resources.get("requests", {}):
+            raise ValueError(f"CPU autoscaling needs resources.requests.cpu for server {server_id}")
+    budget = settings.pod_disruption_budget
+    if budget and (budget.min_available is None) == (budget.max_unavailable is None):
+        raise ValueError(f"pod_disruption_budget needs exactly one of min_available or max_unavailable for server {server_id}")
+    return settings
+
+
+def resource_name(server_config: Dict[str, Any]) -> str:
+    """DNS-1123 name of a server's Deployment and Service."""
+    return f"{RESOURCE_PREFIX}{server_config['id'].lower().replace('_', '-')}"
+
+
+def load_kube_config() -> bool:
+    """Loads in-cluster config, falling back to the local kubeconfig."""
+    if not KUBERNETES_AVAILABLE:
+        logger.error("The kubernetes package is required for deploy mode.")
+        return False
+    try:
+        k8s_config.load_incluster_config()
+        logger.info("Loaded in-cluster Kubernetes configuration.")
+    except Exception as e:
+        logger.warning(f"In-cluster config not available ({e}); attempting default kubeconfig...")
+        try:
+            k8s_config.load_kube_config()
+        except Exception as e2:
+            logger.error(f"Failed to load Kubernetes configuration: {e2}")
+            return False
+    return True
+
+
+def _with_spec_hash(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    spec_hash = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()
+    manifest["metadata"].setdefault("annotations", {})[SPEC_HASH_ANNOTATION] = spec_hash
+    return manifest
+
+
+def _metadata(server_config: Dict[str, Any], namespace: str) -> Dict[str, Any]:
+    name = resource_name(server_config)
+    return {
+        "name": name,
+        "namespace": namespace,
+        "labels": {"app": name, MANAGED_BY_LABEL: FIELD_MANAGER, SERVER_ID_LABEL: name[len(RESOURCE_PREFIX):]},
+    }
+
+
+def _env_and_volumes(server_config: Dict[str, Any]) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
+    """Returns (env, envFrom, volumeMounts, volumes) for the server container."""
+    env = [
+        {"name": "GIT_REPO_URL", "value": server_config["git_repo_url"]},
+        {"name": "GIT_BRANCH_OR_TAG", "value": server_config["git_branch_or_tag"]},
+        {"name": "SERVER_FILE_PATH", "value": server_config["server_file_path"]},
+        {"name": "MCP_INSTANCE_NAME", "value": server_config["mcp_instance_name"]},
+        {"name": "SERVICE_PORT", "value": str(server_config["service_port"])},
+    ]
+    if isinstance(server_config.get("env"), dict):
+        for key, value in server_config["env"].items():
+            env.append({"name": key, "value": str(value) if value is not None else ""})
+
+    env_from, volume_mounts, volumes = [], [], []
+    for idx, secret_config in enumerate(server_config.get("secrets") or []):
+        if isinstance(secret_config, dict) and "name" in secret_config:
+            if secret_config.get("mount_path"):
+                # Mount the secret as files
+                volume_name = f"secret-volume-{idx}"
+                volume_mounts.append({"name": volume_name, "mountPath": secret_config["mount_path"], "readOnly": True})
+                volumes.append({"name": volume_name, "secret": {"secretName": secret_config["name"]}})
+            else:
+                # Expose every key of the secret as an environment variable
+                env_from.append({"secretRef": {"name": secret_config["name"]}})
+        elif isinstance(secret_config, str):
+            env_from.append({"secretRef": {"name": secret_config}})
+
+    for vol in server_config.get("volumes") or []:
+        # Format: "/host/path:/container/path[:ro]"
+        if isinstance(vol, str) and ":" in vol:
+            parts = vol.split(":")
+            volume_name = f"hostpath-{len(volumes)}"
+            volume_mounts.append({
+                "name": volume_name,
+                "mountPath": parts[1],
+                "readOnly": len(parts) > 2 and parts[2] == "ro",
+            })
+            volumes.append({"name": volume_name, "hostPath": {"path": parts[0]}})
+    return env, env_from, volume_mounts, volumes
+
+
+def _readiness_probe(probe: ReadinessProbeConfig, port: int) -> Dict[str, Any]:
+    handler = {"httpGet": {"path": probe.path, "port": port}} if probe.type == "http" else {"tcpSocket": {"port": port}}
+    return dict(
+        handler,
+        initialDelaySeconds=probe.initial_delay_seconds,
+        periodSeconds=probe.period_seconds,
+        timeoutSeconds=probe.timeout_seconds,
+        failureThreshold=probe.failure_threshold,
+    )
+
+
+def build_deployment(server_config: Dict[str, Any], namespace: str,
+                     settings: Optional[DeploySettings] = None) -> Dict[str, Any]:
+    settings = settings or deploy_settings(server_config)
+    metadata = _metadata(server_config, namespace)
+    name = metadata["name"]
+    port = server_config["service_port"]
+    env, env_from, volume_mounts, volumes = _env_and_volumes(server_config)
+    container = {
+        "name": name,
+        "image": server_config["docker_image"],
+        "imagePullPolicy": "IfNotPresent",
+        "env": env,
+        "ports": [{"containerPort": port}],
+    }
+    if settings.resources:
+        container["resources"] = {
+            section: {key: str(value) for key, value in values.items()}
+            for section, values in settings.resources.items()
+        }
+    if settings.readiness_probe:
+        # Pods only receive Service traffic once the probe passes
+        container["readinessProbe"] = _readiness_probe(settings.readiness_probe, port)
+    if env_from:
+        container["envFrom"] = env_from
+    if volume_mounts:
+        container["volumeMounts"] = volume_mounts
+    pod_spec: Dict[str, Any] = {"containers": [container]}
+    if volumes:
+        pod_spec["volumes"] = volumes
+
+    spec: Dict[str, Any] = {
+        "selector": {"matchLabels": {"app": name}},
+        # Start a new replica before stopping an old one, so capacity never drops during a rollout
+        "strategy": {"type": "RollingUpdate", "rollingUpdate": {"maxSurge": 1, "maxUnavailable": 0}},
+        "template": {"metadata": {"labels": {"app": name}}, "spec": pod_spec},
+    }
+    if not settings.autoscaling:
+        # With an HPA the replica count belongs to the autoscaler; applying it here would reset it
+        spec["replicas"] = settings.replicas
+    return _with_spec_hash({"apiVersion": "apps/v1", "kind": "Deployment", "metadata": metadata, "spec": spec})
+
+
+def build_service(server_config: Dict[str, Any], namespace: str) -> Dict[str, Any]:
+    metadata = _metadata(server_config, namespace)
+    port = server_config["service_port"]
+    return _with_spec_hash({
+        "apiVersion": "v1",
+        "kind": "Service",
+        "metadata": metadata,
+        "spec": {
+            "type": "ClusterIP",
+            "selector": {"app": metadata["name"]},
+            "ports": [{"port": port, "targetPort": port}],
+        },
+    })
+
+
+def build_autoscaler(server_config: Dict[str, Any], namespace: str, autoscaling: AutoscalingConfig) -> Dict[str, Any]:
+    metadata = _metadata(server_config, namespace)
+    if autoscaling.metric == "cpu":
+        metric = {
+            "type": "Resource",
+            "resource": {"name": "cpu", "target": {"type": "Utilization",
+                                                   "averageUtilization": autoscaling.target_cpu_utilization}},
+        }
+    else:
+        metric = {
+            "type": "Pods",
+            "pods": {
+                "metric": {"name": autoscaling.requests_metric_name},
+                "target": {"type": "AverageValue", "averageValue": str(autoscaling.target_requests_per_second)},
+            },
+        }
+    return _with_spec_hash({
+        "apiVersion": "autoscaling/v2",
+        "kind": "HorizontalPodAutoscaler",
+        "metadata": metadata,
+        "spec": {
+            "scaleTargetRef": {"apiVersion": "apps/v1", "kind": "Deployment", "name": metadata["name"]},
+            "minReplicas": autoscaling.min_replicas,
+            "maxReplicas": autoscaling.max_replicas,
+            "metrics": [metric],
+            "behavior": {"scaleDown": {"stabilizationWindowSeconds": autoscaling.scale_down_stabilization_seconds}},
+        },
+    })
+
+
+def build_disruption_budget(server_config: Dict[str, Any], namespace: str,
+                            budget: DisruptionBudgetConfig) -> Dict[str, Any]:
+    metadata = _metadata(server_config, namespace)
+    spec: Dict[str, Any] = {"selector": {"matchLabels": {"app": metadata["name"]}}}
+    if budget.min_available is not None:
+        spec["minAvailable"] = budget.min_available
+    else:
+        spec["maxUnavailable"] = budget.max_unavailable
+    return _with_spec_hash({"apiVersion": "policy/v1", "kind": "PodDisruptionBudget", "metadata": metadata, "spec": spec})
+
+
+def desired_objects(server_config: Dict[str, Any], namespace: str) -> List[Dict[str, Any]]:
+    """All Kubernetes objects a deploy-mode server needs, as apply-ready manifests."""
+    settings = deploy_settings(server_config)
+    objects = [build_deployment(server_config, namespace, settings), build_service(server_config, namespace)]
+    if settings.autoscaling:
+        objects.append(build_autoscaler(server_config, namespace, settings.autoscaling))
+    budget = settings.pod_disruption_budget
+    if budget is None and settings.min_replicas > 1:
+        # Multi-replica servers keep all but one replica through voluntary disruptions by default;
+        # single-replica servers get none, as it would block node drains
+        budget = DisruptionBudgetConfig(max_unavailable=1)
+    if budget is not None:
+        objects.append(build_disruption_budget(server_config, namespace, budget))
+    return objects
+
+
+def _rollout_state(deployment: Any) -> Optional[bool]:
+    """True when the rollout is complete, False when it has failed, None while in progress."""
+    status = deployment.status
+    for condition in status.conditions or []:
+        if condition.type == "Progressing" and condition.reason == "ProgressDeadlineExceeded":
+            return False
+    desired = deployment.spec.replicas if deployment.spec.replicas is not None else 1
+    if (status.observed_generation or 0) < (deployment.metadata.generation or 0):
+        return None
+    updated = status.updated_replicas or 0
+    if updated < desired or (status.replicas or 0) > updated or (status.available_replicas or 0) < updated:
+        return None
+    return True
+
+
+class MCPReconciler:
+    """
+    Converges the deploy-mode MCP servers in one namespace to their configuration.
+
+    One pass lists the existing ``mcp-*`` objects of each managed kind once, applies
+    only the objects whose manifest hash changed (server-side apply, concurrently),
+    and then waits for all changed rollouts under a single deadline. An autoscaler or
+    disruption budget that a configured server no longer asks for is deleted; objects
+    of servers that are no longer configured are reported but never deleted.
+    """
+
+    def __init__(self, namespace: Optional[str] = None, max_workers: Optional[int] = None,
+                 rollout_timeout: Optional[float] = None, apps_api: Any = None, core_api: Any = None,
+                 autoscaling_api: Any = None, policy_api: Any = None):
+        self.namespace = namespace or os.getenv("KUBIYA_K8S_NAMESPACE", DEFAULT_NAMESPACE)
+        self.max_workers = max_workers or int(os.getenv("MCP_RECONCILE_WORKERS", DEFAULT_RECONCILE_WORKERS))
+        self.rollout_timeout = rollout_timeout if rollout_timeout is not None else \
+            float(os.getenv("MCP_ROLLOUT_TIMEOUT", DEFAULT_ROLLOUT_TIMEOUT))
+        self.apps_api = apps_api or k8s_client.AppsV1Api()
+        self.core_api = core_api or k8s_client.CoreV1Api()
+        self.autoscaling_api = autoscaling_api or k8s_client.AutoscalingV2Api()
+        self.policy_api = policy_api or k8s_client.PolicyV1Api()
+
+    def _api_for(self, kind: str) -> Tuple[Any, str]:
+        apis = {
+            "Deployment": (self.apps_api, "deployment"),
+            "Service": (self.core_api, "service"),
+            "HorizontalPodAutoscaler": (self.autoscaling_api, "horizontal_pod_autoscaler"),
+            "PodDisruptionBudget": (self.policy_api, "pod_disruption_budget"),
+        }
+        return apis[kind]
+
+    def _list_existing(self, kinds: List[str]) -> Dict[Tuple[str, str], Any]:
+        """Returns the existing mcp-* objects of each kind, one list call per kind."""
+        existing = {}
+        for kind in kinds:
+            api, resource = self._api_for(kind)
+            items = getattr(api, f"list_namespaced_{resource}")(namespace=self.namespace).items
+            for item in items:
+                if item.metadata.name.startswith(RESOURCE_PREFIX):
+                    existing[(kind, item.metadata.name)] = item
+        return existing
+
+    def _apply(self, manifest: Dict[str, Any]) -> None:
+        api, resource = self._api_for(manifest["kind"])
+        getattr(api, f"patch_namespaced_{resource}")(
+            name=manifest["metadata"]["name"],
+            namespace=self.namespace,
+            body=manifest,
+            field_manager=FIELD_MANAGER,
+            force=True,
+            _content_type="application/apply-patch+yaml",
+        )
+        logger.info(f"Applied {manifest['kind']} '{manifest['metadata']['name']}' in namespace '{self.namespace}'.")
+
+    def _delete(self, kind: str, name: str) -> None:
+        api, resource = self._api_for(kind)
+        getattr(api, f"delete_namespaced_{resource}")(name=name, namespace=self.namespace)
+        logger.info(f"Deleted {kind} '{name}' in namespace '{self.namespace}'; it is no longer configured.")
+
+    def _wait_for_rollouts(self, names: List[str]) -> Dict[str, bool]:
+        """Polls all pending Deployments with one list call per round until they are ready or the deadline passes."""
+        results: Dict[str, bool] = {}
+        pending = set(names)
+        deadline = time.monotonic() + self.rollout_timeout
+        while pending:
+            current = {item.metadata.name: item for item in
+                       self.apps_api.list_namespaced_deployment(namespace=self.namespace).items}
+            for name in list(pending):
+                state = _rollout_state(current[name]) if name in current else None
+                if state is not None:
+                    results[name] = state
+                    pending.discard(name)
+                    if state:
+                        logger.info(f"Deployment '{name}' rolled out.")
+                    else:
+                        logger.error(f"Deployment '{name}' exceeded its progress deadline.")
+            if not pending:
+                break
+            if time.monotonic() >= deadline:
+                logger.error(f"Timed out after {self.rollout_timeout:.0f}s waiting for rollout of: {', '.join(sorted(pending))}")
+                results.update({name: False for name in pending})
+                break
+            time.sleep(ROLLOUT_POLL_INTERVAL)
+        return results
+
+    def reconcile(self, server_configs: List[Dict[str, Any]]) -> Dict[str, bool]:
+        """Returns, per server id, whether its objects are applied and (if changed) rolled out."""
+        start = time.monotonic()
+        results: Dict[str, bool] = {}
+        desired: Dict[str, List[Dict[str, Any]]] = {}
+        for config in server_configs:
+            try:
+                desired[config["id"]] = desired_objects(config, self.namespace)
+                results[config["id"]] = True
+            except KeyError as e:
+                logger.error(f"Server {config.get('id')} is missing required config field {e}; skipping deployment.")
+                results[config.get("id")] = False
+            except ValueError as e:
+                logger.error(f"Invalid deploy settings for server {config.get('id')}: {e}")
+                results[config.get("id")] = False
+        if not desired:
+            return results
+
+        try:
+            existing = self._list_existing(list(MANAGED_KINDS))
+        except Exception as e:
+            logger.error(f"Failed to list existing MCP objects in namespace '{self.namespace}': {e}")
+            return {server_id: False for server_id in results}
+
+        changes: List[Tuple[str, Dict[str, Any]]] = []
+        for server_id, manifests in desired.items():
+            for manifest in manifests:
+                current = existing.get((manifest["kind"], manifest["metadata"]["name"]))
+                current_hash = ((current.metadata.annotations or {}).get(SPEC_HASH_ANNOTATION)
+                                if current is not None else None)
+                if current_hash != manifest["metadata"]["annotations"][SPEC_HASH_ANNOTATION]:
+                    changes.append((server_id, manifest))
+
+        desired_keys = {(m["kind"], m["metadata"]["name"]) for manifests in desired.values() for m in manifests}
+        server_ids = {manifests[0]["metadata"]["name"]: server_id for server_id, manifests in desired.items()}
+        deletions: List[Tuple[str, str, str]] = []
+        for (kind, name), item in existing.items():
+            if (kind, name) in desired_keys or (item.metadata.labels or {}).get(MANAGED_BY_LABEL) != FIELD_MANAGER:
+                continue
+            if kind in OPTIONAL_KINDS and name in server_ids:
+                # The server dropped its autoscaling or disruption budget settings
+                deletions.append((server_ids[name], kind, name))
+            else:
+                logger.warning(f"{kind} '{name}' is no longer configured; leaving it in place.")
+
+        logger.info(f"Reconciling {len(desired)} deploy-mode servers: {len(changes)} objects to apply, "
+                    f"{sum(len(m) for m in desired.values()) - len(changes)} unchanged.")
+
+        rollouts = []
+        if changes or deletions:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(changes) + len(deletions))) as executor:
+                delete_futures = [(server_id, kind, name, executor.submit(self._delete, kind, name))
+                                  for server_id, kind, name in deletions]
+                futures = [(server_id, manifest, executor.submit(self._apply, manifest)) for server_id, manifest in changes]
+                for server_id, kind, name, future in delete_futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to delete {kind} '{name}': {e}")
+                        results[server_id] = False
+                for server_id, manifest, future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to apply {manifest['kind']} '{manifest['metadata']['name']}': {e}")
+                        results[server_id] = False
+                        continue
+                    if manifest["kind"] == "Deployment":
+                        rollouts.append((server_id, manifest["metadata"]["name"]))
+
+        if rollouts and self.rollout_timeout > 0:
+            rollout_results = self._wait_for_rollouts([name for _, name in rollouts])
+            for server_id, name in rollouts:
+                results[server_id] = results[server_id] and rollout_results.get(name, False)
+
+        logger.info(f"Reconcile finished in {time.monotonic() - start:.1f}s: "
+                    f"{sum(results.values())}/{len(results)} servers ready.")
+        return results
+
+
+def reconcile_deployments(server_configs: List[Dict[str, Any]], namespace: Optional[str] = None) -> Dict[str, bool]:
+    """Loads the cluster config and reconciles the given deploy-mode servers in one pass."""
+    if not server_configs:
+        return {}
+    if not load_kube_config():
+        return {config.get("id"): False for config in server_configs}
+    return MCPReconciler(namespace=namespace).reconcile(server_configs)
+
+
+__all__ = ['MCPReconciler', 'DeploySettings', 'deploy_settings', 'reconcile_deployments', 'desired_objects',
+           'resource_name', 'KUBERNETES_AVAILABLE']
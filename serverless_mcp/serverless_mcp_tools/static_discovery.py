@@ -0,0 +1,311 @@
+import ast
+import re
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Annotation names mapped to the simplified parameter types used by discovery.py
+_TYPE_NAMES = {
+    'str': 'string',
+    'int': 'integer',
+    'float': 'number',
+    'bool': 'boolean',
+    'dict': 'object',
+    'Dict': 'object',
+    'Mapping': 'object',
+    'list': 'array',
+    'List': 'array',
+    'Sequence': 'array',
+    'tuple': 'array',
+    'Tuple': 'array',
+    'set': 'array',
+    'Set': 'array',
+    'bytes': 'string',
+}
+
+# Wrappers whose first type argument decides the parameter type
+_UNWRAP_NAMES = {'Optional', 'Annotated', 'Required', 'NotRequired'}
+
+_MISSING = object()
+
+
+def _dotted_name(node: ast.AST) -> str:
+    """Returns 'a.b.c' for Name/Attribute chains and '' for anything else."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        parent = _dotted_name(node.value)
+        return f"{parent}.{node.attr}" if parent else ''
+    return ''
+
+
+def _last_name(node: ast.AST) -> str:
+    return _dotted_name(node).rsplit('.', 1)[-1]
+
+
+def _literal(node: Optional[ast.AST]) -> Any:
+    """Evaluates a literal expression, or returns _MISSING when it is not a literal."""
+    if node is None:
+        return _MISSING
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return _MISSING
+
+
+def _annotation_type(node: Optional[ast.AST]) -> str:
+    """Maps an annotation expression to 'string', 'integer', 'number', 'boolean', 'object' or 'array'."""
+    if node is None:
+        return 'string'
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        # String (forward reference) annotation such as "int" or "list[str]"
+        try:
+            return _annotation_type(ast.parse(node.value, mode='eval').body)
+        except SyntaxError:
+            return 'string'
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        # PEP 604 union: the first member that is not None wins
+        for member in (node.left, node.right):
+            if not (isinstance(member, ast.Constant) and member.value is None):
+                return _annotation_type(member)
+        return 'string'
+    if isinstance(node, ast.Subscript):
+        origin = _last_name(node.value)
+        args = node.slice.elts if isinstance(node.slice, ast.Tuple) else [node.slice]
+        if origin in _UNWRAP_NAMES:
+            return _annotation_type(args[0])
+        if origin == 'Union':
+            for member in args:
+                if not (isinstance(member, ast.Constant) and member.value is None):
+                    return _annotation_type(member)
+            return 'string'
+        if origin == 'Literal':
+            value = _literal(args[0])
+            return _python_value_type(value) if value is not _MISSING else 'string'
+        return _TYPE_NAMES.get(origin, 'string')
+    return _TYPE_NAMES.get(_last_name(node), 'string')
+
+
+def _python_value_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return 'integer'
+    if isinstance(value, float):
+        return 'number'
+    if isinstance(value, dict):
+        return 'object'
+    if isinstance(value, (list, tuple, set)):
+        return 'array'
+    return 'string'
+
+
+def _field_call(node: Optional[ast.AST]) -> Optional[ast.Call]:
+    """Returns the node if it is a pydantic ``Field(...)`` call."""
+    if isinstance(node, ast.Call) and _last_name(node.func) == 'Field':
+        return node
+    return None
+
+
+def _keyword(call: ast.Call, name: str) -> Optional[ast.AST]:
+    for keyword in call.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+
+def _annotated_field(annotation: Optional[ast.AST]) -> Optional[ast.Call]:
+    """Finds ``Field(...)`` metadata in ``Annotated[T, Field(...)]``."""
+    if isinstance(annotation, ast.Subscript) and _last_name(annotation.value) == 'Annotated' \
+            and isinstance(annotation.slice, ast.Tuple):
+        for meta in annotation.slice.elts[1:]:
+            field = _field_call(meta)
+            if field is not None:
+                return field
+    return None
+
+
+def _docstring_params(docstring: Optional[str]) -> Dict[str, str]:
+    """Extracts parameter descriptions from Google style (``Args:``) or Sphinx style docstrings."""
+    if not docstring:
+        return {}
+    descriptions = {}
+    for name, text in re.findall(r':param\s+(?:\w+\s+)?(\w+):\s*(.+)', docstring):
+        descriptions[name] = text.strip()
+
+    in_args = False
+    current = None
+    for line in docstring.splitlines():
+        stripped = line.strip()
+        if re.match(r'^(Args|Arguments|Parameters):$', stripped):
+            in_args = True
+            continue
+        if not in_args:
+            continue
+        if re.match(r'^[A-Z]\w*:$', stripped):
+            # The next section (Returns:, Raises:, ...) ends the block
+            break
+        if not stripped:
+            current = None
+            continue
+        match = re.match(r'^(\*{0,2}\w+)\s*(?:\([^)]*\))?\s*:\s*(.*)$', stripped)
+        if match:
+            current = match.group(1).lstrip('*')
+            descriptions[current] = match.group(2).strip()
+        elif current is not None:
+            descriptions[current] = f"{descriptions[current]} {stripped}".strip()
+    return descriptions
+
+
+def _strip_docstring_sections(docstring: Optional[str]) -> Optional[str]:
+    """Drops the Args/Returns sections, which are already represented by parameters."""
+    if not docstring:
+        return docstring
+    lines = []
+    for line in docstring.splitlines():
+        if re.match(r'^\s*(Args|Arguments|Parameters|Returns|Raises|Yields):\s*$', line) or \
+                re.match(r'^\s*:(param|type|return|rtype|raises)\b', line):
+            break
+        lines.append(line)
+    return '\n'.join(lines).strip() or None
+
+
+def _is_context(annotation: Optional[ast.AST]) -> bool:
+    if annotation is None:
+        return False
+    if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+        return annotation.value.rsplit('.', 1)[-1] == 'Context'
+    if isinstance(annotation, ast.Subscript):
+        return _is_context(annotation.value)
+    return _last_name(annotation) == 'Context'
+
+
+def _extract_parameters(func: ast.AST, docstring: Optional[str]) -> List[Dict[str, Any]]:
+    args = func.args
+    positional = args.posonlyargs + args.args
+    # Defaults align with the tail of the positional parameters
+    defaults: List[Optional[ast.AST]] = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    pairs: List[Tuple[ast.arg, Optional[ast.AST]]] = list(zip(positional, defaults))
+    pairs += list(zip(args.kwonlyargs, args.kw_defaults))
+    doc_params = _docstring_params(docstring)
+
+    parameters = []
+    for arg, default_node in pairs:
+        if arg.arg in ('self', 'cls') or _is_context(arg.annotation):
+            continue
+
+        description = doc_params.get(arg.arg)
+        default_field = _field_call(default_node)
+        field = default_field or _annotated_field(arg.annotation)
+        if field is not None:
+            field_description = _literal(_keyword(field, 'description'))
+            if isinstance(field_description, str):
+                description = field_description
+
+        if default_field is not None:
+            # Field(default, ...) / Field(default=...) / Field(default_factory=...)
+            default_node = _keyword(default_field, 'default')
+            if default_node is None and default_field.args:
+                default_node = default_field.args[0]
+            has_default = default_node is not None or _keyword(default_field, 'default_factory') is not None
+        else:
+            has_default = default_node is not None
+        if isinstance(default_node, ast.Constant) and default_node.value is Ellipsis:
+            # Field(...) marks a required parameter
+            default_node, has_default = None, False
+
+        default = _literal(default_node)
+        parameters.append({
+            'name': arg.arg,
+            'type': _annotation_type(arg.annotation),
+            'description': description,
+            'required': not has_default,
+            'default': None if default is _MISSING else default,
+        })
+    return parameters
+
+
+def _tool_decorator(decorator: ast.AST, mcp_instance_name: str) -> Optional[Dict[str, Any]]:
+    """Returns the decorator's options if it is ``@<instance>.tool`` or ``@<instance>.tool(...)``."""
+    call = decorator if isinstance(decorator, ast.Call) else None
+    target = call.func if call is not None else decorator
+    if _dotted_name(target) != f"{mcp_instance_name}.tool":
+        return None
+    options: Dict[str, Any] = {}
+    if call is not None:
+        if call.args:
+            # @mcp.tool("custom_name")
+            name = _literal(call.args[0])
+            if isinstance(name, str):
+                options['name'] = name
+        for key in ('name', 'description'):
+            value = _literal(_keyword(call, key))
+            if isinstance(value, str):
+                options[key] = value
+    return options
+
+
+def _build_tool(func: ast.AST, options: Dict[str, Any]) -> Dict[str, Any]:
+    docstring = ast.get_docstring(func)
+    return {
+        'name': options.get('name') or func.name,
+        'description': options.get('description') or _strip_docstring_sections(docstring),
+        'parameters': _extract_parameters(func, docstring),
+    }
+
+
+def _instance_assigned(tree: ast.Module, mcp_instance_name: str) -> bool:
+    for node in tree.body:
+        targets = []
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign):
+            targets = [node.target]
+        if any(isinstance(target, ast.Name) and target.id == mcp_instance_name for target in targets):
+            return True
+    return False
+
+
+def discover_tools_statically(file_path: str, mcp_instance_name: str) -> List[Dict[str, Any]]:
+    """
+    Finds FastMCP tools in a server file by parsing its source, without importing it.
+    Recognizes ``@<instance>.tool`` / ``@<instance>.tool(...)`` decorated functions and
+    ``<instance>.add_tool(func)`` registrations. Returns tool dicts in the shape of
+    DiscoveredMCPToolSchema; raises SyntaxError/OSError if the file cannot be parsed.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    tree = ast.parse(source, filename=file_path)
+
+    if not _instance_assigned(tree, mcp_instance_name):
+        logger.warning(f"No module-level assignment of '{mcp_instance_name}' found in {file_path}")
+
+    functions: Dict[str, ast.AST] = {}
+    tools: List[Dict[str, Any]] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        functions.setdefault(node.name, node)
+        for decorator in node.decorator_list:
+            options = _tool_decorator(decorator, mcp_instance_name)
+            if options is not None:
+                tools.append(_build_tool(node, options))
+                break
+
+    # Imperative registration: mcp.add_tool(func) / mcp.add_tool(func, name=..., description=...)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and _dotted_name(node.func) == f"{mcp_instance_name}.add_tool" \
+                and node.args and isinstance(node.args[0], ast.Name) and node.args[0].id in functions:
+            options = {}
+            for key in ('name', 'description'):
+                value = _literal(_keyword(node, key))
+                if isinstance(value, str):
+                    options[key] = value
+            tools.append(_build_tool(functions[node.args[0].id], options))
+
+    logger.info(f"Statically discovered {len(tools)} tools in {file_path}")
+    return tools
+
+
+__all__ = ['discover_tools_statically']
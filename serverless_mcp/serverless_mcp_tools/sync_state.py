@@ -0,0 +1,108 @@
+import os
+import json
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+from .discovery_cache import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def definition_hash(definition: Dict[str, Any]) -> str:
+    """Stable hash of a Kubiya tool definition, used to detect changed tools."""
+    return hashlib.sha256(json.dumps(definition, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SyncState:
+    """
+    The set of tool definitions emitted by the previous sync, stored as JSON.
+
+    Entries are keyed by tool name and record the server the tool came from,
+    so tools of servers that failed to discover this run can be carried over
+    instead of being reported as removed.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get(
+            'MCP_SYNC_STATE_PATH',
+            os.path.join(os.environ.get('MCP_DISCOVERY_CACHE_DIR', DEFAULT_CACHE_DIR), 'last_sync.json')
+        )
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get('tools', {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable sync state {self.path}: {e}")
+            return {}
+
+    def save(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'tools': entries}, f, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to write sync state {self.path}: {e}")
+
+
+def state_entries(definitions: Iterable[Tuple[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Builds state entries from (server_id, tool definition) pairs."""
+    return {
+        definition['name']: {
+            'server_id': server_id,
+            'hash': definition_hash(definition),
+            'definition': definition,
+        }
+        for server_id, definition in definitions
+    }
+
+
+def compute_sync_diff(previous: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]],
+                      retained_server_ids: Iterable[str] = ()) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Compares the previous and current sync.
+
+    Tools of servers in ``retained_server_ids`` (configured, but not discovered this
+    run) are carried over unchanged rather than reported as removed. Returns the diff
+    and the state to persist for the next run.
+    """
+    retained_server_ids = set(retained_server_ids)
+    new_state = dict(current)
+    for name, entry in previous.items():
+        if name not in new_state and entry.get('server_id') in retained_server_ids:
+            new_state[name] = entry
+
+    added: List[Dict[str, Any]] = []
+    changed: List[Dict[str, Any]] = []
+    unchanged: List[str] = []
+    for name, entry in current.items():
+        if name not in previous:
+            added.append(entry['definition'])
+        elif previous[name].get('hash') != entry['hash']:
+            changed.append(entry['definition'])
+        else:
+            unchanged.append(name)
+    removed = sorted(name for name in previous if name not in new_state)
+
+    diff = {
+        'added': added,
+        'changed': changed,
+        'removed': removed,
+        'unchanged': sorted(unchanged),
+        'summary': {
+            'added': len(added),
+            'changed': len(changed),
+            'removed': len(removed),
+            'unchanged': len(unchanged),
+            'retained_servers': sorted(retained_server_ids),
+        },
+    }
+    return diff, new_state
+
+
+__all__ = ['SyncState', 'compute_sync_diff', 'definition_hash', 'state_entries']
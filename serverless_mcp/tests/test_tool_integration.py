@@ -119,7 +119,8 @@ class TestServerlessMCPIntegration(unittest.TestCase):
         self.assertEqual(tool.args[1].default_value, 10)
 
         # Check generated client script (basic checks)
-        self.assertIn("client = Client(server_url='http://mcp-svc-test-server:9000/mcp')", tool.content)
+        self.assertIn("mcp_server_address = f'http://mcp-svc-test-server:9000/mcp'", tool.content)
+        self.assertIn("client = Client(mcp_server_address, progress_handler=on_progress, log_handler=on_log)", tool.content)
         self.assertIn("mcp_tool_name_to_call = 'my_cool_tool'", tool.content)
         self.assertIn("message = os.getenv('MESSAGE_ARG')", tool.content)
         self.assertIn("count = os.getenv('COUNT_ARG')", tool.content)
@@ -271,6 +272,335 @@ class TestServerlessMCPIntegration(unittest.TestCase):
             tools = get_tools()
             self.assertEqual(len(tools), 1)  # Still returns meta-tool, even with no config
 
+    def test_discovery_runs_servers_concurrently_in_config_order(self):
+        """Servers are discovered in parallel, keep config order and report per-server timing."""
+        import threading
+        from serverless_mcp.serverless_mcp_tools import discovery
+
+        server_configs = [
+            dict(self.dummy_server_configs[0], id=f"server_{i}", discovery_mode="import", discovery_cache=False)
+            for i in range(4)
+        ]
+        with open(self.test_config_path, 'w') as f:
+            json.dump(server_configs, f)
+
+        barrier = threading.Barrier(len(server_configs), timeout=10)
+
+        def fake_clone(repo_url, branch, repo_local_path):
+            os.makedirs(repo_local_path)
+            open(os.path.join(repo_local_path, "server.py"), 'w').close()
+
+        def fake_introspect(repo_local_path, server_file_full_path, mcp_instance_name, timeout):
+            # Every worker must be inside introspection at the same time to pass the barrier
+            barrier.wait()
+            tool_name = os.path.basename(repo_local_path)
+            return [DiscoveredMCPToolSchema(name=tool_name)], ""
+
+        with patch.object(discovery, "_clone_server_repo", side_effect=fake_clone), \
+                patch.object(discovery, "_introspect_in_subprocess", side_effect=fake_introspect):
+            result = discovery.discover_mcp_tools_from_config(self.test_config_path, max_workers=4)
+
+        self.assertEqual([server.config["id"] for server in result], [c["id"] for c in server_configs])
+        self.assertEqual([server.tools[0].name for server in result], [f"{i}_server_{i}" for i in range(4)])
+        for server in result:
+            self.assertEqual(set(server.timing), {"clone", "introspect", "total"})
+
+    def test_static_discovery_reads_tools_without_importing(self):
+        """Static discovery extracts tool schemas from source even when dependencies are missing."""
+        from serverless_mcp.serverless_mcp_tools.static_discovery import discover_tools_statically
+
+        server_file = os.path.join(self.test_config_dir, "static_server.py")
+        with open(server_file, 'w') as f:
+            f.write(
+                "import dependency_that_is_not_installed\n"
+                "from fastmcp import FastMCP, Context\n"
+                "mcp = FastMCP('demo')\n\n"
+                "@mcp.tool()\n"
+                "def add(a: int, b: float = 1.5) -> float:\n"
+                "    \"\"\"Add numbers.\n\n    Args:\n        a: First number\n    \"\"\"\n\n"
+                "@mcp.tool(name='search_docs')\n"
+                "async def search(ctx: Context, tags: list[str] | None = None):\n"
+                "    \"\"\"Search.\"\"\"\n\n"
+                "@other.tool\n"
+                "def not_a_tool(x: int): pass\n"
+            )
+        try:
+            tools = discover_tools_statically(server_file, "mcp")
+        finally:
+            os.remove(server_file)
+
+        self.assertEqual([tool["name"] for tool in tools], ["add", "search_docs"])
+        add_tool = tools[0]
+        self.assertEqual(add_tool["description"], "Add numbers.")
+        self.assertEqual(add_tool["parameters"][0],
+                         {"name": "a", "type": "integer", "description": "First number", "required": True, "default": None})
+        self.assertEqual(add_tool["parameters"][1]["type"], "number")
+        self.assertFalse(add_tool["parameters"][1]["required"])
+        self.assertEqual(add_tool["parameters"][1]["default"], 1.5)
+        # The MCP Context parameter is injected by the server and never exposed
+        self.assertEqual([p["name"] for p in tools[1]["parameters"]], ["tags"])
+        self.assertEqual(tools[1]["parameters"][0]["type"], "array")
+
+    def test_sync_diff_reports_changes_and_retains_failed_servers(self):
+        """The sync diff lists added/changed/removed tools and keeps tools of servers that failed to discover."""
+        from serverless_mcp.serverless_mcp_tools.sync_state import compute_sync_diff, state_entries
+
+        previous = state_entries([
+            ("srv_a", {"name": "srv_a_keep", "content": "v1"}),
+            ("srv_a", {"name": "srv_a_edit", "content": "v1"}),
+            ("srv_a", {"name": "srv_a_gone", "content": "v1"}),
+            ("srv_b", {"name": "srv_b_tool", "content": "v1"}),
+        ])
+        current = state_entries([
+            ("srv_a", {"name": "srv_a_keep", "content": "v1"}),
+            ("srv_a", {"name": "srv_a_edit", "content": "v2"}),
+            ("srv_a", {"name": "srv_a_new", "content": "v1"}),
+        ])
+
+        diff, new_state = compute_sync_diff(previous, current, retained_server_ids={"srv_b"})
+
+        self.assertEqual([d["name"] for d in diff["added"]], ["srv_a_new"])
+        self.assertEqual([d["name"] for d in diff["changed"]], ["srv_a_edit"])
+        self.assertEqual(diff["removed"], ["srv_a_gone"])
+        self.assertEqual(diff["unchanged"], ["srv_a_keep"])
+        # srv_b failed this run, so its tool is neither removed nor forgotten
+        self.assertIn("srv_b_tool", new_state)
+        self.assertNotIn("srv_a_gone", new_state)
+
+    @patch("serverless_mcp.serverless_mcp_tools.discovery.resolve_commit_sha", return_value="a" * 40)
+    def test_discovery_reuses_cache_for_unchanged_commit(self, mock_resolve):
+        """A server whose ref still resolves to a cached commit is not cloned again."""
+        import tempfile
+        import shutil
+        from serverless_mcp.serverless_mcp_tools import discovery
+        from serverless_mcp.serverless_mcp_tools.discovery_cache import DiscoveryCache
+
+        cache_dir = tempfile.mkdtemp()
+        cache = DiscoveryCache(cache_dir=cache_dir)
+        config = self.dummy_server_configs[0]
+        cache.put(DiscoveryCache.key(config, "a" * 40, "static"), "a" * 40, [{"name": "cached_tool"}])
+
+        try:
+            with patch.object(DiscoveryCache, "_default", cache), \
+                    patch.object(discovery, "_clone_server_repo") as mock_clone:
+                result = discovery.discover_mcp_tools_from_config(self.test_config_path)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        mock_clone.assert_not_called()
+        self.assertEqual(len(result), 1)
+        self.assertTrue(result[0].cached)
+        self.assertEqual(result[0].commit_sha, "a" * 40)
+        self.assertEqual(result[0].tools[0].name, "cached_tool")
+
+    def test_gateway_client_mode_generates_thin_client(self):
+        """Deploy-mode servers in gateway mode get a stdlib-only client and no per-call service."""
+        server_config = {
+            "id": "deployed_server",
+            "git_repo_url": "https://git.test/repo.git",
+            "git_branch_or_tag": "main",
+            "server_file_path": "server.py",
+            "mcp_instance_name": "mcp",
+            "service_port": 9000,
+            "mode": "deploy",
+            "client_mode": "gateway",
+            "gateway_url": "http://gw.test:8080"
+        }
+        tool_schema = {"name": "add", "parameters": [{"name": "a", "type": "integer", "required": True}]}
+
+        tool = ServerlessMCPTool(mcp_server_config=server_config, tool_schema=tool_schema)
+
+        self.assertEqual(tool.client_mode, "gateway")
+        self.assertEqual(tool.with_services, [])
+        self.assertEqual(tool.env["MCP_GATEWAY_URL"], "http://gw.test:8080")
+        self.assertIn("urllib.parse.quote('deployed_server')", tool.content)
+        self.assertIn("urllib.parse.quote('add')", tool.content)
+        self.assertNotIn("fastmcp", tool.content)
+        compile(tool.content, "gateway_client", "exec")
+
+        # A sync-mode server has no long-lived deployment to pool sessions to
+        sync_tool = ServerlessMCPTool(mcp_server_config=dict(server_config, mode="sync"), tool_schema=tool_schema)
+        self.assertEqual(sync_tool.client_mode, "direct")
+        self.assertEqual(len(sync_tool.with_services), 1)
+        compile(sync_tool.content, "direct_client", "exec")
+
+    def test_client_output_is_bounded_and_spills_to_file(self):
+        """Output past MCP_OUTPUT_MAX_BYTES goes to a spill file; binary content is always saved to a file."""
+        import io
+        import base64
+        import tempfile
+        import mimetypes
+        import contextlib
+        from serverless_mcp.serverless_mcp_tools.base_tool import _CLIENT_OUTPUT_HELPERS
+
+        namespace = {"os": os, "sys": sys, "json": json, "base64": base64, "tempfile": tempfile, "mimetypes": mimetypes}
+        exec(_CLIENT_OUTPUT_HELPERS, namespace)
+        self.assertEqual(namespace["format_progress"](1, 4, "cloning"), "[progress] 1/4 (25%) cloning")
+        self.assertEqual(namespace["format_progress"](3, None, None), "[progress] 3")
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            stdout = io.StringIO()
+            with patch.dict(os.environ, {"MCP_OUTPUT_MAX_BYTES": "10", "MCP_OUTPUT_SPILL_DIR": spill_dir}), \
+                    contextlib.redirect_stdout(stdout):
+                output = namespace["BoundedOutput"]()
+                output.write_item({"type": "text", "text": "0123456789abcdef"})
+                output.write_item({"type": "image", "mimeType": "image/png", "data": base64.b64encode(b"png").decode()})
+                output.close()
+
+            printed = stdout.getvalue()
+            self.assertTrue(printed.startswith("0123456789\n[output truncated: 10 of "))
+            spill_path = printed.rsplit("written to ", 1)[1].rstrip("]\n")
+            with open(spill_path) as f:
+                spilled = f.read()
+            self.assertTrue(spilled.startswith("abcdef\n[image/png content (3 bytes) saved to "))
+            image_path = spilled.split("saved to ", 1)[1].rstrip("]\n")
+            with open(image_path, "rb") as f:
+                self.assertEqual(f.read(), b"png")
+
+        tool = ServerlessMCPTool(mcp_server_config=self.dummy_server_configs[0],
+                                 tool_schema={"name": "slow_tool", "parameters": []})
+        self.assertIn("progress_handler=on_progress", tool.content)
+        self.assertIn("log_handler=on_log", tool.content)
+        compile(tool.content, "direct_client", "exec")
+
+    def test_reconcile_applies_only_changed_objects_and_waits_for_rollout(self):
+        """Unchanged objects are skipped; changed ones are server-side applied and their rollout awaited."""
+        from types import SimpleNamespace
+        from serverless_mcp.serverless_mcp_tools.k8s_reconcile import (
+            MCPReconciler, desired_objects, SPEC_HASH_ANNOTATION
+        )
+
+        base = {
+            "git_repo_url": "https://git.test/repo.git", "git_branch_or_tag": "main", "server_file_path": "server.py",
+            "mcp_instance_name": "mcp", "service_port": 9000, "docker_image": "repo/image:1", "mode": "deploy"
+        }
+        unchanged_cfg = dict(base, id="stable_server")
+        changed_cfg = dict(base, id="new_server")
+
+        def live(manifest, ready=True):
+            return SimpleNamespace(
+                metadata=SimpleNamespace(name=manifest["metadata"]["name"], generation=2, labels={},
+                                         annotations=dict(manifest["metadata"]["annotations"])),
+                spec=SimpleNamespace(replicas=1),
+                status=SimpleNamespace(observed_generation=2, replicas=1, updated_replicas=1,
+                                       available_replicas=1 if ready else 0, conditions=[])
+            )
+
+        stable_deployment, stable_service = desired_objects(unchanged_cfg, "kubiya")
+        new_deployment = desired_objects(changed_cfg, "kubiya")[0]
+        apps_api, core_api, autoscaling_api, policy_api = MagicMock(), MagicMock(), MagicMock(), MagicMock()
+        autoscaling_api.list_namespaced_horizontal_pod_autoscaler.return_value = SimpleNamespace(items=[])
+        policy_api.list_namespaced_pod_disruption_budget.return_value = SimpleNamespace(items=[])
+        apps_api.list_namespaced_deployment.side_effect = [
+            SimpleNamespace(items=[live(stable_deployment)]),
+            SimpleNamespace(items=[live(stable_deployment), live(new_deployment)]),
+        ]
+        core_api.list_namespaced_service.return_value = SimpleNamespace(items=[live(stable_service)])
+
+        reconciler = MCPReconciler(namespace="kubiya", max_workers=4, rollout_timeout=5, apps_api=apps_api,
+                                   core_api=core_api, autoscaling_api=autoscaling_api, policy_api=policy_api)
+        results = reconciler.reconcile([unchanged_cfg, changed_cfg])
+
+        self.assertEqual(results, {"stable_server": True, "new_server": True})
+        apps_api.patch_namespaced_deployment.assert_called_once()
+        core_api.patch_namespaced_service.assert_called_once()
+        call = apps_api.patch_namespaced_deployment.call_args.kwargs
+        self.assertEqual(call["name"], "mcp-new-server")
+        self.assertEqual(call["_content_type"], "application/apply-patch+yaml")
+        self.assertTrue(call["force"])
+        self.assertIn(SPEC_HASH_ANNOTATION, call["body"]["metadata"]["annotations"])
+        # One list for the diff, one poll for the rollout
+        self.assertEqual(apps_api.list_namespaced_deployment.call_count, 2)
+
+    def test_deploy_settings_generate_autoscaler_probe_and_disruption_budget(self):
+        """Autoscaling hands replicas to an HPA, pods get a readiness probe and resources, and a PDB is added."""
+        from types import SimpleNamespace
+        from serverless_mcp.serverless_mcp_tools.k8s_reconcile import MCPReconciler, desired_objects, FIELD_MANAGER
+
+        server_config = {
+            "id": "busy_server", "git_repo_url": "https://git.test/repo.git", "git_branch_or_tag": "main",
+            "server_file_path": "server.py", "mcp_instance_name": "mcp", "service_port": 9000,
+            "docker_image": "repo/image:1", "mode": "deploy",
+            "resources": {"requests": {"cpu": "500m", "memory": "512Mi"}, "limits": {"memory": "1Gi"}},
+            "autoscaling": {"min_replicas": 2, "max_replicas": 8, "target_cpu_utilization": 60}
+        }
+
+        deployment, service, hpa, pdb = desired_objects(server_config, "kubiya")
+        container = deployment["spec"]["template"]["spec"]["containers"][0]
+        self.assertNotIn("replicas", deployment["spec"])
+        self.assertEqual(container["resources"]["requests"]["cpu"], "500m")
+        self.assertEqual(container["readinessProbe"]["tcpSocket"], {"port": 9000})
+        self.assertEqual(hpa["kind"], "HorizontalPodAutoscaler")
+        self.assertEqual((hpa["spec"]["minReplicas"], hpa["spec"]["maxReplicas"]), (2, 8))
+        self.assertEqual(hpa["spec"]["metrics"][0]["resource"]["target"]["averageUtilization"], 60)
+        self.assertEqual(pdb["spec"]["maxUnavailable"], 1)
+
+        requests_hpa = desired_objects(dict(server_config, autoscaling={"metric": "requests", "min_replicas": 1,
+                                                                        "target_requests_per_second": 50}), "kubiya")[2]
+        self.assertEqual(requests_hpa["spec"]["metrics"][0]["pods"]["target"]["averageValue"], "50.0")
+
+        single = desired_objects(dict(server_config, autoscaling=None, replicas=1, readiness_probe=False), "kubiya")
+        self.assertEqual([obj["kind"] for obj in single], ["Deployment", "Service"])
+        self.assertEqual(single[0]["spec"]["replicas"], 1)
+        self.assertNotIn("readinessProbe", single[0]["spec"]["template"]["spec"]["containers"][0])
+
+        with self.assertRaises(ValueError):
+            desired_objects(dict(server_config, resources={}, autoscaling={"metric": "cpu"}), "kubiya")
+        with self.assertRaises(ValueError):
+            desired_objects(dict(server_config, autoscaling={"min_replicas": 5, "max_replicas": 2}), "kubiya")
+
+        # Dropping autoscaling deletes the server's HPA on the next reconcile
+        def live(manifest):
+            return SimpleNamespace(metadata=SimpleNamespace(
+                name=manifest["metadata"]["name"], labels=manifest["metadata"]["labels"],
+                annotations=dict(manifest["metadata"]["annotations"])))
+
+        apps_api, core_api, autoscaling_api, policy_api = MagicMock(), MagicMock(), MagicMock(), MagicMock()
+        apps_api.list_namespaced_deployment.return_value = SimpleNamespace(items=[live(single[0])])
+        core_api.list_namespaced_service.return_value = SimpleNamespace(items=[live(single[1])])
+        autoscaling_api.list_namespaced_horizontal_pod_autoscaler.return_value = SimpleNamespace(items=[live(hpa)])
+        policy_api.list_namespaced_pod_disruption_budget.return_value = SimpleNamespace(items=[])
+        self.assertEqual(hpa["metadata"]["labels"]["app.kubernetes.io/managed-by"], FIELD_MANAGER)
+
+        reconciler = MCPReconciler(namespace="kubiya", rollout_timeout=0, apps_api=apps_api, core_api=core_api,
+                                   autoscaling_api=autoscaling_api, policy_api=policy_api)
+        results = reconciler.reconcile([dict(server_config, autoscaling=None, replicas=1, readiness_probe=False)])
+
+        self.assertEqual(results, {"busy_server": True})
+        autoscaling_api.delete_namespaced_horizontal_pod_autoscaler.assert_called_once_with(
+            name="mcp-busy-server", namespace="kubiya")
+        apps_api.patch_namespaced_deployment.assert_not_called()
+
+    def test_batch_tool_wraps_all_server_tools(self):
+        """The per-server batch tool takes a list of calls and works in direct and gateway mode."""
+        from serverless_mcp.serverless_mcp_tools.base_tool import ServerlessMCPBatchTool, MAX_BATCH_CONCURRENCY
+
+        server_config = dict(self.dummy_server_configs[0], batch_concurrency=100)
+        batch_tool = ServerlessMCPBatchTool(mcp_server_config=server_config, tool_names=["search", "add"])
+
+        self.assertEqual(batch_tool.name, "dummy_server_1_batch_call")
+        self.assertEqual([arg.name for arg in batch_tool.args], ["calls", "concurrency"])
+        self.assertTrue(batch_tool.args[0].required)
+        self.assertEqual(batch_tool.args[1].default_value, MAX_BATCH_CONCURRENCY)
+        self.assertIn("add, search", batch_tool.description)
+        self.assertIn("available_tools = ['add', 'search']", batch_tool.content)
+        self.assertIn("calls = json.loads(calls)", batch_tool.content)
+        self.assertEqual(len(batch_tool.with_services), 1)
+        compile(batch_tool.content, "batch_client", "exec")
+
+        gateway_batch = ServerlessMCPBatchTool(
+            mcp_server_config=dict(server_config, mode="deploy", client_mode="gateway"), tool_names=["add"]
+        )
+        self.assertEqual(gateway_batch.with_services, [])
+        self.assertIn("ThreadPoolExecutor(max_workers=concurrency)", gateway_batch.content)
+        self.assertNotIn("fastmcp", gateway_batch.content)
+        compile(gateway_batch.content, "gateway_batch_client", "exec")
+
+        # Calls without a concurrency argument use the server's configured batch_concurrency
+        self.assertIn(f"concurrency or {MAX_BATCH_CONCURRENCY},", batch_tool.content)
+        small_batch = ServerlessMCPBatchTool(mcp_server_config=dict(server_config, batch_concurrency=3), tool_names=["add"])
+        self.assertIn("concurrency or 3,", small_batch.content)
+
     # TODO: More tests:
     # - Test discovery logic with a mock file system and mock fastmcp instance
     # - Test the generated client script more thoroughly (e.g., execution with mock fastmcp client)
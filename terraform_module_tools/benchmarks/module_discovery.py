@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Benchmark Terraform module discovery and parsing.
+
+Generates synthetic modules as local bare git repositories, then times
+cloning, parsing and ``get_variables`` end to end under different caching
+modes, plus every available HCL backend on its own. Runs fully offline.
+
+Run from the ``terraform_module_tools`` directory:
+
+    python -m benchmarks.module_discovery --files 50 --variables-per-file 20 \\
+        --nested-modules 3 --iterations 5 --output benchmark_report.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List
+
+from terraform_module_tools.parser import TerraformModuleParser
+from terraform_module_tools.clone_cache import CloneCache
+from terraform_module_tools.parse_cache import ParseCache
+from terraform_module_tools.hcl_backends import BACKENDS, Hcl2JsonBackend, HCL2JSON_PATH
+
+# Caching modes: (clone cache, parse cache, reuse caches across iterations)
+MODES = {
+    'uncached': (False, False, False),
+    'cold_cache': (True, True, False),
+    'warm_cache': (True, True, True),
+    'clone_cache_only': (True, False, True),
+    'parse_cache_only': (False, True, True),
+}
+
+VARIABLE_TEMPLATES = [
+    'variable "{name}" {{\n  type        = string\n  description = "Synthetic string variable {name}"\n}}\n',
+    'variable "{name}" {{\n  type        = number\n  description = "Synthetic number variable {name}"\n  default     = 42\n}}\n',
+    'variable "{name}" {{\n  type        = map(string)\n  description = "Synthetic map variable {name}"\n  default     = {{\n    env = "dev"\n  }}\n}}\n',
+    'variable "{name}" {{\n  type = list(object({{\n    name = string\n    size = number\n  }}))\n  default = []\n}}\n',
+]
+
+PROVIDER_BLOCK = '''terraform {
+  required_providers {
+    aws = {
+      source  = "hashicorp/aws"
+      version = ">= 4.0"
+    }
+  }
+}
+
+provider "aws" {
+  region = var.region_0_0
+}
+'''
+
+
+def _git(args: List[str], cwd: str) -> None:
+    subprocess.run(
+        ['git', '-c', 'user.name=benchmark', '-c', 'user.email=benchmark@example.com', *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    )
+
+
+def _write_module(module_dir: Path, files: int, variables_per_file: int, prefix: str) -> None:
+    module_dir.mkdir(parents=True, exist_ok=True)
+    for file_index in range(files):
+        blocks = [
+            VARIABLE_TEMPLATES[var_index % len(VARIABLE_TEMPLATES)].format(
+                name=f"{prefix}_{file_index}_{var_index}"
+            )
+            for var_index in range(variables_per_file)
+        ]
+        (module_dir / f"variables_{file_index}.tf").write_text('\n'.join(blocks))
+
+
+def generate_module_repo(root: Path, name: str, files: int, variables_per_file: int, nested_modules: int) -> str:
+    """Create a synthetic module as a bare git repository and return its URL."""
+    work_dir = root / f"{name}-work"
+    bare_dir = root / f"{name}.git"
+
+    _write_module(work_dir, files, variables_per_file, 'region')
+    (work_dir / 'main.tf').write_text(PROVIDER_BLOCK + ''.join(
+        f'\nmodule "nested_{index}" {{\n  source = "./modules/nested_{index}"\n}}\n'
+        for index in range(nested_modules)
+    ))
+    for index in range(nested_modules):
+        _write_module(work_dir / 'modules' / f"nested_{index}", max(1, files // 4), variables_per_file, f"nested{index}")
+
+    _git(['init', '--quiet', '-b', 'main'], str(work_dir))
+    _git(['add', '.'], str(work_dir))
+    _git(['commit', '--quiet', '-m', 'Synthetic module'], str(work_dir))
+    _git(['clone', '--quiet', '--bare', str(work_dir), str(bare_dir)], str(root))
+    shutil.rmtree(work_dir)
+    return f"file://{bare_dir}"
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.mean(samples),
+        'max': max(samples),
+        'samples': samples,
+    }
+
+
+def benchmark_mode(mode: str, url: str, iterations: int, scratch: Path) -> Dict[str, Any]:
+    """Time clone, parse and end-to-end discovery for one caching mode."""
+    use_clone_cache, use_parse_cache, reuse = MODES[mode]
+    module_config = {'clone_cache': use_clone_cache, 'parse_cache': use_parse_cache}
+    timings = {'clone': [], 'parse': [], 'end_to_end': []}
+    variable_count = 0
+
+    def reset_caches(suffix: str) -> None:
+        CloneCache._default = CloneCache(cache_dir=str(scratch / f"{mode}-clone-{suffix}"))
+        ParseCache._default = ParseCache(cache_dir=str(scratch / f"{mode}-parse-{suffix}"))
+
+    reset_caches('shared')
+    if reuse:
+        # Warm the caches once so the timed iterations measure the steady state
+        TerraformModuleParser(url, ref='main', module_config=module_config).get_variables()
+
+    for iteration in range(iterations):
+        if not reuse:
+            reset_caches(str(iteration))
+        start = time.perf_counter()
+        parser = TerraformModuleParser(url, ref='main', module_config=module_config)
+        cloned = time.perf_counter()
+        variables, _, errors = parser.get_variables()
+        parsed = time.perf_counter()
+        if errors:
+            raise RuntimeError(f"{mode}: discovery failed: {errors}")
+        variable_count = len(variables)
+        timings['clone'].append(cloned - start)
+        timings['parse'].append(parsed - cloned)
+        timings['end_to_end'].append(parsed - start)
+
+    return {
+        'variables': variable_count,
+        'timings': {phase: _summary(samples) for phase, samples in timings.items()},
+        'clone_cache_stats': dict(CloneCache.get_default().stats),
+        'parse_cache_stats': dict(ParseCache.get_default().stats),
+    }
+
+
+def benchmark_backends(url: str, iterations: int, scratch: Path) -> Dict[str, Any]:
+    """Time each available HCL backend parsing every file of the module."""
+    checkout = scratch / 'backend-checkout'
+    subprocess.run(['git', 'clone', '--quiet', url, str(checkout)], check=True, capture_output=True)
+    tf_files = [str(path) for path in checkout.rglob('*.tf')]
+
+    results = {}
+    for name, backend_cls in BACKENDS.items():
+        backend = backend_cls()
+        if not backend.is_available():
+            results[name] = {'available': False}
+            continue
+        if isinstance(backend, Hcl2JsonBackend) and not os.path.exists(HCL2JSON_PATH):
+            # Stay offline: never download the binary from a benchmark run
+            results[name] = {'available': False, 'error': f"{HCL2JSON_PATH} not installed"}
+            continue
+        try:
+            backend.prepare()
+        except Exception as e:
+            results[name] = {'available': False, 'error': str(e)}
+            continue
+
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            for tf_file in tf_files:
+                backend.load(tf_file)
+            samples.append(time.perf_counter() - start)
+        results[name] = {
+            'available': True,
+            'files': len(tf_files),
+            'timings': _summary(samples),
+            'files_per_second': len(tf_files) / statistics.median(samples) if samples else 0,
+        }
+    return results
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Benchmark Terraform module discovery")
+    arg_parser.add_argument('--files', type=int, default=20, help="Root module .tf files")
+    arg_parser.add_argument('--variables-per-file', type=int, default=10, help="Variables per .tf file")
+    arg_parser.add_argument('--nested-modules', type=int, default=2, help="Nested modules under ./modules")
+    arg_parser.add_argument('--iterations', type=int, default=3, help="Timed iterations per mode")
+    arg_parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES), help="Caching modes to run")
+    arg_parser.add_argument('--skip-backends', action='store_true', help="Do not benchmark HCL backends on their own")
+    arg_parser.add_argument('--output', default='benchmark_report.json', help="Path of the JSON report")
+    args = arg_parser.parse_args()
+
+    scratch = Path(tempfile.mkdtemp(prefix='tf-module-bench-'))
+    try:
+        url = generate_module_repo(scratch, 'synthetic-module', args.files, args.variables_per_file, args.nested_modules)
+        report = {
+            'config': vars(args),
+            'environment': {
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+            },
+            'modes': {},
+        }
+        for mode in args.modes:
+            print(f"⏱️  Running {mode}...")
+            report['modes'][mode] = benchmark_mode(mode, url, args.iterations, scratch)
+            timing = report['modes'][mode]['timings']['end_to_end']
+            print(f"   median end-to-end {timing['median'] * 1000:.1f} ms")
+
+        if not args.skip_backends:
+            print("⏱️  Running HCL backends...")
+            report['backends'] = benchmark_backends(url, args.iterations, scratch)
+
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report written to {args.output}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
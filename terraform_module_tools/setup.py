@@ -7,6 +7,7 @@ setup(
     install_requires=[
         "kubiya-sdk",
         "requests",
+        "python-hcl2",
         "typing",
         "logging",
     ],
@@ -0,0 +1,464 @@
+import os
+import re
+import json
+import time
+import posixpath
+import shutil
+import hashlib
+import logging
+import threading
+import subprocess
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Set, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'kubiya', 'terraform_modules')
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GiB
+
+_SHA_LENGTH = 40
+
+# Local module references, e.g. source = "../modules/network"
+_RELATIVE_SOURCE_RE = re.compile(r'\bsource\s*=\s*"(\.{1,2}/[^"]*)"')
+
+
+def _git_env() -> Dict[str, str]:
+    return {'GIT_TERMINAL_PROMPT': '0', **os.environ}
+
+
+def _run_git(args: List[str], cwd: Optional[str] = None, timeout: int = 300) -> str:
+    """Run a git command and return its stdout."""
+    try:
+        result = subprocess.run(
+            ['git', *args],
+            cwd=cwd,
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            env=_git_env()
+        )
+        return result.stdout
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"git {args[0]} failed: {e.stderr}")
+    except subprocess.TimeoutExpired:
+        raise ValueError(f"git {args[0]} timed out after {timeout}s")
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # The process exists but belongs to another user
+        return True
+    return True
+
+
+def _is_commit_sha(ref: Optional[str]) -> bool:
+    return bool(ref) and len(ref) == _SHA_LENGTH and all(c in '0123456789abcdef' for c in ref.lower())
+
+
+def use_sparse_checkout(path: Optional[str], module_config: Optional[Dict[str, Any]] = None) -> bool:
+    """Decide whether a module should be fetched with a sparse, blobless clone.
+
+    ``sparse_checkout`` in the module config may be true, false or ``auto``
+    (the default), which enables it for modules that live in a subdirectory.
+    """
+    mode = (module_config or {}).get('sparse_checkout', 'auto')
+    if mode == 'auto':
+        return bool(path and path.strip('/'))
+    return bool(mode) and bool(path)
+
+
+def find_relative_sources(repo_dir: str, module_path: str) -> Set[str]:
+    """Repository-relative directories referenced via local ``source`` paths."""
+    sources = set()
+    module_dir = os.path.join(repo_dir, module_path)
+    for root, _, files in os.walk(module_dir):
+        for name in files:
+            if not name.endswith('.tf'):
+                continue
+            try:
+                with open(os.path.join(root, name), 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
+            except OSError:
+                continue
+            rel_root = os.path.relpath(root, repo_dir).replace(os.sep, '/')
+            for match in _RELATIVE_SOURCE_RE.finditer(content):
+                resolved = posixpath.normpath(posixpath.join(rel_root, match.group(1)))
+                # Ignore references that escape the repository
+                if resolved != '.' and not resolved.startswith('..'):
+                    sources.add(resolved)
+    return sources
+
+
+def _sparse_checkout(target: str, module_path: str, max_rounds: int = 20) -> None:
+    """Check out ``module_path`` plus the local modules it depends on."""
+    module_path = module_path.strip('/')
+    included = {module_path}
+    _run_git(['sparse-checkout', 'set', '--cone', module_path], cwd=target)
+    _run_git(['checkout', '--quiet'], cwd=target)
+
+    # Follow relative module sources until the set of directories is closed
+    frontier = {module_path}
+    for _ in range(max_rounds):
+        discovered = set()
+        for path in frontier:
+            discovered |= find_relative_sources(target, path)
+        discovered = {
+            path for path in discovered
+            if not any(path == inc or path.startswith(f"{inc}/") for inc in included)
+        }
+        if not discovered:
+            return
+        logger.info(f"Adding module dependencies to sparse checkout: {', '.join(sorted(discovered))}")
+        _run_git(['sparse-checkout', 'add', *sorted(discovered)], cwd=target)
+        included |= discovered
+        frontier = discovered
+    logger.warning(f"Stopped following relative module sources after {max_rounds} rounds")
+
+
+def clone_checkout(target: str, fetch_url: str, ref: Optional[str], sha: Optional[str] = None,
+                   sparse_path: Optional[str] = None) -> None:
+    """Shallow-clone ``fetch_url`` at ``ref`` into ``target``.
+
+    With ``sparse_path`` the clone is blobless (``--filter=blob:none``) and only
+    that directory and its relative module dependencies are checked out, which
+    avoids downloading the rest of a monorepo. Falls back to a full shallow
+    clone if the server or local git does not support partial clones.
+    """
+    if sparse_path:
+        try:
+            _clone(target, fetch_url, ref, sha, partial=True)
+            _sparse_checkout(target, sparse_path)
+            return
+        except ValueError as e:
+            logger.warning(f"Sparse checkout failed, falling back to a full clone: {str(e)}")
+            shutil.rmtree(target, ignore_errors=True)
+            os.makedirs(target, exist_ok=True)
+    _clone(target, fetch_url, ref, sha, partial=False)
+
+
+def _clone(target: str, fetch_url: str, ref: Optional[str], sha: Optional[str], partial: bool) -> None:
+    partial_args = ['--filter=blob:none', '--no-checkout'] if partial else []
+    if ref and not _is_commit_sha(ref):
+        _run_git(['clone', '--quiet', '--depth', '1', '--single-branch', *partial_args,
+                  '--branch', ref, fetch_url, target])
+    elif ref or sha:
+        # Commit SHAs cannot be passed to --branch; fetch the commit directly
+        _run_git(['init', '--quiet', target])
+        fetch_filter = ['--filter=blob:none'] if partial else []
+        _run_git(['remote', 'add', 'origin', fetch_url], cwd=target)
+        if partial:
+            _run_git(['config', 'remote.origin.promisor', 'true'], cwd=target)
+            _run_git(['config', 'remote.origin.partialclonefilter', 'blob:none'], cwd=target)
+        _run_git(['fetch', '--quiet', '--depth', '1', *fetch_filter, 'origin', sha or ref], cwd=target)
+        _run_git(['update-ref', 'HEAD', 'FETCH_HEAD'], cwd=target)
+        if not partial:
+            _run_git(['checkout', '--quiet', '--detach', 'FETCH_HEAD'], cwd=target)
+    else:
+        _run_git(['clone', '--quiet', '--depth', '1', '--single-branch', *partial_args, fetch_url, target])
+
+
+class CloneCache:
+    """Content-addressed on-disk cache of module checkouts.
+
+    Entries are keyed by (clone URL, resolved commit SHA). A checkout for a URL
+    whose ref moved is refreshed from the previous checkout with ``git fetch``
+    instead of a new network clone. Least-recently-used entries are evicted once
+    the total size exceeds ``max_bytes``.
+
+    ``checkout`` leases the returned directory to the caller, which must hand it
+    back with ``release`` once it is done reading it; leased entries are never
+    evicted. The index may be shared by several processes: every update takes an
+    exclusive lock on ``index.lock`` and re-reads the index before writing it.
+    """
+
+    INDEX_FILE = 'index.json'
+    LOCK_FILE = 'index.lock'
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or os.environ.get('TF_MODULE_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.environ.get('TF_MODULE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+        )
+        self._lock = threading.RLock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'refreshes': 0, 'evictions': 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    @classmethod
+    def get_default(cls) -> 'CloneCache':
+        """Return the process-wide cache instance."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def is_enabled(module_config: Optional[Dict[str, Any]] = None) -> bool:
+        """Check whether the clone cache should be used for a module."""
+        if os.environ.get('TF_MODULE_CACHE_DISABLE', '').lower() in ('1', 'true', 'yes'):
+            return False
+        return not module_config or module_config.get('clone_cache', True)
+
+    # Index handling
+
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, self.INDEX_FILE)
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._index_path(), 'r') as f:
+                index = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        # Drop entries whose checkout disappeared from disk
+        return {
+            key: entry for key, entry in index.items()
+            if isinstance(entry, dict) and os.path.isdir(entry.get('path', ''))
+        }
+
+    def _save_index(self) -> None:
+        tmp_path = f"{self._index_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self._index_path())
+
+    @contextmanager
+    def _locked_index(self) -> Iterator[Dict[str, Dict[str, Any]]]:
+        """Yield the current on-disk index and write it back, holding the cross-process lock."""
+        with self._lock:
+            with open(os.path.join(self.cache_dir, self.LOCK_FILE), 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._index = self._load_index()
+                    yield self._index
+                    self._save_index()
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # Leases
+
+    @staticmethod
+    def _pin(entry: Dict[str, Any], delta: int) -> None:
+        leases = entry.setdefault('leases', {})
+        pid = str(os.getpid())
+        count = leases.get(pid, 0) + delta
+        if count > 0:
+            leases[pid] = count
+        else:
+            leases.pop(pid, None)
+
+    @staticmethod
+    def _is_leased(entry: Dict[str, Any]) -> bool:
+        leases = entry.get('leases', {})
+        # Forget leases held by processes that exited without releasing them
+        for pid in [pid for pid in leases if not _pid_alive(int(pid))]:
+            del leases[pid]
+        return bool(leases)
+
+    # Keys and paths
+
+    @staticmethod
+    def _url_hash(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _entry_name(sha: str, sparse_path: Optional[str]) -> str:
+        if not sparse_path:
+            return sha
+        return f"{sha}-sparse-{hashlib.sha256(sparse_path.strip('/').encode()).hexdigest()[:12]}"
+
+    def _key(self, url: str, sha: str, sparse_path: Optional[str] = None) -> str:
+        return f"{self._url_hash(url)}/{self._entry_name(sha, sparse_path)}"
+
+    def _entry_path(self, url: str, sha: str, sparse_path: Optional[str] = None) -> str:
+        return os.path.join(self.cache_dir, self._url_hash(url), self._entry_name(sha, sparse_path))
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    # Public API
+
+    def resolve_sha(self, fetch_url: str, ref: Optional[str]) -> Optional[str]:
+        """Resolve a branch or tag to a commit SHA with ``git ls-remote``."""
+        if _is_commit_sha(ref):
+            return ref.lower()
+        target = ref or 'HEAD'
+        try:
+            output = _run_git(['ls-remote', fetch_url, target], timeout=60)
+        except ValueError as e:
+            logger.warning(f"Failed to resolve {target}: {str(e)}")
+            return None
+
+        refs = {}
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) == 2:
+                refs[parts[1]] = parts[0]
+        # Prefer the peeled commit of annotated tags, then exact branch/tag matches
+        for candidate in (f"refs/tags/{target}^{{}}", f"refs/heads/{target}", f"refs/tags/{target}", target):
+            if candidate in refs:
+                return refs[candidate]
+        return next(iter(refs.values()), None)
+
+    def checkout(self, url: str, ref: Optional[str], fetch_url: Optional[str] = None,
+                 sparse_path: Optional[str] = None) -> Optional[str]:
+        """Return a checkout directory for ``url`` at ``ref``.
+
+        ``url`` is the cache key and must not contain credentials; ``fetch_url``
+        is what git talks to and may carry an auth token. With ``sparse_path``
+        the entry only holds that directory and its local dependencies. The
+        returned directory is leased and must be passed to ``release`` when the
+        caller no longer needs it. Returns None when the ref cannot be resolved
+        so the caller can fall back to a plain clone.
+        """
+        fetch_url = fetch_url or url
+        sha = self.resolve_sha(fetch_url, ref)
+        if not sha:
+            return None
+
+        key = self._key(url, sha, sparse_path)
+        with self._key_lock(key):
+            with self._locked_index() as index:
+                entry = index.get(key)
+                if entry and os.path.isdir(entry['path']):
+                    self.stats['hits'] += 1
+                    entry['last_used'] = time.time()
+                    self._pin(entry, 1)
+                    logger.info(f"Clone cache hit for {url}@{sha[:12]}")
+                    return entry['path']
+                self.stats['misses'] += 1
+                # Blobless sparse entries cannot seed other checkouts, and are cheap to fetch anyway
+                sibling = None if sparse_path else self._find_sibling(url)
+
+            target = self._entry_path(url, sha, sparse_path)
+            shutil.rmtree(target, ignore_errors=True)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                if sibling:
+                    self._refresh_from(sibling, target, fetch_url, ref, sha)
+                else:
+                    self._clone(target, fetch_url, ref, sha, sparse_path)
+            except Exception:
+                shutil.rmtree(target, ignore_errors=True)
+                raise
+
+            with self._locked_index() as index:
+                index[key] = {
+                    'url': url,
+                    'sha': sha,
+                    'sparse_path': sparse_path,
+                    'path': target,
+                    'size': _dir_size(target),
+                    'last_used': time.time()
+                }
+                self._pin(index[key], 1)
+                self._evict()
+            return target
+
+    def release(self, path: str) -> None:
+        """Return a directory leased by ``checkout`` and evict entries if over budget."""
+        with self._locked_index() as index:
+            for entry in index.values():
+                if entry.get('path') == path:
+                    self._pin(entry, -1)
+                    break
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove every cached checkout that is not currently leased."""
+        with self._locked_index() as index:
+            for key, entry in list(index.items()):
+                if self._is_leased(entry):
+                    continue
+                shutil.rmtree(entry['path'], ignore_errors=True)
+                del index[key]
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._index = self._load_index()
+            return sum(entry.get('size', 0) for entry in self._index.values())
+
+    # Internals
+
+    def _find_sibling(self, url: str) -> Optional[str]:
+        """Most recently used checkout of the same URL at another commit."""
+        candidates = [
+            entry for entry in self._index.values()
+            if entry.get('url') == url and not entry.get('sparse_path') and os.path.isdir(entry['path'])
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda entry: entry.get('last_used', 0))['path']
+
+    def _clone(self, target: str, fetch_url: str, ref: Optional[str], sha: str,
+               sparse_path: Optional[str] = None) -> None:
+        logger.info(f"Clone cache miss, cloning {sha[:12]}")
+        clone_checkout(target, fetch_url, ref, sha, sparse_path=sparse_path)
+        self._scrub_remote(target)
+
+    def _refresh_from(self, sibling: str, target: str, fetch_url: str, ref: Optional[str], sha: str) -> None:
+        """Seed a new entry from an older checkout and fetch only the delta."""
+        logger.info(f"Clone cache refresh to {sha[:12]} from existing checkout")
+        _run_git(['clone', '--quiet', '--no-checkout', sibling, target])
+        fetch_target = sha if (not ref or _is_commit_sha(ref)) else ref
+        _run_git(['fetch', '--depth', '1', fetch_url, fetch_target], cwd=target)
+        _run_git(['checkout', '--quiet', '--detach', 'FETCH_HEAD'], cwd=target)
+        self._scrub_remote(target)
+        self.stats['refreshes'] += 1
+
+    @staticmethod
+    def _scrub_remote(target: str) -> None:
+        """Make sure no auth token is persisted in the cached repository config."""
+        try:
+            _run_git(['remote', 'remove', 'origin'], cwd=target)
+        except ValueError:
+            pass
+
+    def _evict(self) -> None:
+        """Remove least-recently-used entries that nobody holds a lease on until under budget."""
+        total = sum(entry.get('size', 0) for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1].get('last_used', 0)):
+            if total <= self.max_bytes:
+                break
+            if self._is_leased(entry):
+                continue
+            shutil.rmtree(entry['path'], ignore_errors=True)
+            total -= entry.get('size', 0)
+            del self._index[key]
+            self.stats['evictions'] += 1
+            logger.info(f"Evicted {entry.get('url')}@{entry.get('sha', '')[:12]} from clone cache")
+
+
+__all__ = ['CloneCache', 'clone_checkout', 'use_sparse_checkout', 'find_relative_sources']
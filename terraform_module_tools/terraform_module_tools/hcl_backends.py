@@ -0,0 +1,173 @@
+import os
+import json
+import logging
+import subprocess
+from functools import lru_cache
+from typing import Dict, Any, Optional, List
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Try to import python-hcl2 for in-process parsing
+try:
+    import hcl2
+    HCL2_AVAILABLE = True
+except ImportError:
+    HCL2_AVAILABLE = False
+
+HCL2JSON_PATH = '/usr/local/bin/hcl2json'
+HCL2JSON_URL = 'https://github.com/tmccombs/hcl2json/releases/download/v0.6.4/hcl2json_linux_amd64'
+
+
+# Cache the hcl2json binary download
+@lru_cache(maxsize=1)
+def ensure_hcl2json():
+    if not os.path.exists(HCL2JSON_PATH):
+        response = requests.get(HCL2JSON_URL)
+        with open(HCL2JSON_PATH, 'wb') as f:
+            f.write(response.content)
+        os.chmod(HCL2JSON_PATH, 0o755)
+    return HCL2JSON_PATH
+
+
+class HCLBackend:
+    """Base class for HCL parsing backends.
+
+    ``load`` returns the hcl2json document shape: top-level block types map to
+    lists of ``{label: body}`` dicts, with plain (unquoted) string values.
+    """
+
+    name = 'base'
+
+    def is_available(self) -> bool:
+        return True
+
+    def prepare(self) -> None:
+        """Do any one-time setup needed before parsing."""
+
+    def load(self, file_path: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class PythonHCL2Backend(HCLBackend):
+    """Parse HCL in-process with python-hcl2."""
+
+    name = 'python-hcl2'
+
+    def is_available(self) -> bool:
+        return HCL2_AVAILABLE
+
+    def load(self, file_path: str) -> Dict[str, Any]:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return self._normalize(hcl2.load(f))
+
+    @classmethod
+    def _normalize(cls, value: Any) -> Any:
+        """Strip the quoting and block markers newer python-hcl2 releases add."""
+        if isinstance(value, dict):
+            return {
+                cls._unquote(key): cls._normalize(item)
+                for key, item in value.items()
+                if not (isinstance(key, str) and key.startswith('__') and key.endswith('__'))
+            }
+        if isinstance(value, list):
+            return [cls._normalize(item) for item in value]
+        if isinstance(value, str):
+            return cls._unquote(value)
+        return value
+
+    @staticmethod
+    def _unquote(value: str) -> str:
+        if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+            try:
+                return json.loads(value)
+            except json.JSONDecodeError:
+                return value[1:-1]
+        return value
+
+
+class Hcl2JsonBackend(HCLBackend):
+    """Parse HCL by shelling out to the hcl2json binary."""
+
+    name = 'hcl2json'
+
+    def __init__(self, timeout: int = 10):
+        self.timeout = timeout
+
+    def prepare(self) -> None:
+        ensure_hcl2json()
+
+    def load(self, file_path: str) -> Dict[str, Any]:
+        result = subprocess.run(
+            [HCL2JSON_PATH, str(file_path)],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=self.timeout
+        )
+        return json.loads(result.stdout)
+
+
+class FallbackBackend(HCLBackend):
+    """Try backends in order, falling back on parse errors."""
+
+    def __init__(self, backends: List[HCLBackend]):
+        self.backends = backends
+        self.name = '+'.join(backend.name for backend in backends)
+
+    def prepare(self) -> None:
+        # Only the primary backend is prepared eagerly; fallbacks are set up on first use
+        self.backends[0].prepare()
+
+    def load(self, file_path: str) -> Dict[str, Any]:
+        last_error = None
+        for index, backend in enumerate(self.backends):
+            try:
+                if index > 0:
+                    backend.prepare()
+                return backend.load(file_path)
+            except Exception as e:
+                logger.debug(f"{backend.name} failed to parse {file_path}: {str(e)}")
+                last_error = e
+        raise last_error
+
+
+BACKENDS = {
+    PythonHCL2Backend.name: PythonHCL2Backend,
+    Hcl2JsonBackend.name: Hcl2JsonBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def get_hcl_backend(name: Optional[str] = None) -> HCLBackend:
+    """Return the HCL backend by name, or the best available one.
+
+    ``name`` defaults to the ``TF_HCL_BACKEND`` environment variable. ``auto``
+    prefers in-process parsing and keeps hcl2json as a fallback.
+    """
+    name = name or os.environ.get('TF_HCL_BACKEND', 'auto')
+    if name == 'auto':
+        in_process = PythonHCL2Backend()
+        if in_process.is_available():
+            return FallbackBackend([in_process, Hcl2JsonBackend()])
+        logger.info("python-hcl2 not installed, using hcl2json for HCL parsing")
+        return Hcl2JsonBackend()
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HCL backend '{name}'. Available: {', '.join(BACKENDS)}")
+    backend = BACKENDS[name]()
+    if not backend.is_available():
+        raise ValueError(f"HCL backend '{name}' is not available in this environment")
+    return backend
+
+
+__all__ = [
+    'HCLBackend',
+    'PythonHCL2Backend',
+    'Hcl2JsonBackend',
+    'FallbackBackend',
+    'get_hcl_backend',
+    'ensure_hcl2json',
+    'HCL2_AVAILABLE'
+]
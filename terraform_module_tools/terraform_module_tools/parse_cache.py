@@ -0,0 +1,162 @@
+import os
+import copy
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'kubiya', 'terraform_parse')
+DEFAULT_MEMORY_ENTRIES = 4096
+
+# Bump when the extracted schema format changes so stale entries are ignored
+PARSE_CACHE_VERSION = '1'
+
+
+class ParseCache:
+    """Content-addressed on-disk cache of parsed Terraform schemas.
+
+    File entries are keyed by the SHA-256 of the file contents and hold the
+    variables and providers extracted from that file. Module entries are keyed
+    by a manifest hash over every ``.tf`` file in the module, so an unchanged
+    module is answered without touching any per-file entry. Source entries
+    remember the last schema seen for a module source so tools can be
+    registered before the module is cloned.
+
+    Recently used entries are also kept in a bounded in-memory LRU. Callers
+    always get their own copy of an entry, so mutating a returned schema does
+    not leak into the cache or into other tools.
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, cache_dir: Optional[str] = None, memory_entries: Optional[int] = None):
+        self.cache_dir = cache_dir or os.environ.get('TF_PARSE_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.memory_entries = memory_entries if memory_entries is not None else int(
+            os.environ.get('TF_PARSE_CACHE_MEMORY_ENTRIES', DEFAULT_MEMORY_ENTRIES)
+        )
+        self._memory: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'file_hits': 0, 'file_misses': 0, 'module_hits': 0, 'module_misses': 0}
+        for kind in ('files', 'modules', 'sources'):
+            os.makedirs(os.path.join(self.cache_dir, kind), exist_ok=True)
+
+    @classmethod
+    def get_default(cls) -> 'ParseCache':
+        """Return the process-wide cache instance."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def is_enabled(module_config: Optional[Dict[str, Any]] = None) -> bool:
+        """Check whether the parse cache should be used for a module."""
+        if os.environ.get('TF_PARSE_CACHE_DISABLE', '').lower() in ('1', 'true', 'yes'):
+            return False
+        return not module_config or module_config.get('parse_cache', True)
+
+    # Hashing
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        digest = hashlib.sha256(PARSE_CACHE_VERSION.encode())
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def manifest(self, module_dir: str, tf_files: List[Path]) -> Tuple[str, Dict[str, str]]:
+        """Hash every file and combine them into a module-level manifest hash."""
+        file_hashes = {str(tf_file): self.hash_file(str(tf_file)) for tf_file in tf_files}
+        digest = hashlib.sha256(PARSE_CACHE_VERSION.encode())
+        for tf_file in sorted(file_hashes):
+            digest.update(os.path.relpath(tf_file, module_dir).encode())
+            digest.update(b'\0')
+            digest.update(file_hashes[tf_file].encode())
+            digest.update(b'\n')
+        return digest.hexdigest(), file_hashes
+
+    # Storage
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.cache_dir, kind, f"{key}.json")
+
+    def _remember(self, memory_key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[memory_key] = entry
+            self._memory.move_to_end(memory_key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _read(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        memory_key = f"{kind}/{key}"
+        with self._lock:
+            entry = self._memory.get(memory_key)
+            if entry is not None:
+                self._memory.move_to_end(memory_key)
+                return copy.deepcopy(entry)
+        try:
+            with open(self._path(kind, key), 'r') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        self._remember(memory_key, entry)
+        return copy.deepcopy(entry)
+
+    def _write(self, kind: str, key: str, entry: Dict[str, Any]) -> None:
+        self._remember(f"{kind}/{key}", copy.deepcopy(entry))
+        path = self._path(kind, key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write parse cache entry {key}: {str(e)}")
+
+    @staticmethod
+    def _unpack(entry: Dict[str, Any]) -> Tuple[Dict[str, Any], Set[str]]:
+        return entry.get('variables', {}), set(entry.get('providers', []))
+
+    @staticmethod
+    def _pack(variables: Dict[str, Any], providers: Set[str]) -> Dict[str, Any]:
+        return {'variables': variables, 'providers': sorted(providers)}
+
+    # Public API
+
+    def get_file(self, content_hash: str) -> Optional[Tuple[Dict[str, Any], Set[str]]]:
+        entry = self._read('files', content_hash)
+        self.stats['file_hits' if entry is not None else 'file_misses'] += 1
+        return self._unpack(entry) if entry is not None else None
+
+    def put_file(self, content_hash: str, variables: Dict[str, Any], providers: Set[str]) -> None:
+        self._write('files', content_hash, self._pack(variables, providers))
+
+    def get_module(self, manifest_hash: str) -> Optional[Tuple[Dict[str, Any], Set[str]]]:
+        entry = self._read('modules', manifest_hash)
+        self.stats['module_hits' if entry is not None else 'module_misses'] += 1
+        return self._unpack(entry) if entry is not None else None
+
+    def put_module(self, manifest_hash: str, variables: Dict[str, Any], providers: Set[str]) -> None:
+        self._write('modules', manifest_hash, self._pack(variables, providers))
+
+    @staticmethod
+    def source_key(source: str, version: Optional[str] = None, path: Optional[str] = None) -> str:
+        return hashlib.sha256(f"{PARSE_CACHE_VERSION}|{source}|{version or ''}|{path or ''}".encode()).hexdigest()
+
+    def get_source(self, source_key: str) -> Optional[Tuple[Dict[str, Any], Set[str]]]:
+        """Last known schema for a module source, without cloning it."""
+        entry = self._read('sources', source_key)
+        return self._unpack(entry) if entry is not None else None
+
+    def put_source(self, source_key: str, variables: Dict[str, Any], providers: Set[str]) -> None:
+        self._write('sources', source_key, self._pack(variables, providers))
+
+
+__all__ = ['ParseCache', 'PARSE_CACHE_VERSION']
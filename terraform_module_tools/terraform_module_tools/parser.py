@@ -7,26 +7,21 @@ import logging
 import re
 import glob
 import shutil
+import threading
 import requests
+import requests.adapters
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import lru_cache
 from kubiya_sdk.tools.models import FileSpec
 from urllib.parse import urlparse, unquote
 from pathlib import Path
+from .clone_cache import CloneCache, clone_checkout, use_sparse_checkout
+from .hcl_backends import get_hcl_backend, ensure_hcl2json
+from .parse_cache import ParseCache
+from .registry_cache import RegistryCache, resolve_version_constraint, is_exact_version
 
 logger = logging.getLogger(__name__)
 
-# Cache the hcl2json binary download
-@lru_cache(maxsize=1)
-def ensure_hcl2json():
-    HCL2JSON_PATH = '/usr/local/bin/hcl2json'
-    if not os.path.exists(HCL2JSON_PATH):
-        response = requests.get('https://github.com/tmccombs/hcl2json/releases/download/v0.6.4/hcl2json_linux_amd64')
-        with open(HCL2JSON_PATH, 'wb') as f:
-            f.write(response.content)
-        os.chmod(HCL2JSON_PATH, 0o755)
-    return HCL2JSON_PATH
-
 class ModuleSource:
     """Class to handle different types of module sources."""
     
@@ -153,6 +148,10 @@ class ModuleSource:
             source, ref_part = source.split('?ref=', 1)
             ref = ref_part.split('&')[0]
             
+        # Handle //subdir module paths
+        source, subdir = self._split_subdir(source)
+        path = subdir or path
+            
         # Clean up the URL
         source = source.rstrip('/')
         if source.endswith('.git'):
@@ -190,17 +189,37 @@ class ModuleSource:
             else:
                 raise ValueError(f"Invalid registry format: {self.original_source}")
         
-        # Construct GitHub URL for the module
-        github_url = f"https://github.com/terraform-aws-modules/terraform-{provider}-{name}"
-        
-        return {
+        parsed = {
             'namespace': namespace,
             'name': name,
             'provider': provider,
             'version': self.version,
-            'url': github_url,
-            'clone_url': f"{github_url}.git"
+            'ref': None,
+            'path': None
         }
+
+        # Ask the registry where the version matching the constraint lives
+        try:
+            client = TerraformRegistryClient.get_default()
+            version = client.resolve_version(namespace, name, provider, self.version)
+            download = ModuleSource(client.get_module_source(namespace, name, provider, version))
+            if download.source_type not in ('github', 'git'):
+                raise ValueError(f"unsupported download source {download.original_source}")
+            parsed.update(
+                version=version,
+                url=download.parsed_source['url'],
+                clone_url=download.parsed_source['clone_url'],
+                ref=download.get_ref(),
+                path=download.get_path()
+            )
+            return parsed
+        except Exception as e:
+            logger.warning(f"Registry lookup failed for {self.original_source}, guessing the repository: {str(e)}")
+
+        # Construct GitHub URL for the module
+        github_url = f"https://github.com/terraform-aws-modules/terraform-{provider}-{name}"
+        parsed.update(url=github_url, clone_url=f"{github_url}.git")
+        return parsed
     
     def _parse_git_source(self) -> Dict[str, Any]:
         """Parse generic Git repository source."""
@@ -220,12 +239,11 @@ class ModuleSource:
         # Handle SSH format
         if url.startswith('git@'):
             domain = url[4:url.index(':')]
-            path = url[url.index(':')+1:]
-            url = f"https://{domain}/{path}"
+            repo_path = url[url.index(':')+1:]
+            url = f"https://{domain}/{repo_path}"
             
         # Handle subpaths
-        if '//' in url:
-            url, path = url.split('//', 1)
+        url, path = self._split_subdir(url)
             
         return {
             'url': url.rstrip('.git'),
@@ -234,6 +252,16 @@ class ModuleSource:
             'clone_url': url
         }
     
+    @staticmethod
+    def _split_subdir(url: str) -> Tuple[str, Optional[str]]:
+        """Split a ``repo//subdir`` source into the repository URL and subdirectory."""
+        scheme_end = url.find('://')
+        search_from = scheme_end + 3 if scheme_end != -1 else 0
+        index = url.find('//', search_from)
+        if index == -1:
+            return url, None
+        return url[:index], url[index + 2:].strip('/') or None
+
     def _parse_cloud_source(self) -> Dict[str, Any]:
         """Parse cloud-specific source."""
         scheme, path = self.original_source.split('://', 1)
@@ -254,13 +282,13 @@ class ModuleSource:
     
     def get_ref(self) -> Optional[str]:
         """Get the reference (branch, tag, commit) to checkout."""
-        if self.source_type in ('github', 'git'):
+        if self.source_type in ('github', 'git', 'registry'):
             return self.parsed_source['ref']
         return None
     
     def get_path(self) -> Optional[str]:
         """Get the path within the repository."""
-        if self.source_type == 'github':
+        if self.source_type in ('github', 'git', 'registry'):
             return self.parsed_source.get('path')
         return None
 
@@ -295,27 +323,90 @@ class ModuleSource:
 class TerraformRegistryClient:
     """Client for interacting with Terraform Registry API."""
     
-    def __init__(self):
+    # Shared, pooled HTTP session for all registry lookups
+    _session = None
+    _session_lock = threading.Lock()
+
+    _default = None
+    _default_lock = threading.Lock()
+    
+    def __init__(self, cache: Optional[RegistryCache] = None):
         self.base_url = "https://registry.terraform.io/v1"
+        self.cache = cache or RegistryCache()
+
+    @classmethod
+    def get_default(cls) -> 'TerraformRegistryClient':
+        """Return the process-wide client instance."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+        
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        """Get the shared keep-alive session (created on first use)."""
+        with cls._session_lock:
+            if cls._session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                cls._session = session
+            return cls._session
+        
+    def _get_versions(self, namespace: str, name: str, provider: str) -> Tuple[str, ...]:
+        """Get all published versions, revalidating the cached list with its ETag."""
+        key = f"versions:{namespace}/{name}/{provider}"
+        cached = self.cache.get(key)
+        if cached:
+            return tuple(cached['value'])
+        
+        stale = self.cache.get(key, allow_stale=True)
+        headers = {'If-None-Match': stale['etag']} if stale and stale.get('etag') else {}
+        versions_url = f"{self.base_url}/modules/{namespace}/{name}/{provider}/versions"
+        response = self._get_session().get(versions_url, headers=headers, timeout=30)
+        if response.status_code == 304 and stale:
+            self.cache.touch(key)
+            return tuple(stale['value'])
+        response.raise_for_status()
+        
+        versions = [v['version'] for v in response.json()['modules'][0]['versions']]
+        self.cache.put(key, versions, etag=response.headers.get('ETag'))
+        return tuple(versions)
+        
+    def resolve_version(self, namespace: str, name: str, provider: str, version: Optional[str] = None) -> str:
+        """Resolve an exact version or version constraint to a published version."""
+        if is_exact_version(version):
+            return version.lstrip('=').strip()
+        
+        versions = self._get_versions(namespace, name, provider)
+        resolved = resolve_version_constraint(versions, version)
+        if not resolved:
+            raise ValueError(
+                f"No version of {namespace}/{name}/{provider} matches constraint '{version}'"
+            )
+        return resolved
         
     def get_module_source(self, namespace: str, name: str, provider: str, version: Optional[str] = None) -> str:
         """Get the source URL for a registry module."""
         try:
-            # Get latest version if not specified
-            if not version:
-                versions_url = f"{self.base_url}/modules/{namespace}/{name}/{provider}/versions"
-                response = requests.get(versions_url)
-                response.raise_for_status()
-                versions = response.json()['modules'][0]['versions']
-                version = versions[0]['version']
+            # Resolve latest version or version constraint
+            version = self.resolve_version(namespace, name, provider, version)
+            
+            key = f"download:{namespace}/{name}/{provider}@{version}"
+            cached = self.cache.get(key)
+            if cached:
+                return cached['value']
             
             # Get download URL
             download_url = f"{self.base_url}/modules/{namespace}/{name}/{provider}/{version}/download"
-            response = requests.get(download_url)
+            response = self._get_session().get(download_url, timeout=30)
             response.raise_for_status()
             
             # Registry returns a redirect to the actual source
-            return response.headers['X-Terraform-Get']
+            source = response.headers['X-Terraform-Get']
+            self.cache.put(key, source)
+            return source
             
         except requests.exceptions.RequestException as e:
             raise ValueError(f"Failed to get module source from registry: {str(e)}")
@@ -368,16 +459,21 @@ class TerraformModuleParser:
         self.errors = []
         self.readme_url = None
         self.module_dir = None
+        # Clone cache entry leased for module_dir, released once parsing is done
+        self._leased_checkout = None
         self.providers: Set[str] = set()
         self.module_config = module_config
+        self.hcl_backend = get_hcl_backend((module_config or {}).get('hcl_backend'))
+        self.parse_cache = ParseCache.get_default() if ParseCache.is_enabled(module_config) else None
         
-        # Clone and initialize in parallel
-        future_clone = self._executor.submit(self._clone_repository)
-        future_hcl = self._executor.submit(ensure_hcl2json) if not module_config or module_config.get('auto_discover', True) else None
+        # Prepare the HCL backend in the background while cloning. The clone runs
+        # on the calling thread, so callers such as ModuleToolLoader bound clones
+        # with their own pool and _executor is left to file parsing
+        future_hcl = self._executor.submit(self.hcl_backend.prepare) if not module_config or module_config.get('auto_discover', True) else None
 
         # Wait for initialization
         try:
-            future_clone.result()
+            self._clone_repository()
             if future_hcl:
                 future_hcl.result()
         except Exception as e:
@@ -385,7 +481,7 @@ class TerraformModuleParser:
 
     def _clone_repository(self) -> None:
         """Optimized repository cloning."""
-        temp_dir = tempfile.mkdtemp()
+        temp_dir = None
 
         try:
             # Ensure git is installed (cached)
@@ -394,153 +490,88 @@ class TerraformModuleParser:
             # Get clone URL from source
             clone_url = self.source.get_clone_url()
             logger.info(f"Using clone URL: {clone_url}")
-            
-            # Prepare command list efficiently
-            clone_cmd = ['git', 'clone', '--depth', '1', '--single-branch']
-            if ref := self.source.get_ref():
-                clone_cmd.extend(['--branch', ref])
+            ref = self.source.get_ref()
 
             # Handle auth token once
+            fetch_url = clone_url
             if 'github.com' in clone_url:
                 github_token = os.environ.get('GH_TOKEN') or os.environ.get('TOOLS_GH_TOKEN')
                 if github_token:
-                    clone_url = clone_url.replace(
+                    fetch_url = clone_url.replace(
                         "https://github.com",
                         f"https://{github_token}@github.com"
                     )
 
-            clone_cmd.extend([clone_url, str(temp_dir)])
-            
-            # Single subprocess call with prepared command
-            try:
-                result = subprocess.run(
-                    clone_cmd, 
-                    check=True, 
-                    capture_output=True,
-                    text=True,
-                    env={'GIT_TERMINAL_PROMPT': '0', **os.environ}
-                )
-            except subprocess.CalledProcessError as e:
-                raise ValueError(f"Git clone failed: {e.stderr}")
+            # Monorepo subdirectories only need a sparse, blobless checkout
+            sparse_path = self.path if use_sparse_checkout(self.path, self.module_config) else None
+
+            # Reuse a cached checkout of the same commit when possible
+            checkout_dir = None
+            if CloneCache.is_enabled(self.module_config):
+                try:
+                    checkout_dir = CloneCache.get_default().checkout(
+                        clone_url, ref, fetch_url=fetch_url, sparse_path=sparse_path
+                    )
+                    self._leased_checkout = checkout_dir
+                except Exception as e:
+                    logger.warning(f"Clone cache unavailable, falling back to a fresh clone: {str(e)}")
+
+            if not checkout_dir:
+                temp_dir = tempfile.mkdtemp()
+                checkout_dir = temp_dir
+                try:
+                    clone_checkout(temp_dir, fetch_url, ref, sparse_path=sparse_path)
+                except ValueError as e:
+                    raise ValueError(f"Git clone failed: {str(e)}")
 
             # Set module directory efficiently
-            self.module_dir = os.path.join(temp_dir, self.path or '')
+            self.module_dir = os.path.join(checkout_dir, self.path or '')
             if self.path and not os.path.exists(self.module_dir):
                 raise ValueError(f"Specified path '{self.path}' does not exist")
 
             # Set README URL for GitHub repositories
             if self.source.source_type in ('github', 'registry'):
-                base_url = clone_url.rstrip('.git')
-                ref = self.source.get_ref() or 'master'
+                base_url = clone_url[:-4] if clone_url.endswith('.git') else clone_url
+                ref = ref or 'master'
                 path = self.source.get_path() or ''
                 self.readme_url = f"{base_url}/blob/{ref}/{path}/README.md".rstrip('/')
 
         except Exception as e:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            self.close()
             raise ValueError(f"Failed to clone repository: {str(e)}")
 
+    def close(self) -> None:
+        """Release the clone cache lease on the checkout so it can be evicted."""
+        if self._leased_checkout:
+            leased, self._leased_checkout = self._leased_checkout, None
+            try:
+                CloneCache.get_default().release(leased)
+            except Exception as e:
+                logger.warning(f"Failed to release clone cache entry {leased}: {str(e)}")
+
     def _parse_variables_file(self, file_path: str) -> Dict[str, Any]:
         """Parse variables from a Terraform file with error handling."""
         try:
-            result = subprocess.run(
-                ['/usr/local/bin/hcl2json', file_path],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=10
-            )
-            
-            tf_json = json.loads(result.stdout)
-            variables = {}
-
-            if 'variable' in tf_json:
-                var_blocks = tf_json['variable']
-                
-                # Handle both list and dict formats
-                if isinstance(var_blocks, dict):
-                    # Direct dictionary format
-                    for var_name, var_config in var_blocks.items():
-                        if isinstance(var_config, list):
-                            # Take first element if it's a list
-                            var_config = var_config[0] if var_config else {}
-                        processed_var = self._process_variable(var_name, var_config)
-                        if processed_var:
-                            variables[var_name] = processed_var
-                elif isinstance(var_blocks, list):
-                    # List of single-key dictionaries format
-                    for var_block in var_blocks:
-                        if isinstance(var_block, dict):
-                            for var_name, var_config in var_block.items():
-                                if isinstance(var_config, list):
-                                    var_config = var_config[0] if var_config else {}
-                                processed_var = self._process_variable(var_name, var_config)
-                                if processed_var:
-                                    variables[var_name] = processed_var
-
-            return variables
-
+            tf_json = self.hcl_backend.load(file_path)
+            return self._extract_schema(tf_json, file_path)[0]
         except subprocess.TimeoutExpired:
             logger.error(f"Timeout while parsing {file_path}")
             return {}
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+        except Exception as e:
             logger.error(f"Failed to parse {file_path}: {str(e)}")
             return {}
 
     def _parse_providers(self, file_path: str) -> Set[str]:
         """Parse provider blocks from a Terraform file."""
-        providers = set()
         try:
-            result = subprocess.run(
-                ['/usr/local/bin/hcl2json', file_path],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=10
-            )
-            
-            tf_json = json.loads(result.stdout)
-            
-            # Check terraform required_providers block
-            if 'terraform' in tf_json:
-                terraform_block = tf_json['terraform']
-                if isinstance(terraform_block, list):
-                    terraform_block = terraform_block[0]
-                required_providers = terraform_block.get('required_providers', {})
-                if required_providers:
-                    if isinstance(required_providers, dict):
-                        # Handle nested provider configurations
-                        for provider_name, provider_config in required_providers.items():
-                            if isinstance(provider_config, dict):
-                                # Get the actual provider type from source
-                                source = provider_config.get('source', '')
-                                if '/' in source:
-                                    provider_type = source.split('/')[-1]
-                                    if provider_type in ['aws', 'github']:
-                                        providers.add(provider_type)
-                                elif provider_name in ['aws', 'github']:
-                                    providers.add(provider_name)
-                            elif provider_name in ['aws', 'github']:
-                                providers.add(provider_name)
-
-            # Check direct provider blocks
-            if 'provider' in tf_json:
-                provider_blocks = tf_json['provider']
-                if isinstance(provider_blocks, dict):
-                    for provider_name in provider_blocks.keys():
-                        base_provider = provider_name.split('.')[0]  # Handle provider.alias syntax
-                        if base_provider in ['aws', 'github']:
-                            providers.add(base_provider)
-                elif isinstance(provider_blocks, list):
-                    for block in provider_blocks:
-                        for provider_name in block.keys():
-                            base_provider = provider_name.split('.')[0]
-                            if base_provider in ['aws', 'github']:
-                                providers.add(base_provider)
-
+            tf_json = self.hcl_backend.load(file_path)
+            providers = self._extract_schema(tf_json, file_path)[1]
+            return {provider for provider in providers if provider in self.PROVIDER_REQUIREMENTS}
         except Exception as e:
             logger.warning(f"Failed to parse providers from {file_path}: {str(e)}")
-
-        return providers
+            return set()
 
     def get_provider_requirements(self) -> Tuple[List[str], List[FileSpec]]:
         """Get required environment variables and file mounts based on detected providers."""
@@ -584,7 +615,11 @@ class TerraformModuleParser:
         return variables
 
     def get_variables(self) -> Tuple[Dict[str, Any], List[str], List[str]]:
-        """Optimized parallel variable parsing."""
+        """Optimized parallel variable parsing.
+
+        The checkout is released to the clone cache afterwards, so variables
+        can only be parsed once per parser.
+        """
         try:
             if not self.module_dir:
                 raise ValueError("Module directory not set. Module may not exist or failed to clone.")
@@ -606,6 +641,16 @@ class TerraformModuleParser:
                 self.errors.append("No .tf files found in module")
                 return {}, self.warnings, self.errors
 
+            # Answer unchanged modules straight from the manifest hash
+            manifest_hash, file_hashes = None, {}
+            if self.parse_cache:
+                manifest_hash, file_hashes = self.parse_cache.manifest(self.module_dir, tf_files)
+                cached = self.parse_cache.get_module(manifest_hash)
+                if cached is not None:
+                    logger.info(f"Using cached schema for module {self.module_dir}")
+                    variables, self.providers = cached
+                    return variables, self.warnings, self.errors
+
             # Process files in parallel batches
             batch_size = 10
             variables = {}
@@ -614,7 +659,7 @@ class TerraformModuleParser:
             for i in range(0, len(tf_files), batch_size):
                 batch = tf_files[i:i + batch_size]
                 futures = {
-                    self._executor.submit(self._parse_file, tf_file): tf_file
+                    self._executor.submit(self._parse_file, tf_file, file_hashes.get(str(tf_file))): tf_file
                     for tf_file in batch
                 }
                 
@@ -627,55 +672,64 @@ class TerraformModuleParser:
                         logger.error(f"Failed to process file: {str(e)}")
 
             self.providers = providers
+            # Only cache complete results so a bad parse is retried next time
+            if manifest_hash and not self.errors and not self.warnings:
+                self.parse_cache.put_module(manifest_hash, variables, providers)
             return variables, self.warnings, self.errors
 
         except Exception as e:
             logger.error(f"Failed to get variables: {str(e)}", exc_info=True)
             self.errors.append(f"Failed to get variables: {str(e)}")
             return {}, self.warnings, self.errors
+        finally:
+            self.close()
 
-    @lru_cache(maxsize=100)
-    def _parse_file(self, file_path: str) -> Tuple[Dict[str, Any], Set[str]]:
+    def _parse_file(self, file_path: str, content_hash: Optional[str] = None) -> Tuple[Dict[str, Any], Set[str]]:
         """Parse both variables and providers from a file with caching."""
         try:
-            result = subprocess.run(
-                ['/usr/local/bin/hcl2json', str(file_path)],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=10
-            )
-            
-            tf_json = json.loads(result.stdout)
-            variables = {}
-            providers = set()
+            if self.parse_cache:
+                content_hash = content_hash or self.parse_cache.hash_file(str(file_path))
+                cached = self.parse_cache.get_file(content_hash)
+                if cached is not None:
+                    return cached
+
+            tf_json = self.hcl_backend.load(str(file_path))
+            variables, providers = self._extract_schema(tf_json, file_path)
+            if self.parse_cache:
+                self.parse_cache.put_file(content_hash, variables, providers)
+            return variables, providers
+        except Exception as e:
+            logger.error(f"Failed to parse {file_path}: {str(e)}")
+            self.warnings.append(f"Failed to parse {file_path}: {str(e)}")
+            return {}, set()
 
-            # Process variables
-            if 'variable' in tf_json:
-                try:
-                    variables = self._process_variables(tf_json['variable'])
-                except Exception as e:
-                    logger.error(f"Failed to process variables in {file_path}: {str(e)}")
+    def _extract_schema(self, tf_json: Dict[str, Any], file_path: str) -> Tuple[Dict[str, Any], Set[str]]:
+        """Extract variables, providers and required_providers in a single pass."""
+        variables = {}
+        providers = set()
 
-            # Process providers
-            if 'provider' in tf_json:
-                try:
-                    providers.update(self._process_providers(tf_json['provider']))
-                except Exception as e:
-                    logger.error(f"Failed to process providers in {file_path}: {str(e)}")
+        # Process variables
+        if 'variable' in tf_json:
+            try:
+                variables = self._process_variables(tf_json['variable'])
+            except Exception as e:
+                logger.error(f"Failed to process variables in {file_path}: {str(e)}")
 
-            # Process required providers
-            if 'terraform' in tf_json:
-                try:
-                    providers.update(self._process_required_providers(tf_json['terraform']))
-                except Exception as e:
-                    logger.error(f"Failed to process required providers in {file_path}: {str(e)}")
+        # Process providers
+        if 'provider' in tf_json:
+            try:
+                providers.update(self._process_providers(tf_json['provider']))
+            except Exception as e:
+                logger.error(f"Failed to process providers in {file_path}: {str(e)}")
 
-            return variables, providers
+        # Process required providers
+        if 'terraform' in tf_json:
+            try:
+                providers.update(self._process_required_providers(tf_json['terraform']))
+            except Exception as e:
+                logger.error(f"Failed to process required providers in {file_path}: {str(e)}")
 
-        except Exception as e:
-            logger.error(f"Failed to parse {file_path}: {str(e)}")
-            return {}, set()
+        return variables, providers
 
     def _process_variables(self, var_blocks: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Dict[str, Any]:
         """Process variables with proper type handling."""
@@ -706,6 +760,9 @@ class TerraformModuleParser:
                 if isinstance(var_type, (dict, list)):
                     # Handle complex types
                     var_type = json.dumps(var_type)
+                elif isinstance(var_type, str) and var_type.startswith('${') and var_type.endswith('}'):
+                    # Unwrap interpolation syntax so both backends report e.g. "string"
+                    var_type = var_type[2:-1]
                 
                 description = var_config.get('description', '')
                 if isinstance(description, (dict, list)):
@@ -741,20 +798,29 @@ class TerraformModuleParser:
         elif isinstance(provider_blocks, dict):
             providers.update(provider_blocks.keys())
         
-        return providers
+        # Handle provider.alias syntax
+        return {provider.split('.')[0] for provider in providers}
 
-    def _process_required_providers(self, terraform_block: Dict[str, Any]) -> Set[str]:
+    def _process_required_providers(self, terraform_block: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Set[str]:
         """Process required_providers block with proper type handling."""
         providers = set()
         
         try:
-            required_providers = terraform_block.get('required_providers', {})
-            if isinstance(required_providers, list):
-                required_providers = required_providers[0] if required_providers else {}
-                
-            if isinstance(required_providers, dict):
-                providers.update(required_providers.keys())
+            # Both backends return a list of terraform blocks
+            terraform_blocks = terraform_block if isinstance(terraform_block, list) else [terraform_block]
+            for block in terraform_blocks:
+                if not isinstance(block, dict):
+                    continue
+                required_providers = block.get('required_providers', {})
+                if isinstance(required_providers, list):
+                    required_providers = required_providers[0] if required_providers else {}
+                    
+                if isinstance(required_providers, dict):
+                    for provider_name, provider_config in required_providers.items():
+                        # Prefer the provider type from source (e.g. hashicorp/aws -> aws)
+                        source = provider_config.get('source', '') if isinstance(provider_config, dict) else ''
+                        providers.add(source.split('/')[-1] if '/' in source else provider_name)
         except Exception as e:
             logger.error(f"Failed to process required providers: {str(e)}")
         
-        return providers
\ No newline at end of file
+        return providers
@@ -0,0 +1,156 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'kubiya', 'terraform_registry')
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+_VERSION_RE = re.compile(r'^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$')
+_CONSTRAINT_RE = re.compile(r'^(=|!=|>=|<=|>|<|~>)?\s*(\S+)$')
+
+
+class RegistryCache:
+    """Small on-disk key/value store for registry lookups.
+
+    Values are stored with the time they were written and, for HTTP responses,
+    the ``ETag`` they were served with so stale entries can be revalidated
+    with a conditional request instead of refetched.
+    """
+
+    CACHE_FILE = 'cache.json'
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[int] = None):
+        self.cache_dir = cache_dir or os.environ.get('TF_REGISTRY_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.ttl = ttl if ttl is not None else int(os.environ.get('TF_REGISTRY_CACHE_TTL', DEFAULT_TTL_SECONDS))
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._entries = self._load()
+
+    def _path(self) -> str:
+        return os.path.join(self.cache_dir, self.CACHE_FILE)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._path(), 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save(self) -> None:
+        tmp_path = f"{self._path()}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self._path())
+        except OSError as e:
+            logger.warning(f"Failed to persist registry cache: {str(e)}")
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """Return the entry for ``key`` if it is fresh (or any entry with ``allow_stale``)."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if not entry:
+            return None
+        if allow_stale or time.time() - entry.get('stored_at', 0) < self.ttl:
+            return entry
+        return None
+
+    def put(self, key: str, value: Any, etag: Optional[str] = None) -> None:
+        with self._lock:
+            self._entries[key] = {'value': value, 'etag': etag, 'stored_at': time.time()}
+            self._save()
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as fresh again after a successful revalidation."""
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]['stored_at'] = time.time()
+                self._save()
+
+
+def parse_version(version: str) -> Optional[Tuple[int, int, int, Tuple[str, ...]]]:
+    """Parse a semantic version into a sortable tuple, or None if it is not one."""
+    match = _VERSION_RE.match(version.strip())
+    if not match:
+        return None
+    major, minor, patch, prerelease = match.groups()
+    return int(major), int(minor or 0), int(patch or 0), tuple(prerelease.split('.')) if prerelease else ()
+
+
+def _version_key(parsed: Tuple[int, int, int, Tuple[str, ...]]) -> Tuple:
+    # Releases sort after their prereleases
+    return parsed[:3] + ((1,) if not parsed[3] else (0, parsed[3]))
+
+
+def is_exact_version(version: Optional[str]) -> bool:
+    return bool(version) and parse_version(version.lstrip('=').strip()) is not None and not any(
+        op in version for op in ('>', '<', '~', '!', ',')
+    )
+
+
+def _matches(version: Tuple, operator: str, bound_text: str) -> bool:
+    bound = parse_version(bound_text)
+    if bound is None:
+        raise ValueError(f"Invalid version in constraint: {bound_text}")
+    key, bound_key = _version_key(version), _version_key(bound)
+    if operator == '=':
+        return key == bound_key
+    if operator == '!=':
+        return key != bound_key
+    if operator == '>':
+        return key > bound_key
+    if operator == '>=':
+        return key >= bound_key
+    if operator == '<':
+        return key < bound_key
+    if operator == '<=':
+        return key <= bound_key
+    # Pessimistic constraint: ~> 1.2 allows >= 1.2, < 2.0; ~> 1.2.3 allows >= 1.2.3, < 1.3.0
+    segments = len(bound_text.lstrip('v').split('-')[0].split('.'))
+    if segments <= 1:
+        return key >= bound_key
+    upper = (bound[0] + 1, 0, 0) if segments == 2 else (bound[0], bound[1] + 1, 0)
+    return key >= bound_key and version[:3] < upper
+
+
+@lru_cache(maxsize=1024)
+def resolve_version_constraint(versions: Tuple[str, ...], constraint: Optional[str]) -> Optional[str]:
+    """Pick the newest version that satisfies a Terraform version constraint.
+
+    Prereleases are only selected when the constraint names them exactly.
+    Memoized on the (hashable) version list and constraint.
+    """
+    parts = []
+    for part in (constraint or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        match = _CONSTRAINT_RE.match(part)
+        if not match:
+            raise ValueError(f"Invalid version constraint: {constraint}")
+        parts.append((match.group(1) or '=', match.group(2)))
+
+    candidates = []
+    for version in versions:
+        parsed = parse_version(version)
+        if parsed is None:
+            continue
+        exact_prerelease = any(op == '=' and bound == version for op, bound in parts)
+        if parsed[3] and not exact_prerelease:
+            continue
+        if all(_matches(parsed, op, bound) for op, bound in parts):
+            candidates.append((parsed, version))
+
+    if not candidates:
+        return None
+    return max(candidates, key=lambda item: _version_key(item[0]))[1]
+
+
+__all__ = ['RegistryCache', 'resolve_version_constraint', 'parse_version', 'is_exact_version']
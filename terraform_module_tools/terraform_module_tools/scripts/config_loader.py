@@ -6,6 +6,8 @@ from kubiya_sdk.tools.registry import tool_registry
 
 logger = logging.getLogger(__name__)
 
+MODULE_DISCOVERY_OPTIONS = ['path', 'clone_cache', 'parse_cache', 'hcl_backend', 'sparse_checkout']
+
 class ConfigurationError(Exception):
     """Exception raised for configuration errors."""
     def __init__(self, message: str, expected_structure: Optional[Dict[str, Any]] = None):
@@ -233,7 +235,13 @@ def get_module_configs(config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
                     'version': module_config.get('version'),
                     'description': module_config.get('description', f"Terraform module for {module_name}"),
                     'variables': module_config.get('variables', {}),
-                    'auto_discover': module_config.get('auto_discover', True)
+                    'auto_discover': module_config.get('auto_discover', True),
+                    # Optional discovery settings consumed by TerraformModuleParser
+                    **{
+                        key: module_config[key]
+                        for key in MODULE_DISCOVERY_OPTIONS
+                        if key in module_config
+                    }
                 }
                 
             except Exception as e:
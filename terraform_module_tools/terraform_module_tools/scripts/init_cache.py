@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import fcntl
+import hashlib
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+from terraform_module_tools.scripts.error_handler import logger
+
+DEFAULT_PLUGIN_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.terraform.d', 'plugin-cache')
+INIT_MARKER = 'kubiya-init.json'
+LOCK_FILE = '.terraform.lock.hcl'
+
+# Blocks whose contents decide whether `terraform init` has to run again
+INIT_RELEVANT_BLOCKS = ('terraform', 'module')
+
+
+def configure_provider_cache() -> str:
+    """Point Terraform at the shared provider plugin cache (and mirror, if configured).
+
+    Uses ``TF_PLUGIN_CACHE_DIR`` when already set, otherwise a per-user default.
+    When ``TF_PROVIDER_MIRROR_DIR`` is set, a CLI config is generated that
+    installs providers from that filesystem mirror before falling back to the
+    registry. Returns the plugin cache directory.
+    """
+    cache_dir = os.environ.setdefault('TF_PLUGIN_CACHE_DIR', DEFAULT_PLUGIN_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Let modules without a committed lock file still link providers from the cache
+    os.environ.setdefault('TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE', 'true')
+
+    mirror_dir = os.environ.get('TF_PROVIDER_MIRROR_DIR')
+    if mirror_dir and 'TF_CLI_CONFIG_FILE' not in os.environ:
+        cli_config = Path(cache_dir) / 'kubiya-mirror.tfrc'
+        cli_config.write_text(
+            'provider_installation {\n'
+            '  filesystem_mirror {\n'
+            f'    path = {json.dumps(mirror_dir)}\n'
+            '  }\n'
+            '  direct {}\n'
+            '}\n'
+        )
+        os.environ['TF_CLI_CONFIG_FILE'] = str(cli_config)
+        logger.info(f"Using provider filesystem mirror at {mirror_dir}")
+
+    return cache_dir
+
+
+def _extract_blocks(content: str, block_types: tuple) -> List[str]:
+    """Return the raw text of top-level blocks of the given types."""
+    blocks = []
+    depth = 0
+    index = 0
+    block_start = None
+    in_string = False
+    length = len(content)
+    while index < length:
+        char = content[index]
+        if in_string:
+            if char == '\\':
+                index += 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '#' or content.startswith('//', index):
+            newline = content.find('\n', index)
+            index = length if newline == -1 else newline
+            continue
+        elif content.startswith('/*', index):
+            end = content.find('*/', index + 2)
+            index = length if end == -1 else end + 2
+            continue
+        elif char == '{':
+            if depth == 0:
+                line_start = content.rfind('\n', 0, index) + 1
+                header = content[line_start:index].split()
+                if header and header[0] in block_types:
+                    block_start = line_start
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0 and block_start is not None:
+                blocks.append(content[block_start:index + 1])
+                block_start = None
+        index += 1
+    return blocks
+
+
+def init_fingerprint(module_path: Path, backend_args: Optional[List[str]] = None) -> str:
+    """Hash the lock file, backend settings and module sources of a configuration."""
+    digest = hashlib.sha256()
+    lock_file = module_path / LOCK_FILE
+    digest.update(lock_file.read_bytes() if lock_file.exists() else b'<no lock file>')
+    for tf_file in sorted(module_path.glob('*.tf')):
+        content = tf_file.read_text(encoding='utf-8', errors='ignore')
+        for block in _extract_blocks(content, INIT_RELEVANT_BLOCKS):
+            digest.update(tf_file.name.encode())
+            digest.update(block.encode())
+    for arg in backend_args or []:
+        digest.update(arg.encode())
+    for var in ('TF_CLI_CONFIG_FILE', 'TF_WORKSPACE'):
+        digest.update(f"{var}={os.environ.get(var, '')}".encode())
+    return digest.hexdigest()
+
+
+def _marker_path(module_path: Path) -> Path:
+    return module_path / '.terraform' / INIT_MARKER
+
+
+def is_init_current(module_path: Path, fingerprint: str) -> bool:
+    """Check whether a previous successful init matches ``fingerprint``."""
+    marker = _marker_path(module_path)
+    try:
+        with marker.open() as f:
+            return json.load(f).get('fingerprint') == fingerprint
+    except (OSError, json.JSONDecodeError):
+        return False
+
+
+@contextmanager
+def _plugin_cache_lock(cache_dir: str):
+    """Serialize inits that share the plugin cache; Terraform does not lock it."""
+    with open(os.path.join(cache_dir, '.init.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def ensure_initialized(module_path: Path, run_command: Callable, backend_args: Optional[List[str]] = None) -> bool:
+    """Run ``terraform init`` through the shared provider cache unless it is already current.
+
+    Returns True if init ran and False if it was skipped.
+    """
+    cache_dir = configure_provider_cache()
+    fingerprint = init_fingerprint(module_path, backend_args)
+    if is_init_current(module_path, fingerprint):
+        logger.info("⚡ Lock file and backend config unchanged since last init, skipping terraform init")
+        return False
+
+    with _plugin_cache_lock(cache_dir):
+        start = time.time()
+        run_command(["terraform", "init", "-input=false", *(backend_args or [])], cwd=module_path)
+        elapsed = time.time() - start
+
+    # Init may have created or updated the lock file, so fingerprint the result
+    marker = _marker_path(module_path)
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    with marker.open('w') as f:
+        json.dump({
+            'fingerprint': init_fingerprint(module_path, backend_args),
+            'initialized_at': time.time(),
+            'duration_seconds': elapsed
+        }, f)
+    logger.info(f"terraform init finished in {elapsed:.1f}s using plugin cache {cache_dir}")
+    return True
+
+
+__all__ = ['configure_provider_cache', 'ensure_initialized', 'init_fingerprint', 'is_init_current']
@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+from terraform_module_tools.scripts.error_handler import ScriptError, logger
+
+# Slack allows roughly one chat.update per second per channel; stay well below it
+DEFAULT_SLACK_UPDATE_INTERVAL = 3.0
+
+# Actions reported in planned_change / change_summary events
+PLAN_ACTIONS = ('create', 'update', 'delete', 'replace', 'read', 'noop')
+
+
+def json_progress_enabled() -> bool:
+    """Check whether terraform should run with -json streaming progress."""
+    return os.environ.get('TF_STREAM_JSON', '').lower() in ('1', 'true', 'yes')
+
+
+class TerraformProgress:
+    """Live counts built from terraform's machine-readable (-json) event stream."""
+
+    def __init__(self):
+        self.planned: Dict[str, int] = {action: 0 for action in PLAN_ACTIONS}
+        self.summary: Dict[str, int] = {}
+        self.applying: Dict[str, str] = {}
+        self.applied = 0
+        self.failed = 0
+        self.failed_resources: List[str] = []
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.outputs: Dict[str, Any] = {}
+        self.last_message = ''
+
+    def handle(self, event: Dict[str, Any]) -> None:
+        """Update counters from a single event."""
+        event_type = event.get('type')
+        hook = event.get('hook', {})
+        address = hook.get('resource', {}).get('addr', '')
+        self.last_message = event.get('@message', self.last_message)
+
+        if event_type == 'planned_change':
+            action = event.get('change', {}).get('action', 'noop')
+            self.planned[action] = self.planned.get(action, 0) + 1
+        elif event_type == 'change_summary':
+            self.summary = event.get('changes', {})
+        elif event_type == 'apply_start':
+            self.applying[address] = hook.get('action', '')
+        elif event_type == 'apply_complete':
+            self.applying.pop(address, None)
+            self.applied += 1
+        elif event_type == 'apply_errored':
+            self.applying.pop(address, None)
+            self.failed += 1
+            self.failed_resources.append(address)
+        elif event_type == 'diagnostic':
+            diagnostic = event.get('diagnostic', {})
+            text = diagnostic.get('summary', '')
+            if diagnostic.get('detail'):
+                text = f"{text}: {diagnostic['detail']}"
+            (self.errors if diagnostic.get('severity') == 'error' else self.warnings).append(text)
+        elif event_type == 'outputs':
+            self.outputs = event.get('outputs', {})
+
+    def summary_counts(self) -> Dict[str, int]:
+        """Add/change/destroy counts, preferring terraform's own change summary."""
+        if self.summary:
+            return {
+                'add': self.summary.get('add', 0),
+                'change': self.summary.get('change', 0),
+                'destroy': self.summary.get('remove', 0)
+            }
+        return {
+            'add': self.planned['create'] + self.planned['replace'],
+            'change': self.planned['update'],
+            'destroy': self.planned['delete'] + self.planned['replace']
+        }
+
+    def format_status(self, operation: str) -> str:
+        """Human readable progress text for Slack."""
+        counts = self.summary_counts()
+        lines = [
+            f"Terraform {operation} in progress...",
+            f"🟢 To add: {counts['add']}  🟡 To change: {counts['change']}  🔴 To destroy: {counts['destroy']}"
+        ]
+        if operation == 'apply':
+            lines.append(f"✅ Applied: {self.applied}  ⏳ In progress: {len(self.applying)}  ❌ Failed: {self.failed}")
+            if self.applying:
+                in_flight = sorted(self.applying)[:5]
+                more = len(self.applying) - len(in_flight)
+                lines.append("Working on: " + ", ".join(in_flight) + (f" (+{more} more)" if more > 0 else ""))
+        if self.errors:
+            lines.append(f"Errors: {len(self.errors)}")
+        return "\n".join(lines)
+
+
+class CoalescingSlackUpdater:
+    """Debounce and coalesce Slack message updates.
+
+    Only the latest text is kept; it is sent at most once per ``min_interval``
+    seconds, with a timer flushing the trailing update so the final state is
+    never lost.
+    """
+
+    def __init__(self, notifier, min_interval: Optional[float] = None):
+        self.notifier = notifier
+        self.min_interval = min_interval if min_interval is not None else float(
+            os.environ.get('SLACK_UPDATE_INTERVAL', DEFAULT_SLACK_UPDATE_INTERVAL)
+        )
+        self._lock = threading.Lock()
+        self._pending: Optional[str] = None
+        self._last_sent_text: Optional[str] = None
+        self._last_sent_at = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self.sent = 0
+        self.coalesced = 0
+
+    def update(self, text: str) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = text
+            wait = self.min_interval - (time.monotonic() - self._last_sent_at)
+            if wait > 0:
+                if self._timer is None:
+                    self._timer = threading.Timer(wait, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Send the pending update now, if any."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            text, self._pending = self._pending, None
+            if text is None or text == self._last_sent_text:
+                return
+            self._last_sent_text = text
+            self._last_sent_at = time.monotonic()
+            self.sent += 1
+        self.notifier.update_progress(text)
+
+
+def stream_terraform_json(
+    cmd: List[str],
+    cwd: Optional[Path] = None,
+    on_event: Optional[Callable[[Dict[str, Any], TerraformProgress], None]] = None
+) -> TerraformProgress:
+    """Run a terraform command with -json and process its events as they arrive.
+
+    Each event's ``@message`` is echoed to stdout and ``on_event`` is called after
+    the progress counters are updated, with the event and the progress so far.
+    Raises ScriptError if terraform fails.
+    """
+    if '-json' not in cmd:
+        cmd = [*cmd, '-json']
+    logger.info(f"🔄 Streaming command in {cwd or '.'}: {' '.join(cmd)}")
+    env = os.environ.copy()
+    env["TF_IN_AUTOMATION"] = "1"
+
+    progress = TerraformProgress()
+    try:
+        process = subprocess.Popen(
+            cmd,
+            cwd=str(cwd) if cwd else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            env=env
+        )
+    except Exception as e:
+        raise ScriptError(f"Unexpected error: {str(e)}", exit_code=1)
+
+    # Drain stderr concurrently so a chatty stderr cannot block stdout
+    stderr_lines: List[str] = []
+    stderr_thread = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+    stderr_thread.start()
+
+    for line in process.stdout:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            print(line, flush=True)
+            continue
+        progress.handle(event)
+        if event.get('@message'):
+            print(event['@message'], flush=True)
+        if on_event:
+            try:
+                on_event(event, progress)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {str(e)}")
+
+    returncode = process.wait()
+    stderr_thread.join(timeout=5)
+    if returncode != 0:
+        details = "\n".join(progress.errors) or "".join(stderr_lines) or f"exit code {returncode}"
+        logger.error(f"Command failed in {cwd or '.'}: {' '.join(cmd)}\n{details}")
+        raise ScriptError(f"Command failed: {' '.join(cmd)}\n{details}", exit_code=returncode)
+    return progress
+
+
+__all__ = [
+    'TerraformProgress',
+    'CoalescingSlackUpdater',
+    'stream_terraform_json',
+    'json_progress_enabled'
+]
@@ -8,6 +8,8 @@ from typing import List, Dict, Any, Optional
 from pathlib import Path
 from terraform_module_tools.scripts.error_handler import handle_script_error, ScriptError, validate_environment_vars, logger
 from .runtime_helper import get_runtime_instructions
+from .init_cache import ensure_initialized
+from .json_stream import stream_terraform_json, json_progress_enabled, CoalescingSlackUpdater
 
 # Try to import slack_sdk
 try:
@@ -155,20 +157,32 @@ def main():
                 exit_code=2
             )
 
-        # Initialize Terraform
+        # Initialize Terraform (through the shared provider cache, skipped if unchanged)
         print_progress("Initializing Terraform...", "⚙️")
         slack.update_progress("Initializing Terraform...")
-        run_command(["terraform", "init"], cwd=module_path)
+        if not ensure_initialized(module_path, run_command):
+            print_progress("Terraform already initialized, reusing previous init.", "⚡")
 
         # Apply changes
         print_progress("Applying Terraform changes...", "🚀")
         slack.update_progress("Applying Terraform changes...")
-        apply_output = run_command(
-            ["terraform", "apply", "-auto-approve", "-no-color"],
-            cwd=module_path,
-            capture_output=True
-        )
-        print(apply_output)
+        if json_progress_enabled():
+            # Stream per-resource events; progress is printed and pushed to Slack as it happens
+            updater = CoalescingSlackUpdater(slack)
+            progress = stream_terraform_json(
+                ["terraform", "apply", "-auto-approve", "-no-color", "-input=false"],
+                cwd=module_path,
+                on_event=lambda event, progress: updater.update(progress.format_status('apply'))
+            )
+            updater.flush()
+            print_progress(f"Applied {progress.applied} resource change(s).", "📦")
+        else:
+            apply_output = run_command(
+                ["terraform", "apply", "-auto-approve", "-no-color"],
+                cwd=module_path,
+                capture_output=True
+            )
+            print(apply_output)
 
         # Try to get the outputs if available
         try:
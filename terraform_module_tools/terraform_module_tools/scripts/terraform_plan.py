@@ -9,6 +9,8 @@ from typing import List, Dict, Any, Optional
 from pathlib import Path
 from terraform_module_tools.scripts.error_handler import handle_script_error, ScriptError, validate_environment_vars, logger
 from .runtime_helper import get_runtime_instructions
+from .init_cache import ensure_initialized
+from .json_stream import stream_terraform_json, json_progress_enabled, CoalescingSlackUpdater
 
 # Try to import slack_sdk
 try:
@@ -156,32 +158,54 @@ def main():
                 exit_code=2
             )
 
-        # Initialize Terraform
+        # Initialize Terraform (through the shared provider cache, skipped if unchanged)
         print_progress("Initializing Terraform...", "⚙️")
         slack.update_progress("Initializing Terraform...")
-        run_command(["terraform", "init"], cwd=module_path)
+        if not ensure_initialized(module_path, run_command):
+            print_progress("Terraform already initialized, reusing previous init.", "⚡")
 
         # Generate plan
         print_progress("Generating Terraform plan...", "📋")
         slack.update_progress("Generating Terraform plan...")
-        plan_output = run_command(
-            ["terraform", "plan", "-no-color"],
-            cwd=module_path,
-            capture_output=True
-        )
-        print(plan_output)
-
-        # Parse plan output for changes summary
-        changes_summary = {
-            'add': re.search(r'Plan: (\d+) to add', plan_output or ''),
-            'change': re.search(r'(\d+) to change', plan_output or ''),
-            'destroy': re.search(r'(\d+) to destroy', plan_output or '')
-        }
+        if json_progress_enabled():
+            # Stream machine-readable events for live progress, then render the saved plan
+            updater = CoalescingSlackUpdater(slack)
+            progress = stream_terraform_json(
+                ["terraform", "plan", "-no-color", "-input=false", "-out=tfplan"],
+                cwd=module_path,
+                on_event=lambda event, progress: updater.update(progress.format_status('plan'))
+            )
+            updater.flush()
+            plan_output = run_command(
+                ["terraform", "show", "-no-color", "tfplan"],
+                cwd=module_path,
+                capture_output=True
+            )
+            print(plan_output)
+            counts = progress.summary_counts()
+        else:
+            plan_output = run_command(
+                ["terraform", "plan", "-no-color"],
+                cwd=module_path,
+                capture_output=True
+            )
+            print(plan_output)
+
+            # Parse plan output for changes summary
+            changes_summary = {
+                'add': re.search(r'Plan: (\d+) to add', plan_output or ''),
+                'change': re.search(r'(\d+) to change', plan_output or ''),
+                'destroy': re.search(r'(\d+) to destroy', plan_output or '')
+            }
+            counts = {
+                key: match.group(1) if match else '0'
+                for key, match in changes_summary.items()
+            }
         
         summary_text = "Plan Summary:\n"
-        summary_text += f"🟢 To add: {changes_summary['add'].group(1) if changes_summary['add'] else '0'}\n"
-        summary_text += f"🟡 To change: {changes_summary['change'].group(1) if changes_summary['change'] else '0'}\n"
-        summary_text += f"🔴 To destroy: {changes_summary['destroy'].group(1) if changes_summary['destroy'] else '0'}"
+        summary_text += f"🟢 To add: {counts['add']}\n"
+        summary_text += f"🟡 To change: {counts['change']}\n"
+        summary_text += f"🔴 To destroy: {counts['destroy']}"
         
         slack.update_progress(f"Terraform plan completed successfully.\n{summary_text}")
 
@@ -5,6 +5,7 @@ from kubiya_sdk.tools.registry import tool_registry
 from .terraformer_tool import TerraformerTool, _initialize_provider_tools
 from .terraform_module_tool import TerraformModuleTool
 from .module_tools import create_terraform_module_tool, initialize_module_tools
+from .module_loader import ModuleToolLoader
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +68,7 @@ __all__ = [
     'TerraformModuleTool',
     'create_terraform_module_tool',
     'initialize_module_tools',
+    'ModuleToolLoader',
     'TerraformerTool'
 ]
 
@@ -0,0 +1,335 @@
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, List, Optional
+from kubiya_sdk.tools import Tool
+from ..parser import TerraformModuleParser
+from ..parse_cache import ParseCache
+from .terraform_module_tool import TerraformModuleTool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NETWORK_WORKERS = 8
+DEFAULT_CPU_WORKERS = os.cpu_count() or 4
+
+# Failed lazy discovery is retried after this delay, doubling up to the maximum
+RESOLVE_RETRY_SECONDS = 30
+MAX_RESOLVE_RETRY_SECONDS = 600
+
+# (action, with_pr) pairs generated for every module
+MODULE_ACTIONS = [('plan', False), ('plan', True), ('apply', False)]
+
+
+@dataclass
+class ModuleLoadResult:
+    """Outcome and timing of loading a single module."""
+    name: str
+    tools: List[Tool] = field(default_factory=list)
+    error: Optional[str] = None
+    # Set when discovery failed and the tools fell back to configured or cached variables
+    discovery_error: Optional[str] = None
+    clone_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    generate_seconds: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    @property
+    def total_seconds(self) -> float:
+        return self.clone_seconds + self.parse_seconds + self.generate_seconds
+
+
+def build_tool_config(module_name: str, module_config: Dict[str, Any], variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Convert a validated module configuration into the shape TerraformModuleTool expects."""
+    source = module_config['source']
+    if not isinstance(source, dict):
+        source = {'location': source, 'version': module_config.get('version')}
+    return {
+        'name': module_name,
+        'description': module_config.get('description', f"Terraform module for {module_name}"),
+        'source': source,
+        'variables': variables if variables is not None else module_config.get('variables', {}),
+        'auto_discover': module_config.get('auto_discover', True),
+        'pre_script': module_config.get('pre_script')
+    }
+
+
+def _source_parts(module_config: Dict[str, Any]) -> tuple:
+    source = module_config['source']
+    if isinstance(source, dict):
+        return source['location'], source.get('version') or module_config.get('version')
+    return source, module_config.get('version')
+
+
+def _remember_schema(module_config: Dict[str, Any], parser: TerraformModuleParser, variables: Dict[str, Any]) -> None:
+    """Record the discovered schema so lazy loading can register it without cloning."""
+    if not ParseCache.is_enabled(module_config):
+        return
+    location, version = _source_parts(module_config)
+    ParseCache.get_default().put_source(
+        ParseCache.source_key(location, version, module_config.get('path')),
+        variables,
+        parser.providers
+    )
+
+
+class LazyModuleSchema:
+    """Module variables that are discovered on first use.
+
+    Until ``resolve`` is called, only the schema cached from a previous run (if
+    any) is available. Resolving clones and parses the module once; the result
+    is memoized and shared by every tool created for the module. A failure is
+    only remembered for a backoff period, after which the next call retries.
+    """
+
+    def __init__(self, name: str, module_config: Dict[str, Any]):
+        self.name = name
+        self.module_config = module_config
+        self.readme_url: Optional[str] = None
+        self.providers = set()
+        self._lock = threading.Lock()
+        self._variables: Optional[Dict[str, Any]] = None
+        self._error: Optional[str] = None
+        self._retry_at = 0.0
+        self._retry_seconds = RESOLVE_RETRY_SECONDS
+        self.cached_variables = module_config.get('variables', {})
+
+        if module_config.get('auto_discover', True) and ParseCache.is_enabled(module_config):
+            location, version = _source_parts(module_config)
+            cached = ParseCache.get_default().get_source(
+                ParseCache.source_key(location, version, module_config.get('path'))
+            )
+            if cached is not None:
+                self.cached_variables, self.providers = cached
+
+    @property
+    def resolved(self) -> bool:
+        return self._variables is not None
+
+    @property
+    def variables(self) -> Dict[str, Any]:
+        """Resolved variables if available, otherwise the cached ones."""
+        return self._variables if self._variables is not None else self.cached_variables
+
+    def resolve(self) -> Dict[str, Any]:
+        """Clone and parse the module (once) and return its variables."""
+        with self._lock:
+            if self._variables is not None:
+                return self._variables
+            if self._error and time.monotonic() < self._retry_at:
+                raise ValueError(self._error)
+
+            start = time.monotonic()
+            try:
+                location, version = _source_parts(self.module_config)
+                parser = TerraformModuleParser(
+                    location,
+                    ref=version,
+                    path=self.module_config.get('path'),
+                    module_config=self.module_config
+                )
+                variables, warnings, errors = parser.get_variables()
+                for warning in warnings:
+                    logger.warning(f"Module {self.name}: {warning}")
+                if errors:
+                    raise ValueError('; '.join(errors))
+            except Exception as e:
+                self._error = f"Failed to materialize module {self.name}: {str(e)}"
+                self._retry_at = time.monotonic() + self._retry_seconds
+                logger.error(f"❌ {self._error} (retrying in {self._retry_seconds}s)")
+                self._retry_seconds = min(self._retry_seconds * 2, MAX_RESOLVE_RETRY_SECONDS)
+                raise ValueError(self._error)
+
+            self._error = None
+            _remember_schema(self.module_config, parser, variables)
+            self.readme_url = parser.readme_url
+            self.providers = parser.providers
+            self._variables = variables
+            logger.info(f"Materialized module {self.name} in {time.monotonic() - start:.2f}s")
+            return variables
+
+
+def create_module_tools(tool_config: Dict[str, Any], schema: Optional[LazyModuleSchema] = None) -> List[Tool]:
+    """Create the plan, plan-with-PR and apply tools for one module."""
+    tools = []
+    base_name = tool_config['name'].lower().replace(' ', '_')[:30]
+    for action, with_pr in MODULE_ACTIONS:
+        suffix = '_plan_pr' if with_pr else f"_{action}"
+        tools.append(TerraformModuleTool(
+            name=f"tf_self_service_{base_name}{suffix}",
+            description=tool_config['description'],
+            module_config=tool_config,
+            action=action,
+            with_pr=with_pr,
+            schema=schema
+        ))
+    return tools
+
+
+class ModuleToolLoader:
+    """Clone, parse and generate tools for many modules concurrently.
+
+    Clones run on a network-bound pool and parsing plus tool generation on a
+    CPU-bound pool, so a module starts parsing as soon as its own clone is done
+    rather than waiting for every clone to finish. A module whose clone or parse
+    fails does not stop the others and still gets its tools, backed by a
+    LazyModuleSchema holding the configured or cached variables, so discovery
+    is retried on first use. ``load_lazy`` registers such tools for every module
+    and defers all cloning to first use; it is the default, since eager loading
+    clones and parses every configured module at startup.
+    """
+
+    def __init__(self, network_workers: Optional[int] = None, cpu_workers: Optional[int] = None):
+        self.network_workers = network_workers or DEFAULT_NETWORK_WORKERS
+        self.cpu_workers = cpu_workers or DEFAULT_CPU_WORKERS
+        self.results: Dict[str, ModuleLoadResult] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ModuleToolLoader':
+        loader_config = config.get('terraform', {}).get('loader', {})
+        return cls(
+            network_workers=loader_config.get('network_workers'),
+            cpu_workers=loader_config.get('cpu_workers')
+        )
+
+    @staticmethod
+    def is_lazy(config: Dict[str, Any]) -> bool:
+        """Check whether module tools should be materialized on demand (the default)."""
+        return bool(config.get('terraform', {}).get('loader', {}).get('lazy', True))
+
+    def load_lazy(self, module_configs: Dict[str, Dict[str, Any]]) -> Dict[str, ModuleLoadResult]:
+        """Register tool stubs from config and cached schemas without cloning anything."""
+        self.results = {}
+        for name, module_config in module_configs.items():
+            result = ModuleLoadResult(name=name)
+            self._generate_lazy(result, module_config)
+            self.results[name] = result
+        logger.info(f"💤 Registered lazy tools for {len(self.results)} module(s)")
+        return self.results
+
+    def load(self, module_configs: Dict[str, Dict[str, Any]]) -> Dict[str, ModuleLoadResult]:
+        """Load every module and return per-module results in config order."""
+        self.results = {name: ModuleLoadResult(name=name) for name in module_configs}
+        pending: List[Future] = []
+        pending_lock = threading.Lock()
+
+        with ThreadPoolExecutor(max_workers=self.network_workers, thread_name_prefix='tf-clone') as network_pool, \
+                ThreadPoolExecutor(max_workers=self.cpu_workers, thread_name_prefix='tf-parse') as cpu_pool:
+
+            def on_cloned(name: str, future: Future) -> None:
+                parser = future.result()
+                if parser is None:
+                    return
+                with pending_lock:
+                    pending.append(cpu_pool.submit(self._parse_and_generate, name, module_configs[name], parser))
+
+            for name, module_config in module_configs.items():
+                clone_future = network_pool.submit(self._clone, name, module_config)
+                clone_future.add_done_callback(lambda f, name=name: on_cloned(name, f))
+
+            # Leaving the network pool first guarantees every parse job has been submitted
+            network_pool.shutdown(wait=True)
+            with pending_lock:
+                parse_futures = list(pending)
+            for future in parse_futures:
+                future.result()
+
+        # Modules that could not be discovered still get tools; discovery is retried on first use
+        for name, result in self.results.items():
+            if result.discovery_error:
+                self._generate_lazy(result, module_configs[name])
+
+        self.log_report()
+        return self.results
+
+    def _clone(self, name: str, module_config: Dict[str, Any]) -> Optional[TerraformModuleParser]:
+        result = self.results[name]
+        start = time.monotonic()
+        try:
+            location, version = _source_parts(module_config)
+            return TerraformModuleParser(
+                location,
+                ref=version,
+                path=module_config.get('path'),
+                module_config=module_config
+            )
+        except Exception as e:
+            result.discovery_error = f"clone failed: {str(e)}"
+            logger.error(f"❌ Failed to clone module {name}: {str(e)}")
+            return None
+        finally:
+            result.clone_seconds = time.monotonic() - start
+
+    def _parse_and_generate(self, name: str, module_config: Dict[str, Any], parser: TerraformModuleParser) -> None:
+        result = self.results[name]
+        start = time.monotonic()
+        try:
+            variables, warnings, errors = parser.get_variables()
+            for warning in warnings:
+                logger.warning(f"Module {name}: {warning}")
+            if errors:
+                raise ValueError('; '.join(errors))
+        except Exception as e:
+            result.discovery_error = f"parse failed: {str(e)}"
+            logger.error(f"❌ Failed to parse module {name}: {str(e)}")
+            return
+        finally:
+            result.parse_seconds = time.monotonic() - start
+
+        start = time.monotonic()
+        try:
+            _remember_schema(module_config, parser, variables)
+            tool_config = build_tool_config(name, module_config, variables)
+            if parser.readme_url:
+                tool_config['readme_url'] = parser.readme_url
+            result.tools = create_module_tools(tool_config)
+        except Exception as e:
+            result.error = f"tool generation failed: {str(e)}"
+            logger.error(f"❌ Failed to create tools for module {name}: {str(e)}")
+        finally:
+            result.generate_seconds = time.monotonic() - start
+
+    @staticmethod
+    def _generate_lazy(result: ModuleLoadResult, module_config: Dict[str, Any]) -> None:
+        """Create tools backed by a LazyModuleSchema, without cloning the module."""
+        start = time.monotonic()
+        try:
+            schema = LazyModuleSchema(result.name, module_config)
+            result.tools = create_module_tools(
+                build_tool_config(result.name, module_config, schema.cached_variables),
+                schema=schema
+            )
+        except Exception as e:
+            result.error = f"tool generation failed: {str(e)}"
+            logger.error(f"❌ Failed to create tools for module {result.name}: {str(e)}")
+        finally:
+            result.generate_seconds += time.monotonic() - start
+
+    def log_report(self) -> None:
+        """Log a per-module timing breakdown."""
+        if not self.results:
+            return
+        width = max(len(name) for name in self.results)
+        lines = [f"{'module':<{width}}  {'clone':>7}  {'parse':>7}  {'tools':>7}  {'total':>7}  status"]
+        for name, result in self.results.items():
+            status = f"{len(result.tools)} tools" if result.success else result.error
+            if result.success and result.discovery_error:
+                status += f" (not discovered: {result.discovery_error})"
+            lines.append(
+                f"{name:<{width}}  {result.clone_seconds:>6.2f}s  {result.parse_seconds:>6.2f}s  "
+                f"{result.generate_seconds:>6.2f}s  {result.total_seconds:>6.2f}s  {status}"
+            )
+        failed = sum(1 for result in self.results.values() if not result.success)
+        undiscovered = sum(1 for result in self.results.values() if result.success and result.discovery_error)
+        logger.info(
+            f"📊 Module loading finished ({len(self.results) - failed - undiscovered} ok, "
+            f"{undiscovered} not discovered, {failed} failed):\n" + "\n".join(lines)
+        )
+
+
+__all__ = ['ModuleToolLoader', 'ModuleLoadResult', 'LazyModuleSchema', 'build_tool_config', 'create_module_tools']
@@ -2,7 +2,7 @@ from kubiya_sdk.tools import Tool, Arg
 from kubiya_sdk.tools.registry import tool_registry
 from pathlib import Path
 from typing import Dict, Any, Optional, List
-from .terraform_module_tool import TerraformModuleTool
+from .module_loader import ModuleToolLoader, MODULE_ACTIONS, create_module_tools
 from ..scripts.config_loader import get_module_configs, ConfigurationError
 from ..scripts.error_handler import handle_script_error, ScriptError, logger
 import logging
@@ -11,51 +11,12 @@ logger = logging.getLogger(__name__)
 
 @handle_script_error
 def create_terraform_module_tool(config: dict, action: str, with_pr: bool = False):
-    """Create a Terraform module tool from configuration."""
+    """Create a single Terraform module tool from configuration."""
     try:
-        # Generate tool name
-        action_suffix = f"_{action}"
-        if action == 'plan' and with_pr:
-            action_suffix = '_plan_pr'
-        base_name = config['name'].lower().replace(' ', '_')[:30]
-        tool_name = f"tf_self_service_{base_name}{action_suffix}"
-
-        # Create tool description
-        action_desc = {
-            'plan': 'Plan changes for',
-            'plan_pr': 'Plan changes and create PR for',
-            'apply': 'Apply changes to'
-        }
-        description = f"{action_desc.get(action, 'Manage')} {config['description']}"
-
-        # Create module configuration
-        module_config = {
-            'name': config['name'],
-            'description': config['description'],
-            'source': config['source'],
-            'pre_script': config.get('pre_script')
-        }
-        
-        # Add mermaid diagram
-        mermaid = {
-            'graph': """
-                graph TD
-                    A[Start] --> B[Load Module]
-                    B --> C[Validate Variables]
-                    C --> D[Apply Configuration]
-                    D --> E[Execute Module]
-                    E --> F[End]
-            """
-        }
-        
-        return TerraformModuleTool(
-            name=tool_name,
-            description=description,
-            module_config=module_config,
-            action=action,
-            with_pr=with_pr,
-            mermaid=mermaid
-        )
+        if (action, with_pr) not in MODULE_ACTIONS:
+            raise ValueError(f"Unsupported module action: {action}{' with PR' if with_pr else ''}")
+        tools = create_module_tools(config)
+        return tools[MODULE_ACTIONS.index((action, with_pr))]
     except Exception as e:
         logger.error(f"Failed to create terraform module tool: {str(e)}")
         raise ScriptError(str(e))
@@ -77,32 +38,21 @@ def initialize_module_tools(config: Optional[Dict[str, Any]] = None) -> Dict[str
 
         logger.info(f"Initializing {len(module_configs)} module(s)")
         
-        for module_name, module_config in module_configs.items():
-            try:
-                # Create plan tool
-                plan_tool = create_terraform_module_tool(module_config, 'plan')
-                if plan_tool:
-                    tools[plan_tool.name] = plan_tool
-                    tool_registry.register("terraform", plan_tool)
-                    logger.info(f"Created plan tool for {module_name}")
-
-                # Create plan with PR tool
-                plan_pr_tool = create_terraform_module_tool(module_config, 'plan', with_pr=True)
-                if plan_pr_tool:
-                    tools[plan_pr_tool.name] = plan_pr_tool
-                    tool_registry.register("terraform", plan_pr_tool)
-                    logger.info(f"Created plan PR tool for {module_name}")
-
-                # Create apply tool
-                apply_tool = create_terraform_module_tool(module_config, 'apply')
-                if apply_tool:
-                    tools[apply_tool.name] = apply_tool
-                    tool_registry.register("terraform", apply_tool)
-                    logger.info(f"Created apply tool for {module_name}")
-
-            except Exception as e:
-                logger.error(f"Failed to create tools for module {module_name}: {str(e)}")
+        # Register tools lazily, or clone and parse all modules up front with loader.lazy: false
+        loader = ModuleToolLoader.from_config(config)
+        if ModuleToolLoader.is_lazy(config):
+            # Register stubs now; clone and discover each module on first use
+            results = loader.load_lazy(module_configs)
+        else:
+            results = loader.load(module_configs)
+        for module_name, result in results.items():
+            if not result.success:
+                logger.error(f"Failed to create tools for module {module_name}: {result.error}")
                 continue
+            for tool in result.tools:
+                tools[tool.name] = tool
+                tool_registry.register("terraform", tool)
+            logger.info(f"Created {len(result.tools)} tools for {module_name}")
 
     except Exception as e:
         logger.error(f"Error initializing tools: {str(e)}")
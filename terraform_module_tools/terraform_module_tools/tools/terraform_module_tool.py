@@ -16,7 +16,8 @@ class TerraformModuleTool(Tool):
         module_config: Dict[str, Any],
         action: str,
         with_pr: bool = False,
-        mermaid: Optional[Dict[str, str]] = None
+        mermaid: Optional[Dict[str, str]] = None,
+        schema: Optional[Any] = None
     ):
         """Initialize the tool with proper schema validation."""
         try:
@@ -98,11 +99,30 @@ class TerraformModuleTool(Tool):
             self.module_config = module_config
             self.action = action
             self.with_pr = with_pr
+            # Lazily discovered module variables (see module_loader.LazyModuleSchema)
+            self.schema = schema
 
         except Exception as e:
             logger.error(f"Failed to initialize TerraformModuleTool: {str(e)}")
             raise ValueError(f"Tool initialization failed: {str(e)}")
 
+    def get_module_variables(self, materialize: bool = True) -> Dict[str, Any]:
+        """Get the module's variables, discovering them on first use for lazy tools."""
+        if self.schema is None:
+            return self.module_config.get('variables', {})
+        return self.schema.resolve() if materialize else self.schema.variables
+
+    def describe(self) -> Dict[str, Any]:
+        """Describe the tool, including the module's variables."""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'action': self.action,
+            'module': self.module_config['name'],
+            'source': self.module_config['source'],
+            'variables': self.get_module_variables()
+        }
+
     async def handle_terraform_module(self, **kwargs) -> Dict[str, Any]:
         """Handle Terraform module operations."""
         try:
@@ -110,6 +130,9 @@ class TerraformModuleTool(Tool):
             if not self.module_config:
                 raise ValueError("No module configuration available")
 
+            # Materialize lazily registered modules before running them
+            module_variables = self.get_module_variables()
+
             # Process variables
             variables = kwargs.get('variables', {})
             if isinstance(variables, str):
@@ -123,7 +146,8 @@ class TerraformModuleTool(Tool):
                 'success': True,
                 'action': self.action,
                 'module': self.module_config['name'],
-                'variables': variables
+                'variables': variables,
+                'module_variables': list(module_variables)
             }
 
         except Exception as e:
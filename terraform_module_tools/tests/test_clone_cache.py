@@ -0,0 +1,130 @@
+import unittest
+import os
+import json
+import shutil
+import fcntl
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+from benchmarks.module_discovery import generate_module_repo
+from terraform_module_tools.clone_cache import CloneCache
+
+
+class TestCloneCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix='clone-cache-test-'))
+        self.addCleanup(shutil.rmtree, self.root, True)
+        self.cache_dir = str(self.root / 'cache')
+        self.network = generate_module_repo(self.root, 'network', files=2, variables_per_file=2, nested_modules=0)
+        self.compute = generate_module_repo(self.root, 'compute', files=2, variables_per_file=2, nested_modules=0)
+
+    def _index(self):
+        with open(os.path.join(self.cache_dir, CloneCache.INDEX_FILE)) as f:
+            return json.load(f)
+
+    def _leases(self, path):
+        entry = next(entry for entry in self._index().values() if entry['path'] == path)
+        return entry.get('leases', {})
+
+    def test_second_checkout_is_a_hit_and_both_are_leased(self):
+        cache = CloneCache(cache_dir=self.cache_dir)
+
+        first = cache.checkout(self.network, 'main')
+        second = cache.checkout(self.network, 'main')
+
+        self.assertEqual(first, second)
+        self.assertTrue(os.path.exists(os.path.join(first, 'variables_0.tf')))
+        self.assertEqual((cache.stats['misses'], cache.stats['hits']), (1, 1))
+        self.assertEqual(self._leases(first), {str(os.getpid()): 2})
+
+        cache.release(first)
+        cache.release(first)
+        self.assertEqual(self._leases(first), {})
+
+    def test_eviction_skips_leased_entries(self):
+        # Every entry is over budget, so only leases keep them on disk
+        cache = CloneCache(cache_dir=self.cache_dir, max_bytes=1)
+
+        network = cache.checkout(self.network, 'main')
+        compute = cache.checkout(self.compute, 'main')
+        self.assertTrue(os.path.isdir(network))
+        self.assertTrue(os.path.isdir(compute))
+        self.assertEqual(cache.stats['evictions'], 0)
+
+        cache.release(network)
+        self.assertFalse(os.path.exists(network))
+        self.assertTrue(os.path.isdir(compute))
+
+        cache.release(compute)
+        self.assertFalse(os.path.exists(compute))
+        self.assertEqual(cache.stats['evictions'], 2)
+        self.assertEqual(self._index(), {})
+
+    def test_least_recently_used_entry_is_evicted_first(self):
+        cache = CloneCache(cache_dir=self.cache_dir)
+        network = cache.checkout(self.network, 'main')
+        cache.release(network)
+        compute = cache.checkout(self.compute, 'main')
+        cache.release(compute)
+
+        cache.max_bytes = cache.total_bytes() - 1
+        cache.release(compute)
+
+        self.assertFalse(os.path.exists(network))
+        self.assertTrue(os.path.isdir(compute))
+
+    def test_instances_sharing_a_directory_merge_their_index_updates(self):
+        # Two instances on one directory stand in for two processes
+        first = CloneCache(cache_dir=self.cache_dir)
+        second = CloneCache(cache_dir=self.cache_dir)
+
+        network = first.checkout(self.network, 'main')
+        compute = second.checkout(self.compute, 'main')
+
+        self.assertEqual(sorted(entry['path'] for entry in self._index().values()), sorted([network, compute]))
+        # The other instance sees the lease and leaves the checkout alone
+        second.clear()
+        self.assertTrue(os.path.isdir(network))
+        self.assertEqual(second.checkout(self.network, 'main'), network)
+        self.assertEqual(second.stats['hits'], 1)
+
+    def test_leases_of_exited_processes_are_ignored(self):
+        cache = CloneCache(cache_dir=self.cache_dir)
+        path = cache.checkout(self.network, 'main')
+        exited = subprocess.Popen(['true'])
+        exited.wait()
+
+        with cache._locked_index() as index:
+            entry = next(entry for entry in index.values() if entry['path'] == path)
+            entry['leases'] = {str(exited.pid): 1}
+        cache.clear()
+
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self._index(), {})
+
+    def test_index_updates_wait_for_the_index_lock(self):
+        cache = CloneCache(cache_dir=self.cache_dir)
+        path = cache.checkout(self.network, 'main')
+        released = threading.Event()
+
+        def release():
+            cache.release(path)
+            released.set()
+
+        with open(os.path.join(self.cache_dir, CloneCache.LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            worker = threading.Thread(target=release)
+            worker.start()
+            self.assertFalse(released.wait(0.3))
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        worker.join(5)
+
+        self.assertTrue(released.is_set())
+        self.assertEqual(self._leases(path), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
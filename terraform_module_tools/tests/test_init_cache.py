@@ -0,0 +1,104 @@
+import unittest
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from terraform_module_tools.scripts.init_cache import (
+    _extract_blocks,
+    INIT_RELEVANT_BLOCKS,
+    ensure_initialized,
+    init_fingerprint,
+)
+
+MAIN_TF = '''\
+terraform {
+  required_providers {
+    aws = { source = "hashicorp/aws", version = "~> 5.0" }
+  }
+}
+
+resource "aws_s3_bucket" "logs" {
+  bucket = "logs-${var.env}"
+}
+
+module "vpc" {
+  source = "terraform-aws-modules/vpc/aws"
+}
+'''
+
+
+class TestExtractBlocks(unittest.TestCase):
+
+    def test_top_level_blocks_of_the_given_types(self):
+        blocks = _extract_blocks(MAIN_TF, INIT_RELEVANT_BLOCKS)
+
+        self.assertEqual(len(blocks), 2)
+        self.assertTrue(blocks[0].startswith('terraform {'))
+        self.assertIn('hashicorp/aws', blocks[0])
+        self.assertTrue(blocks[1].startswith('module "vpc" {'))
+        self.assertTrue(blocks[1].endswith('}'))
+
+    def test_braces_in_strings_and_comments_are_ignored(self):
+        content = '''\
+# terraform {
+// module "commented" {
+/* module "block_comment" {
+} */
+resource "null_resource" "this" {
+  triggers = { value = "}\\" { module \\"x\\" {" }
+}
+module "real" {
+  source = "./modules/{weird}"  # trailing } comment
+}
+'''
+        blocks = _extract_blocks(content, INIT_RELEVANT_BLOCKS)
+
+        self.assertEqual(len(blocks), 1)
+        self.assertTrue(blocks[0].startswith('module "real" {'))
+        self.assertIn('./modules/{weird}', blocks[0])
+
+
+class TestInitFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        self.module_path = Path(tempfile.mkdtemp(prefix='init-cache-test-'))
+        self.addCleanup(shutil.rmtree, self.module_path, True)
+        (self.module_path / 'main.tf').write_text(MAIN_TF)
+
+    def test_only_init_relevant_changes_change_the_fingerprint(self):
+        fingerprint = init_fingerprint(self.module_path)
+
+        (self.module_path / 'main.tf').write_text(MAIN_TF.replace('logs-${var.env}', 'audit-${var.env}'))
+        self.assertEqual(init_fingerprint(self.module_path), fingerprint)
+
+        (self.module_path / 'main.tf').write_text(MAIN_TF.replace('~> 5.0', '~> 5.1'))
+        self.assertNotEqual(init_fingerprint(self.module_path), fingerprint)
+
+    def test_backend_args_and_lock_file_change_the_fingerprint(self):
+        fingerprint = init_fingerprint(self.module_path)
+
+        self.assertNotEqual(init_fingerprint(self.module_path, ['-backend-config=key=other']), fingerprint)
+        (self.module_path / '.terraform.lock.hcl').write_text('provider "registry.terraform.io/hashicorp/aws" {}\n')
+        self.assertNotEqual(init_fingerprint(self.module_path), fingerprint)
+
+    def test_init_is_skipped_until_the_fingerprint_changes(self):
+        commands = []
+        plugin_cache = tempfile.mkdtemp(prefix='plugin-cache-test-')
+        self.addCleanup(shutil.rmtree, plugin_cache, True)
+
+        def run_command(cmd, cwd=None):
+            commands.append(cmd)
+
+        with patch.dict(os.environ, {'TF_PLUGIN_CACHE_DIR': plugin_cache}):
+            self.assertTrue(ensure_initialized(self.module_path, run_command))
+            self.assertFalse(ensure_initialized(self.module_path, run_command))
+            self.assertTrue(ensure_initialized(self.module_path, run_command, ['-backend-config=key=other']))
+
+        self.assertEqual(len(commands), 2)
+        self.assertEqual(commands[0][:2], ['terraform', 'init'])
+
+
+if __name__ == '__main__':
+    unittest.main()
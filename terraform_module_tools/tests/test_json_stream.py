@@ -0,0 +1,84 @@
+import unittest
+import threading
+
+from terraform_module_tools.scripts.json_stream import CoalescingSlackUpdater, TerraformProgress
+
+
+class FakeNotifier:
+
+    def __init__(self, expected=None):
+        self.updates = []
+        self.expected = expected
+        self.done = threading.Event()
+
+    def update_progress(self, text):
+        self.updates.append(text)
+        if text == self.expected:
+            self.done.set()
+
+
+class TestCoalescingSlackUpdater(unittest.TestCase):
+
+    def test_trailing_update_is_flushed_by_the_timer(self):
+        notifier = FakeNotifier(expected='step 4')
+        updater = CoalescingSlackUpdater(notifier, min_interval=0.5)
+
+        for step in range(5):
+            updater.update(f"step {step}")
+
+        self.assertTrue(notifier.done.wait(5))
+        self.assertEqual(notifier.updates, ['step 0', 'step 4'])
+        self.assertEqual((updater.sent, updater.coalesced), (2, 3))
+
+    def test_flush_sends_pending_update_at_once(self):
+        notifier = FakeNotifier()
+        updater = CoalescingSlackUpdater(notifier, min_interval=60)
+        updater.update('planning')
+        updater.update('planned')
+
+        updater.flush()
+
+        self.assertEqual(notifier.updates, ['planning', 'planned'])
+        self.assertIsNone(updater._timer)
+        # Nothing pending: flushing again sends nothing
+        updater.flush()
+        self.assertEqual(len(notifier.updates), 2)
+
+    def test_unchanged_text_is_not_resent(self):
+        notifier = FakeNotifier()
+        updater = CoalescingSlackUpdater(notifier, min_interval=0)
+
+        updater.update('same')
+        updater.update('same')
+        updater.update('different')
+
+        self.assertEqual(notifier.updates, ['same', 'different'])
+
+
+class TestTerraformProgress(unittest.TestCase):
+
+    def test_counts_from_apply_events(self):
+        progress = TerraformProgress()
+        events = [
+            {'type': 'planned_change', 'change': {'action': 'create'}},
+            {'type': 'planned_change', 'change': {'action': 'replace'}},
+            {'type': 'apply_start', 'hook': {'resource': {'addr': 'aws_s3_bucket.logs'}, 'action': 'create'}},
+            {'type': 'apply_start', 'hook': {'resource': {'addr': 'aws_iam_role.app'}, 'action': 'replace'}},
+            {'type': 'apply_complete', 'hook': {'resource': {'addr': 'aws_s3_bucket.logs'}}},
+            {'type': 'diagnostic', 'diagnostic': {'severity': 'error', 'summary': 'Access denied', 'detail': 'iam'}},
+        ]
+        for event in events:
+            progress.handle(event)
+
+        self.assertEqual(progress.summary_counts(), {'add': 2, 'change': 0, 'destroy': 1})
+        self.assertEqual(progress.errors, ['Access denied: iam'])
+        status = progress.format_status('apply')
+        self.assertIn('Applied: 1', status)
+        self.assertIn('Working on: aws_iam_role.app', status)
+
+        progress.handle({'type': 'change_summary', 'changes': {'add': 1, 'change': 0, 'remove': 1}})
+        self.assertEqual(progress.summary_counts(), {'add': 1, 'change': 0, 'destroy': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
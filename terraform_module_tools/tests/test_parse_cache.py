@@ -0,0 +1,87 @@
+import unittest
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from terraform_module_tools.parse_cache import ParseCache
+
+VARIABLES = {'region': {'type': 'string', 'default': 'us-east-1'}, 'tags': {'type': 'map(string)', 'default': {}}}
+
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix='parse-cache-test-')
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+
+    def test_entries_survive_a_new_instance(self):
+        ParseCache(cache_dir=self.cache_dir).put_module('abc', VARIABLES, {'aws'})
+
+        variables, providers = ParseCache(cache_dir=self.cache_dir).get_module('abc')
+
+        self.assertEqual(variables, VARIABLES)
+        self.assertEqual(providers, {'aws'})
+
+    def test_returned_schemas_are_copies(self):
+        cache = ParseCache(cache_dir=self.cache_dir)
+        variables = {'tags': {'type': 'map(string)', 'default': {}}}
+        cache.put_file('abc', variables, set())
+
+        # Mutating what was stored or what was returned must not change the cache
+        variables['tags']['default']['team'] = 'platform'
+        first, _ = cache.get_file('abc')
+        first['tags']['default']['env'] = 'dev'
+        second, _ = cache.get_file('abc')
+
+        self.assertEqual(second['tags']['default'], {})
+
+    def test_memory_is_bounded_lru(self):
+        cache = ParseCache(cache_dir=self.cache_dir, memory_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.put_file(key, {key: {}}, set())
+        cache.get_file('b')
+        cache.put_file('d', {'d': {}}, set())
+
+        self.assertEqual(list(cache._memory), ['files/b', 'files/d'])
+        # Entries dropped from memory are still read back from disk
+        self.assertEqual(cache.get_file('a')[0], {'a': {}})
+        self.assertEqual(list(cache._memory), ['files/d', 'files/a'])
+
+    def test_manifest_changes_with_any_file(self):
+        module_dir = Path(self.cache_dir) / 'module'
+        module_dir.mkdir()
+        main_tf = module_dir / 'main.tf'
+        variables_tf = module_dir / 'variables.tf'
+        main_tf.write_text('resource "null_resource" "this" {}\n')
+        variables_tf.write_text('variable "region" {}\n')
+        cache = ParseCache(cache_dir=self.cache_dir)
+
+        manifest, file_hashes = cache.manifest(str(module_dir), [main_tf, variables_tf])
+        self.assertEqual(cache.manifest(str(module_dir), [variables_tf, main_tf])[0], manifest)
+        self.assertEqual(set(file_hashes), {str(main_tf), str(variables_tf)})
+
+        variables_tf.write_text('variable "region" {\n  default = "eu-west-1"\n}\n')
+        self.assertNotEqual(cache.manifest(str(module_dir), [main_tf, variables_tf])[0], manifest)
+
+    def test_misses_are_counted(self):
+        cache = ParseCache(cache_dir=self.cache_dir)
+
+        self.assertIsNone(cache.get_module('missing'))
+        cache.put_module('present', {}, set())
+        cache.get_module('present')
+
+        self.assertEqual((cache.stats['module_hits'], cache.stats['module_misses']), (1, 1))
+
+    def test_source_schema_lookup(self):
+        cache = ParseCache(cache_dir=self.cache_dir)
+        key = ParseCache.source_key('terraform-aws-modules/vpc/aws', '5.0.0')
+        cache.put_source(key, VARIABLES, {'aws'})
+
+        self.assertNotEqual(ParseCache.source_key('terraform-aws-modules/vpc/aws', '5.1.0'), key)
+        self.assertEqual(cache.get_source(key), (VARIABLES, {'aws'}))
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, 'sources', f"{key}.json")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from terraform_module_tools.parser import TerraformRegistryClient
+from terraform_module_tools.registry_cache import RegistryCache, resolve_version_constraint, is_exact_version
+
+VERSIONS = ('1.9.0', '2.0.0', '2.3.1', '2.4.0-beta1', '2.10.2', '3.0.0')
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeRegistry:
+    """Serves the versions endpoint with an ETag and answers If-None-Match with 304."""
+
+    def __init__(self, versions, etag='"v1"'):
+        self.versions = list(versions)
+        self.etag = etag
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        headers = headers or {}
+        self.requests.append((url, headers))
+        if url.endswith('/versions'):
+            if headers.get('If-None-Match') == self.etag:
+                return FakeResponse(304)
+            body = {'modules': [{'versions': [{'version': version} for version in self.versions]}]}
+            return FakeResponse(200, body, {'ETag': self.etag})
+        version = url.rstrip('/').split('/')[-2]
+        return FakeResponse(204, headers={'X-Terraform-Get': f"git::https://github.com/example/vpc?ref=v{version}"})
+
+
+class TestVersionConstraints(unittest.TestCase):
+
+    def test_pessimistic_constraint(self):
+        self.assertEqual(resolve_version_constraint(VERSIONS, '~> 2.3'), '2.10.2')
+        self.assertEqual(resolve_version_constraint(VERSIONS, '~> 2.3.0'), '2.3.1')
+        self.assertIsNone(resolve_version_constraint(VERSIONS, '~> 4.0'))
+
+    def test_combined_constraints_and_prereleases(self):
+        self.assertEqual(resolve_version_constraint(VERSIONS, '>= 2.0, < 2.10'), '2.3.1')
+        self.assertEqual(resolve_version_constraint(VERSIONS, '!= 3.0.0'), '2.10.2')
+        # Prereleases are only picked when named exactly
+        self.assertEqual(resolve_version_constraint(VERSIONS, '2.4.0-beta1'), '2.4.0-beta1')
+        self.assertEqual(resolve_version_constraint(VERSIONS, None), '3.0.0')
+
+    def test_invalid_constraint(self):
+        with self.assertRaises(ValueError):
+            resolve_version_constraint(VERSIONS, '>= two')
+
+    def test_exact_versions(self):
+        self.assertTrue(is_exact_version('2.3.1'))
+        self.assertTrue(is_exact_version('= 2.3.1'))
+        self.assertFalse(is_exact_version('~> 2.3'))
+        self.assertFalse(is_exact_version(None))
+
+
+class TestRegistryClient(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix='registry-cache-test-')
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.registry = FakeRegistry(VERSIONS)
+        patcher = patch.object(TerraformRegistryClient, '_get_session', return_value=self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _client(self, ttl=3600):
+        return TerraformRegistryClient(cache=RegistryCache(cache_dir=self.cache_dir, ttl=ttl))
+
+    def test_constraint_resolves_to_newest_matching_source(self):
+        source = self._client().get_module_source('example', 'vpc', 'aws', '~> 2.3')
+
+        self.assertEqual(source, 'git::https://github.com/example/vpc?ref=v2.10.2')
+
+    def test_fresh_entries_skip_the_registry(self):
+        self._client().get_module_source('example', 'vpc', 'aws', '~> 2.3')
+        self.registry.requests.clear()
+
+        self._client().get_module_source('example', 'vpc', 'aws', '~> 2.3')
+
+        self.assertEqual(self.registry.requests, [])
+
+    def test_stale_versions_are_revalidated_with_etag(self):
+        client = self._client(ttl=0)
+        self.assertEqual(client.resolve_version('example', 'vpc', 'aws', '~> 2.0'), '2.10.2')
+        self.assertEqual(self.registry.requests[0][1], {})
+
+        # The registry has a newer release but answers 304, so the cached list is kept
+        self.registry.versions.append('2.11.0')
+        self.assertEqual(client.resolve_version('example', 'vpc', 'aws', '~> 2.0'), '2.10.2')
+        self.assertEqual(self.registry.requests[-1][1], {'If-None-Match': '"v1"'})
+
+        # A changed ETag returns the new list, which is stored with its tag
+        self.registry.etag = '"v2"'
+        self.assertEqual(client.resolve_version('example', 'vpc', 'aws', '~> 2.0'), '2.11.0')
+        with open(f"{self.cache_dir}/{RegistryCache.CACHE_FILE}") as f:
+            self.assertEqual(json.load(f)['versions:example/vpc/aws']['etag'], '"v2"')
+
+    def test_exact_version_needs_no_version_list(self):
+        self._client().get_module_source('example', 'vpc', 'aws', '2.3.1')
+
+        self.assertEqual([url.rsplit('/', 2)[-2] for url, _ in self.registry.requests], ['2.3.1'])
+
+
+if __name__ == '__main__':
+    unittest.main()